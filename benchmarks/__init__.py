@@ -0,0 +1 @@
+"""Benchmarks run by hand against a local Postgres, see README."""
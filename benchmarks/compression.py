@@ -0,0 +1,139 @@
+"""
+Size and CPU cost of compressing order list responses.
+
+Renders `GET /api/orders?account=...` responses of accounts with about
+`--orders` orders each from a database grown with `benchmarks.datagen`, and
+compresses every body with each encoding of `huuva_backend.web.compression`
+at a few levels, the default one included::
+
+    python -m benchmarks.datagen --orders 100000
+    python -m benchmarks.compression --orders 1,10,100,1000 --output compression.json
+
+`render_ms` is the time to render the JSON body, for scale, `compress_ms` the
+best time to compress it in one go and `saved` the share of bytes saved.
+Encodings whose package is not installed are left out.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from fastapi.responses import UJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from huuva_backend.db.models import load_all_models
+from huuva_backend.db.models.order import Order
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.services.order import OrderService
+from huuva_backend.settings import settings
+from huuva_backend.web.api.api_formats.order import Order as ApiOrder
+from huuva_backend.web.compression import (
+    ENCODINGS,
+    available_encodings,
+    new_encoder,
+)
+
+LEVELS = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6), "zstd": (1, 3, 9)}
+
+
+def _best_ms(call: Any, repeat: int) -> float:
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+async def _accounts(session: AsyncSession, targets: List[int]) -> List[str]:
+    """The account whose order count is closest to each target."""
+    counts = (
+        await session.execute(
+            select(Order.account, func.count()).group_by(Order.account),
+        )
+    ).all()
+    return [
+        min(counts, key=lambda row: (abs(row[1] - target), row[0]))[0]
+        for target in targets
+    ]
+
+
+async def render_lists(targets: List[int]) -> List[Tuple[int, Any]]:
+    """Order count and render call of a list response per target."""
+    load_all_models()
+    engine = create_async_engine(str(settings.db_url))
+    lists = []
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = OrderService(OrderRepository(session))
+            for account in await _accounts(session, targets):
+                cores = await service.list_orders(account=account)
+                orders = [ApiOrder.model_validate(c.model_dump()) for c in cores]
+
+                def render(orders: List[ApiOrder] = orders) -> bytes:
+                    return UJSONResponse(
+                        [o.model_dump(mode="json", by_alias=True) for o in orders],
+                    ).body
+
+                lists.append((len(orders), render))
+    finally:
+        await engine.dispose()
+    return lists
+
+
+def compress(name: str, level: int, body: bytes) -> bytes:
+    """`body` compressed in one go, as a response that is not streamed."""
+    encoder = new_encoder(name, level)
+    return encoder.compress(body) + encoder.finish()
+
+
+def measure(body: bytes, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Size and time of `body` compressed with each encoding and level."""
+    results = {}
+    for name in available_encodings(list(ENCODINGS)):
+        for level in LEVELS[name]:
+            size = len(compress(name, level, body))
+            elapsed = _best_ms(functools.partial(compress, name, level, body), repeat)
+            results[f"{name}-{level}"] = {
+                "bytes": size,
+                "saved": round(1 - size / len(body), 4),
+                "compress_ms": round(elapsed, 3),
+                "mb_per_s": round(len(body) / elapsed / 1000, 1),
+            }
+    return results
+
+
+def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--orders",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default="1,10,100,1000",
+        help="orders per list",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = []
+    for orders, render in asyncio.run(render_lists(args.orders)):
+        body = render()
+        report.append(
+            {
+                "orders": orders,
+                "bytes": len(body),
+                "render_ms": round(_best_ms(render, args.repeat), 3),
+                "encodings": measure(body, args.repeat),
+            },
+        )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
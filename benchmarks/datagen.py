@@ -0,0 +1,309 @@
+"""
+Synthetic orders at a chosen scale, for benchmarks against realistic data.
+
+Fills the configured database, which must be migrated, with orders copied
+in bulk by the loader of `huuva_backend.importer`::
+
+    python -m benchmarks.datagen --orders 1000000 --workers 4
+    python -m benchmarks.datagen --orders 1000000 --start 1000000 --workers 4
+
+Accounts, brands and menu items are drawn from Zipf distributions, so a few
+of them have most of the orders, as in production. Orders are spread over
+`--days` days with lunch and dinner peaks; most have been picked up, a few
+were cancelled and the most recent ones are still in progress. Every order
+has a full status history, and so has each of its items.
+
+The data is deterministic: order number `n` of a seed is always the same
+order, so a database can be grown in steps with `--start`.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from huuva_backend.db.models.item_status import ItemStatus
+from huuva_backend.db.models.order_status import OrderStatus
+from huuva_backend.db.partitions import month_start
+from huuva_backend.importer import (
+    TABLES,
+    Batch,
+    Checkpoint,
+    OrderImporter,
+    OrderRows,
+    copy_record,
+    load_batches,
+)
+from huuva_backend.settings import settings
+
+ORDERS, ITEMS, ORDER_HISTORY, ITEM_HISTORY = TABLES
+
+# Share of the orders of each hour of the day, with lunch and dinner peaks.
+HOUR_WEIGHTS = (
+    1, 1, 0, 0, 0, 0, 1, 2, 3, 4, 6, 14, 16, 9, 5, 5, 8, 14, 17, 12, 7, 4, 2, 1,
+)  # fmt: skip
+# Share of the orders with 1, 2, ... items.
+ITEM_COUNT_WEIGHTS = (30, 28, 18, 10, 6, 4, 2, 2)
+# Minutes from an order status to the next one, as (mu, sigma) of a lognormal.
+STEP_MINUTES = {
+    OrderStatus.PREPARING: (0.7, 0.6),
+    OrderStatus.READY: (2.4, 0.4),
+    OrderStatus.PICKED_UP: (1.6, 0.8),
+}
+ITEM_STATUSES = {
+    OrderStatus.PREPARING: ItemStatus.PREPARING,
+    OrderStatus.READY: ItemStatus.READY,
+    OrderStatus.PICKED_UP: ItemStatus.PICKED_UP,
+    OrderStatus.CANCELLED: ItemStatus.CANCELLED,
+}
+CANCELLED_SHARE = 0.04
+
+CITIES = ("Helsinki", "Espoo", "Vantaa", "Tampere", "Turku")
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative weights of the ranks 1 to `count` of a Zipf distribution."""
+    return list(
+        itertools.accumulate(1 / rank**exponent for rank in range(1, count + 1)),
+    )
+
+
+def _today() -> datetime:
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Shape of the generated data."""
+
+    accounts: int = 200_000
+    brands: int = 40
+    menu_items: int = 300
+    days: int = 365
+    # Orders whose history would go on after `end` are still in progress.
+    end: datetime = field(default_factory=_today)
+
+
+class _Generator:
+    """Draws orders from the distributions of a profile."""
+
+    def __init__(self, rng: random.Random, profile: Profile) -> None:
+        self.rng = rng
+        self.profile = profile
+        self.account_weights = _zipf_weights(profile.accounts)
+        self.brand_weights = _zipf_weights(profile.brands)
+        self.menu_weights = _zipf_weights(profile.menu_items)
+
+    def _id(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _rank(self, weights: Sequence[float]) -> int:
+        return self.rng.choices(range(len(weights)), cum_weights=weights)[0]
+
+    def _created_at(self) -> datetime:
+        day = self.profile.end - timedelta(
+            days=self.rng.randrange(1, self.profile.days + 1),
+        )
+        hour = self.rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+        return day.replace(hour=hour, minute=0, second=0) + timedelta(
+            seconds=self.rng.randrange(3600),
+        )
+
+    def _history(self, created_at: datetime) -> List[Tuple[OrderStatus, datetime]]:
+        """Status history of an order, cut at the end of the generated period."""
+        history = [(OrderStatus.RECEIVED, created_at)]
+        cancel_at = (
+            self.rng.randrange(1, 4) if self.rng.random() < CANCELLED_SHARE else None
+        )
+        moment = created_at
+        for step, (reached, (mu, sigma)) in enumerate(STEP_MINUTES.items(), start=1):
+            status = OrderStatus.CANCELLED if step == cancel_at else reached
+            moment += timedelta(minutes=self.rng.lognormvariate(mu, sigma))
+            if moment > self.profile.end:
+                break
+            history.append((status, moment))
+            if status == OrderStatus.CANCELLED:
+                break
+        return history
+
+    def order(self) -> OrderRows:
+        """Rows of a new order, its items and their histories."""
+        order_id = self._id()
+        created_at = self._created_at()
+        history = self._history(created_at)
+        status, updated_at = history[-1]
+        account = self._rank(self.account_weights)
+        order = {
+            "id": order_id,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "account": f"account-{account}",
+            "brand_id": f"brand-{self._rank(self.brand_weights)}",
+            "channel_order_id": order_id,
+            "customer_name": f"Customer {account}",
+            "customer_phone": f"+35840{account:07d}",
+            "pickup_time": created_at + timedelta(minutes=self.rng.randrange(15, 60)),
+            "status": status,
+            "delivery_city": self.rng.choice(CITIES),
+            "delivery_street": f"Huuvatie {self.rng.randrange(1, 200)}",
+            "delivery_postal_code": f"00{self.rng.randrange(100, 990)}",
+        }
+
+        count = self.rng.choices(
+            range(1, len(ITEM_COUNT_WEIGHTS) + 1),
+            weights=ITEM_COUNT_WEIGHTS,
+        )[0]
+        plus = {self._rank(self.menu_weights) for _ in range(count)}
+        item_history = [
+            (ItemStatus.ORDERED, created_at),
+            *(
+                (ITEM_STATUSES[entry_status], timestamp)
+                for entry_status, timestamp in history[1:]
+            ),
+        ]
+        items = [
+            {
+                "order_id": order_id,
+                "plu": f"PLU{plu}",
+                "name": f"Menu item {plu}",
+                "quantity": self.rng.choices((1, 2, 3), weights=(80, 15, 5))[0],
+                "status": item_history[-1][0],
+            }
+            for plu in sorted(plus)
+        ]
+
+        rows = {
+            ORDERS.name: [copy_record(ORDERS, order)],
+            ITEMS.name: [copy_record(ITEMS, item) for item in items],
+            ORDER_HISTORY.name: [
+                copy_record(
+                    ORDER_HISTORY,
+                    {
+                        "id": self._id(),
+                        "order_id": order_id,
+                        "status": entry_status,
+                        "timestamp": timestamp,
+                    },
+                )
+                for entry_status, timestamp in history
+            ],
+            ITEM_HISTORY.name: [
+                copy_record(
+                    ITEM_HISTORY,
+                    {
+                        "id": self._id(),
+                        "order_id": order_id,
+                        "item_plu": item["plu"],
+                        "status": entry_status,
+                        "timestamp": timestamp,
+                    },
+                )
+                for item in items
+                for entry_status, timestamp in item_history
+            ],
+        }
+        return OrderRows(
+            order_id=order_id,
+            channel_order=(order["brand_id"], order["channel_order_id"]),
+            rows=rows,
+            timestamps=[timestamp for _, timestamp in history],
+        )
+
+
+def generate_batch(seed: int, start: int, count: int, profile: Profile) -> Batch:
+    """Orders `start` to `start + count` of `seed`. Runs in the process pool."""
+    generator = _Generator(random.Random(f"{seed}-{start}"), profile)
+    batch = Batch(start=start, end=start + count)
+    for _ in range(count):
+        rows = generator.order()
+        batch.orders.append(rows)
+        batch.months.update(month_start(moment) for moment in rows.timestamps)
+    return batch
+
+
+def _jobs(
+    seed: int,
+    start: int,
+    orders: int,
+    batch_size: int,
+    profile: Profile,
+) -> Iterator[Tuple[Any, ...]]:
+    for batch_start in range(start, start + orders, batch_size):
+        count = min(batch_size, start + orders - batch_start)
+        yield seed, batch_start, count, profile
+
+
+async def generate(
+    engine: AsyncEngine,
+    orders: int,
+    start: int = 0,
+    seed: int = 0,
+    batch_size: int = 5000,
+    workers: int = 0,
+    profile: Profile = Profile(),
+) -> Dict[str, Any]:
+    """
+    Copy orders `start` to `start + orders` of `seed` and analyze the tables.
+
+    Orders that already exist are skipped, so a run can be repeated.
+    """
+    started = time.perf_counter()
+    importer = OrderImporter(engine, Checkpoint(None))
+    jobs = _jobs(seed, start, orders, batch_size, profile)
+    await load_batches(importer, generate_batch, jobs, workers)
+    async with engine.connect() as conn:
+        for table in TABLES:
+            await conn.execute(text(f"ANALYZE {table.name}"))
+    seconds = time.perf_counter() - started
+    return {
+        "generated": importer.report.imported,
+        "existing": importer.report.skipped_existing,
+        "seconds": round(seconds, 3),
+        "orders_per_second": round(importer.report.imported / seconds, 1),
+    }
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    engine = create_async_engine(str(settings.db_url))
+    try:
+        return await generate(
+            engine,
+            args.orders,
+            start=args.start,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            profile=Profile(days=args.days),
+        )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Entrypoint of the generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, required=True)
+    parser.add_argument("--start", type=int, default=0, help="number of the first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=Profile.days)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    report = asyncio.run(_run(args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Size and speed of the JSON and MessagePack formats of the order views.
+
+Encodes `GET /api/orders` responses of synthetic orders as the two response
+classes do, decodes them as a client would, and parses a create request
+body of each format, without a database::
+
+    python -m benchmarks.formats --orders 1,100,1000 --output formats.json
+
+`encode` is the response rendering, `decode_*` the client side and
+`parse_request` the decoding and validation of a `POST /api/orders/` body.
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import msgpack
+import ujson
+from fastapi.responses import UJSONResponse
+
+from benchmarks.mapping import order_model, order_payload
+from huuva_backend.db.mappings.order import order_db_to_entity
+from huuva_backend.db.models import load_all_models
+from huuva_backend.web.api.api_formats.order import Order as ApiOrder
+from huuva_backend.web.api.api_formats.order import OrderCreate as ApiOrderCreate
+from huuva_backend.web.negotiation import MsgPackResponse
+
+
+def measure(call: Callable[[], Any], repeat: int) -> float:
+    """Best time of one call in microseconds."""
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def response_content(orders: int, items: int, history: int) -> List[Dict[str, Any]]:
+    """JSON compatible content of a list response, as the route renders it."""
+    api_order = ApiOrder.model_validate(
+        order_db_to_entity(order_model(items, history)).model_dump(),
+    )
+    content = []
+    for number in range(orders):
+        order = api_order.model_dump(mode="json", by_alias=True)
+        order["_id"] = f"order-{number}"
+        content.append(order)
+    return content
+
+
+def formats(
+    orders: int,
+    items: int,
+    history: int,
+    repeat: int,
+) -> Dict[str, Dict[str, float]]:
+    """Size and timings of each format for a list of `orders` orders."""
+    content = response_content(orders, items, history)
+    json_body = UJSONResponse(content).body
+    msgpack_body = MsgPackResponse(content).body
+    payload = order_payload(items)
+    json_request = json.dumps(payload).encode()
+    msgpack_request = msgpack.packb(payload)
+
+    return {
+        "json": {
+            "bytes": len(json_body),
+            "encode_us": measure(lambda: UJSONResponse(content).body, repeat),
+            "decode_json_us": measure(lambda: json.loads(json_body), repeat),
+            "decode_ujson_us": measure(lambda: ujson.loads(json_body), repeat),
+            "parse_request_us": measure(
+                lambda: ApiOrderCreate.model_validate(json.loads(json_request)),
+                repeat,
+            ),
+        },
+        "msgpack": {
+            "bytes": len(msgpack_body),
+            "encode_us": measure(lambda: MsgPackResponse(content).body, repeat),
+            "decode_us": measure(lambda: msgpack.unpackb(msgpack_body), repeat),
+            "parse_request_us": measure(
+                lambda: ApiOrderCreate.model_validate(msgpack.unpackb(msgpack_request)),
+                repeat,
+            ),
+        },
+    }
+
+
+def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--orders",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default="1,100,1000",
+        help="orders per list",
+    )
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--history", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    load_all_models()
+    report = {}
+    for orders in args.orders:
+        results = formats(orders, args.items, args.history, args.repeat)
+        report[str(orders)] = {
+            name: {key: round(value, 2) for key, value in timings.items()}
+            for name, timings in results.items()
+        }
+    output = json.dumps({"unit": "us", "orders": report}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Throughput and latency of the order API under a mixed workload.
+
+Starts the app with uvicorn against the configured database, which must be
+migrated, and drives it with concurrent httpx clients::
+
+    python -m benchmarks.load --duration 30 --concurrency 32 --output before.json
+    python -m benchmarks.load --mix create=1,get=4,list=1 --url http://host:8000
+
+Reports requests per second and p50/p95/p99 latency per endpoint as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+ENDPOINTS = ("create", "get", "list", "patch_item", "patch_order")
+DEFAULT_MIX = "create=15,get=35,list=10,patch_item=30,patch_order=10"
+
+ORDER_STATUSES = (2, 3, 4)
+ITEM_STATUSES = (2, 3, 4)
+
+
+@dataclass
+class Endpoint:
+    """Latencies and errors recorded for one endpoint."""
+
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        """Summary of the recorded requests."""
+        report: Dict[str, Any] = {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "rps": round(len(self.latencies) / duration, 1),
+        }
+        if len(self.latencies) > 1:
+            quantiles = statistics.quantiles(self.latencies, n=100)
+            report.update(
+                p50_ms=round(quantiles[49], 3),
+                p95_ms=round(quantiles[94], 3),
+                p99_ms=round(quantiles[98], 3),
+            )
+        return report
+
+
+@dataclass
+class Workload:
+    """Orders created during the run, used as targets of the other requests."""
+
+    accounts: List[str]
+    items: int
+    orders: Dict[str, List[str]] = field(default_factory=dict)
+
+    def order_payload(self) -> Dict[str, Any]:
+        """Payload of a new order with `items` items."""
+        order_id = uuid.uuid4().hex
+        return {
+            "_id": order_id,
+            "account": random.choice(self.accounts),
+            "brandId": "benchmark-brand",
+            "channelOrderId": order_id,
+            "customer": {"name": "Load Test", "phoneNumber": "+358401234567"},
+            "deliveryAddress": {
+                "city": "Helsinki",
+                "street": "Huuvatie 1",
+                "postalCode": "00100",
+            },
+            "pickupTime": "2025-05-01T12:00:00Z",
+            "items": [
+                {"name": f"Item {i}", "plu": f"PLU-{i:03}", "quantity": 1}
+                for i in range(self.items)
+            ],
+            "status": 1,
+            "statusHistory": [{"status": 1, "timestamp": "2025-05-01T11:30:00Z"}],
+        }
+
+
+async def _request(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    name: str,
+) -> httpx.Response:
+    if name == "create":
+        payload = workload.order_payload()
+        response = await client.post("/api/orders/", json=payload)
+        if response.status_code == 201:
+            workload.orders[payload["_id"]] = [item["plu"] for item in payload["items"]]
+        return response
+    order_id = random.choice(list(workload.orders))
+    if name == "get":
+        return await client.get(f"/api/orders/{order_id}")
+    if name == "list":
+        return await client.get(
+            "/api/orders/",
+            params={"account": random.choice(workload.accounts)},
+        )
+    if name == "patch_item":
+        plu = random.choice(workload.orders[order_id])
+        return await client.patch(
+            f"/api/orders/{order_id}/items/{plu}",
+            json={"status": random.choice(ITEM_STATUSES)},
+        )
+    return await client.patch(
+        f"/api/orders/{order_id}",
+        json={"status": random.choice(ORDER_STATUSES)},
+    )
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    mix: Dict[str, int],
+    endpoints: Dict[str, Endpoint],
+    deadline: float,
+) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        if not workload.orders:
+            name = "create"
+        start = time.perf_counter()
+        try:
+            response = await _request(client, workload, name)
+        except httpx.HTTPError:
+            endpoints[name].errors += 1
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.is_success:
+            endpoints[name].latencies.append(elapsed)
+        else:
+            endpoints[name].errors += 1
+
+
+async def _phase(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+) -> Tuple[Dict[str, Endpoint], float]:
+    endpoints = {name: Endpoint() for name in ENDPOINTS}
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(client, workload, mix, endpoints, start + duration)
+            for _ in range(concurrency)
+        ),
+    )
+    return endpoints, time.perf_counter() - start
+
+
+async def run(
+    url: str,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    items: int,
+) -> Dict[str, Any]:
+    """Drive the API at `url` and return the report."""
+    workload = Workload(
+        accounts=[f"benchmark-{uuid.uuid4().hex[:8]}-{i}" for i in range(50)],
+        items=items,
+    )
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await _phase(client, workload, mix, concurrency, warmup)
+        endpoints, elapsed = await _phase(
+            client,
+            workload,
+            mix,
+            concurrency,
+            duration,
+        )
+    total = sum(len(endpoint.latencies) for endpoint in endpoints.values())
+    return {
+        "config": {
+            "mix": mix,
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "items_per_order": items,
+        },
+        "total_rps": round(total / elapsed, 1),
+        "endpoints": {
+            name: endpoint.report(elapsed)
+            for name, endpoint in endpoints.items()
+            if name in mix or endpoint.latencies
+        },
+    }
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}")
+        mix[name] = int(weight)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+async def _wait_until_healthy(url: str, process: subprocess.Popen[bytes]) -> None:
+    async with httpx.AsyncClient(base_url=url) as client:
+        for _ in range(100):
+            if process.poll() is not None:
+                raise SystemExit("the API server exited during startup")
+            try:
+                if (await client.get("/api/health")).is_success:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise SystemExit("the API server did not become healthy")
+
+
+async def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    process: Optional[subprocess.Popen[bytes]] = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        process = subprocess.Popen(  # noqa: S603
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "huuva_backend.web.application:get_app",
+                "--factory",
+                "--port",
+                str(port),
+                "--workers",
+                str(args.workers),
+                "--no-access-log",
+                "--log-level",
+                "warning",
+            ],
+        )
+    try:
+        if process is not None:
+            await _wait_until_healthy(url, process)
+        report = await run(
+            url,
+            args.mix,
+            args.concurrency,
+            args.duration,
+            args.warmup,
+            args.items,
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    report["config"]["workers"] = args.workers if args.url is None else None
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
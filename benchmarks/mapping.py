@@ -0,0 +1,169 @@
+"""
+Cost of the per-request mapping and serialization stages.
+
+Times each stage between the request body and the response body on synthetic
+payloads and ORM objects, without a database::
+
+    python -m benchmarks.mapping --sizes 1x2,10x4,50x4 --output before.json
+
+A size `ITEMSxHISTORY` is an order with ITEMS items and HISTORY status
+history rows per item. `order_db_to_entity` includes `item_db_to_entity`.
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import UJSONResponse
+
+from huuva_backend.db.mappings.item import item_db_to_entity
+from huuva_backend.db.mappings.order import order_db_to_entity
+from huuva_backend.db.models import load_all_models
+from huuva_backend.db.models.item import Item
+from huuva_backend.db.models.item_status import ItemStatus, ItemStatusHistory
+from huuva_backend.db.models.order import Order
+from huuva_backend.db.models.order_status import OrderStatus, OrderStatusHistory
+from huuva_backend.dependencies import get_order_create_entity
+from huuva_backend.web.api.api_formats.order import Order as ApiOrder
+from huuva_backend.web.api.api_formats.order import OrderCreate as ApiOrderCreate
+
+ORDER_HISTORY = 5
+START = datetime(2025, 5, 1, 12, tzinfo=timezone.utc)
+
+
+def order_payload(items: int) -> Dict[str, Any]:
+    """Decoded JSON body of a create request with `items` items."""
+    return {
+        "_id": "60f87ea2a52dad8a3fa4861",
+        "account": "60bfc6dc4887c9851d5a0246",
+        "brandId": "60bfc6dc4887c9851d5a0245",
+        "channelOrderId": "TEST1626898086",
+        "customer": {"name": "John Doe", "phoneNumber": "+358401234567"},
+        "deliveryAddress": {
+            "city": "Helsinki",
+            "street": "Huuvatie 1",
+            "postalCode": "00100",
+        },
+        "pickupTime": "2025-05-01T12:30:00Z",
+        "items": [
+            {"name": f"Item {i}", "plu": f"PLU-{i:03}", "quantity": 1}
+            for i in range(items)
+        ],
+        "status": 1,
+        "statusHistory": [{"status": 1, "timestamp": "2025-05-01T12:00:00Z"}],
+    }
+
+
+def order_model(items: int, history: int) -> Order:
+    """Transient Order with its collections populated, as loaded for a response."""
+    order_id = "60f87ea2a52dad8a3fa4861"
+    return Order(
+        id=order_id,
+        created_at=START,
+        updated_at=START,
+        account="60bfc6dc4887c9851d5a0246",
+        brand_id="60bfc6dc4887c9851d5a0245",
+        channel_order_id="TEST1626898086",
+        customer_name="John Doe",
+        customer_phone="+358401234567",
+        delivery_city="Helsinki",
+        delivery_street="Huuvatie 1",
+        delivery_postal_code="00100",
+        pickup_time=START + timedelta(minutes=30),
+        status=OrderStatus.READY,
+        status_history=[
+            OrderStatusHistory(
+                id=f"order-history-{n}",
+                order_id=order_id,
+                status=OrderStatus(1 + n % 5),
+                timestamp=START + timedelta(minutes=n),
+            )
+            for n in range(ORDER_HISTORY)
+        ],
+        items=[
+            Item(
+                order_id=order_id,
+                plu=f"PLU-{i:03}",
+                name=f"Item {i}",
+                quantity=1,
+                status=ItemStatus.READY,
+                status_history=[
+                    ItemStatusHistory(
+                        id=f"item-history-{i}-{n}",
+                        order_id=order_id,
+                        item_plu=f"PLU-{i:03}",
+                        status=ItemStatus(1 + n % 5),
+                        timestamp=START + timedelta(minutes=n),
+                    )
+                    for n in range(history)
+                ],
+            )
+            for i in range(items)
+        ],
+    )
+
+
+def stages(items: int, history: int) -> Dict[str, Callable[[], Any]]:
+    """Each stage as a call on prepared input, in request order."""
+    payload = order_payload(items)
+    api_create = ApiOrderCreate.model_validate(payload)
+    model = order_model(items, history)
+    core = order_db_to_entity(model)
+    api_order = ApiOrder.model_validate(core.model_dump())
+
+    def render_response() -> bytes:
+        content = api_order.model_dump(mode="json", by_alias=True)
+        return UJSONResponse(jsonable_encoder(content)).body
+
+    return {
+        "parse_request": lambda: ApiOrderCreate.model_validate(payload),
+        "get_order_create_entity": lambda: get_order_create_entity(api_create),
+        "item_db_to_entity": lambda: [item_db_to_entity(i) for i in model.items],
+        "order_db_to_entity": lambda: order_db_to_entity(model),
+        "api_order_validate": lambda: ApiOrder.model_validate(core.model_dump()),
+        "render_response": render_response,
+    }
+
+
+def measure(call: Callable[[], Any], repeat: int) -> float:
+    """Best time of one call in microseconds."""
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def _parse_sizes(value: str) -> List[Tuple[int, int]]:
+    sizes = []
+    for size in value.split(","):
+        items, _, history = size.partition("x")
+        sizes.append((int(items), int(history)))
+    return sizes
+
+
+def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=_parse_sizes, default="1x2,10x4,50x4")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    load_all_models()
+    report: Dict[str, Dict[str, float]] = {}
+    for items, history in args.sizes:
+        report[f"{items}x{history}"] = {
+            name: round(measure(call, args.repeat), 2)
+            for name, call in stages(items, history).items()
+        }
+    output = json.dumps({"unit": "us", "sizes": report}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Index size and lookup speed of the status and generated id column types.
+
+Run against a migrated database, before and after converting it with the
+`native_types` migration branch::
+
+    python -m benchmarks.native_types seed --orders 100000
+    python -m benchmarks.native_types measure
+    alembic upgrade native_types@head
+    HUUVA_BACKEND_DB_NATIVE_TYPES=true python -m benchmarks.native_types measure
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from huuva_backend.db.models import load_all_models
+from huuva_backend.db.models.order import Order
+from huuva_backend.db.models.order_status import OrderStatus, OrderStatusHistory
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.settings import settings
+
+TABLES = ("orders", "items", "order_status_history", "item_status_history")
+
+ORDER_STATUSES = "ARRAY['RECEIVED', 'PREPARING', 'READY', 'PICKED_UP', 'CANCELLED']"
+ITEM_STATUSES = "ARRAY['ORDERED', 'PREPARING', 'READY', 'PICKED_UP', 'CANCELLED']"
+
+
+async def _is_native(engine: AsyncEngine) -> bool:
+    async with engine.connect() as conn:
+        data_type = await conn.scalar(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'orders' AND column_name = 'status'",
+            ),
+        )
+    return data_type == "smallint"
+
+
+def _status(names: str, value: str, native: bool) -> str:
+    """SQL for the status with integer `value`, in the stored representation."""
+    return value if native else f"({names})[{value}]"
+
+
+async def seed(engine: AsyncEngine, orders: int) -> None:
+    """Insert `orders` orders with three items and three statuses each."""
+    native = await _is_native(engine)
+    history_id = "gen_random_uuid()" if native else "gen_random_uuid()::text"
+
+    statements = [
+        f"""
+        INSERT INTO orders (
+            id, created_at, updated_at, account, brand_id, channel_order_id,
+            customer_name, customer_phone, pickup_time, status,
+            delivery_city, delivery_street, delivery_postal_code
+        )
+        SELECT
+            md5(g::text), ts, ts, 'account-' || g % 5000, 'brand-' || g % 20,
+            'channel-' || g, 'Customer', '+358401234567', ts + interval '30 min',
+            {_status(ORDER_STATUSES, "1 + g % 5", native)},
+            'Helsinki', 'Street 1', '00100'
+        FROM generate_series(1, :orders) AS g,
+        LATERAL (SELECT now() - g * interval '1 minute' AS ts) AS t
+        """,
+        f"""
+        INSERT INTO items (order_id, plu, name, quantity, status)
+        SELECT o.id, 'PLU-' || p, 'Item ' || p, 1 + p % 3,
+            {_status(ITEM_STATUSES, "1 + p % 5", native)}
+        FROM orders o, generate_series(1, 3) AS p
+        """,
+        f"""
+        INSERT INTO order_status_history (id, order_id, status, timestamp)
+        SELECT {history_id}, o.id, {_status(ORDER_STATUSES, "n", native)},
+            o.created_at + n * interval '5 min'
+        FROM orders o, generate_series(1, 3) AS n
+        """,
+        f"""
+        INSERT INTO item_status_history (id, order_id, item_plu, status, timestamp)
+        SELECT {history_id}, i.order_id, i.plu, {_status(ITEM_STATUSES, "n", native)},
+            o.created_at + n * interval '5 min'
+        FROM items i JOIN orders o ON o.id = i.order_id, generate_series(1, 3) AS n
+        """,
+    ]
+    async with engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement), {"orders": orders})
+        for table in TABLES:
+            await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def index_sizes(engine: AsyncEngine) -> Dict[str, int]:
+    """Total index size in bytes per table, summed over partitions."""
+    sizes = {}
+    async with engine.connect() as conn:
+        for table in TABLES:
+            sizes[table] = await conn.scalar(
+                text(
+                    "SELECT coalesce(("
+                    "SELECT sum(pg_indexes_size(relid)) "
+                    "FROM pg_partition_tree(:table)"
+                    "), pg_indexes_size(:table))::bigint",
+                ),
+                {"table": table},
+            )
+    return sizes
+
+
+async def _time(
+    call: Callable[[], Awaitable[Any]],
+    samples: int,
+) -> Dict[str, float]:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    quantiles = statistics.quantiles(timings, n=100)
+    return {"p50_ms": round(quantiles[49], 3), "p95_ms": round(quantiles[94], 3)}
+
+
+async def lookups(engine: AsyncEngine, samples: int) -> Dict[str, Dict[str, float]]:
+    """Latency of the lookups that go through the converted columns."""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        order_ids = list(
+            (await session.scalars(select(Order.id).limit(samples * 10))).all(),
+        )
+        history_ids = list(
+            (
+                await session.scalars(
+                    select(OrderStatusHistory.id).limit(samples * 10),
+                )
+            ).all(),
+        )
+
+    async def get_order(session: AsyncSession) -> None:
+        await OrderRepository(session).get(random.choice(order_ids))
+        session.expunge_all()
+
+    async def list_by_status(session: AsyncSession) -> None:
+        query = OrderRepository(session)._list_query(
+            OrderStatus.READY,
+            None,
+            None,
+            None,
+        )
+        await session.scalars(query.limit(50))
+
+    async def history_by_id(session: AsyncSession) -> None:
+        await session.scalars(
+            select(OrderStatusHistory.status).where(
+                OrderStatusHistory.id == random.choice(history_ids),
+            ),
+        )
+
+    results = {}
+    async with session_factory() as session:
+        for name, lookup in (
+            ("get_order", get_order),
+            ("list_by_status", list_by_status),
+            ("history_by_id", history_by_id),
+        ):
+            await _time(partial(lookup, session), samples // 10)  # warm up
+            results[name] = await _time(partial(lookup, session), samples)
+    return results
+
+
+async def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=("seed", "measure"))
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=2_000)
+    args = parser.parse_args()
+
+    load_all_models()
+    engine = create_async_engine(str(settings.db_url))
+    try:
+        if args.command == "seed":
+            await seed(engine, args.orders)
+            return
+        if await _is_native(engine) != settings.db_native_types:
+            raise SystemExit(
+                "HUUVA_BACKEND_DB_NATIVE_TYPES does not match the database schema",
+            )
+        report = {
+            "native_types": settings.db_native_types,
+            "index_bytes": await index_sizes(engine),
+            "lookups": await lookups(engine, args.samples),
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,229 @@
+"""
+Latency of pickup window queries with and without the partial index.
+
+Run against a migrated database grown with `benchmarks.datagen`, whose orders
+are all historical. A few thousand active orders due in the next hours are
+added on top, and dispatch's query, the orders of a status due in the next
+`--window` minutes, is timed with `ix_orders_active_pickup_time`, with the
+index dropped, and as the whole list of the status filtered client-side.
+`window_query` times the orders query alone, `pickup_window` the whole
+`OrderRepository.list` call, which also loads the items and histories::
+
+    python -m benchmarks.datagen --orders 1000000
+    python -m benchmarks.pickup --active 3000 --output pickup.json
+
+Everything happens in one transaction that is rolled back, the index drop
+included, so the database is left as it was. The drop locks the orders
+table meanwhile; do not run this against a database in use.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from huuva_backend.db.models import load_all_models
+from huuva_backend.db.models.item import Item
+from huuva_backend.db.models.item_status import ItemStatus
+from huuva_backend.db.models.order import Order
+from huuva_backend.db.models.order_status import OrderStatus
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.settings import settings
+
+ACTIVE_STATUSES = (OrderStatus.RECEIVED, OrderStatus.PREPARING, OrderStatus.READY)
+INDEX = "ix_orders_active_pickup_time"
+
+
+async def add_active_orders(
+    session: AsyncSession,
+    count: int,
+    hours: int,
+    now: datetime,
+) -> None:
+    """Add `count` active orders due in the next `hours`, with an item each."""
+    rng = random.Random(0)
+    orders = []
+    for number in range(count):
+        pickup_time = now + timedelta(seconds=rng.randrange(hours * 3600))
+        orders.append(
+            {
+                "id": f"pickup-{number}",
+                "created_at": pickup_time - timedelta(minutes=45),
+                "updated_at": now,
+                "account": f"account-{rng.randrange(200_000)}",
+                "brand_id": f"brand-{rng.randrange(40)}",
+                "channel_order_id": f"pickup-{number}",
+                "customer_name": "Pickup Test",
+                "customer_phone": "+358401234567",
+                "pickup_time": pickup_time,
+                "status": rng.choice(ACTIVE_STATUSES),
+                "delivery_city": "Helsinki",
+                "delivery_street": "Huuvatie 1",
+                "delivery_postal_code": "00100",
+            },
+        )
+    await session.execute(insert(Order), orders)
+    await session.execute(
+        insert(Item),
+        [
+            {
+                "order_id": order["id"],
+                "plu": "PLU1",
+                "name": "Burger",
+                "quantity": 1,
+                "status": ItemStatus.PREPARING,
+            }
+            for order in orders
+        ],
+    )
+    await session.execute(text("ANALYZE orders"))
+
+
+def _summary(timings: List[float], rows: List[int]) -> Dict[str, float]:
+    quantiles = statistics.quantiles(timings, n=100)
+    return {
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "rows": round(statistics.mean(rows), 1),
+    }
+
+
+async def _time(
+    session: AsyncSession,
+    call: Callable[[int], Awaitable[int]],
+    samples: int,
+    unindexed: bool = False,
+) -> List[Dict[str, float]]:
+    """
+    Time `call(sample)`, and with `unindexed` also without the index.
+
+    The two are timed in turns, so that neither runs on a warmer cache. The
+    index is dropped in a savepoint that is rolled back after each sample.
+    """
+    timings: List[List[float]] = [[], []] if unindexed else [[]]
+    rows = []
+    for sample in range(samples):
+        for variant, variant_timings in enumerate(timings):
+            if variant:
+                await session.execute(text("SAVEPOINT unindexed"))
+                await session.execute(text(f"DROP INDEX {INDEX}"))
+            start = time.perf_counter()
+            rows.append(await call(sample))
+            variant_timings.append((time.perf_counter() - start) * 1000)
+            # Keep the identity map from growing, as a request would.
+            session.expunge_all()
+            if variant:
+                await session.execute(text("ROLLBACK TO SAVEPOINT unindexed"))
+    return [_summary(variant_timings, rows) for variant_timings in timings]
+
+
+async def measure(
+    session: AsyncSession,
+    samples: int,
+    hours: int,
+    window: int,
+    now: datetime,
+) -> Dict[str, Dict[str, float]]:
+    """Time a window query and the client-side filtering it replaces."""
+    rng = random.Random(1)
+    starts = [
+        now + timedelta(seconds=rng.randrange((hours * 60 - window) * 60))
+        for _ in range(samples)
+    ]
+    statuses = [rng.choice((OrderStatus.PREPARING, OrderStatus.READY)) for _ in starts]
+
+    def filters(sample: int) -> Dict[str, Any]:
+        return {
+            "status": statuses[sample],
+            "pickup_from": starts[sample],
+            "pickup_to": starts[sample] + timedelta(minutes=window),
+        }
+
+    async def window_query(sample: int) -> int:
+        query = OrderRepository(session)._list_query(**filters(sample))
+        return len((await session.scalars(query)).all())
+
+    async def pickup_window(sample: int) -> int:
+        return len(await OrderRepository(session).list(**filters(sample)))
+
+    async def client_side(sample: int) -> int:
+        bounds = filters(sample)
+        orders = await OrderRepository(session).list(status=statuses[sample])
+        return len(
+            [
+                order
+                for order in orders
+                if bounds["pickup_from"] <= order.pickup_time <= bounds["pickup_to"]
+            ],
+        )
+
+    results = {}
+    for name, call in (
+        ("window_query", window_query),
+        ("pickup_window", pickup_window),
+    ):
+        await _time(session, call, samples // 10, unindexed=True)  # warm up
+        indexed, unindexed = await _time(session, call, samples, unindexed=True)
+        results[name] = indexed
+        results[f"{name}_unindexed"] = unindexed
+    await _time(session, client_side, samples // 10)  # warm up
+    (results["client_side"],) = await _time(session, client_side, samples)
+    return results
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Add the active orders, measure, and roll everything back."""
+    load_all_models()
+    engine = create_async_engine(str(settings.db_url))
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            orders = await session.scalar(select(func.count()).select_from(Order))
+            now = datetime.now(timezone.utc)
+            await add_active_orders(session, args.active, args.hours, now)
+            index_bytes = await session.scalar(
+                text(f"SELECT pg_relation_size('{INDEX}')"),
+            )
+            report = {
+                "orders": orders,
+                "active_orders": args.active,
+                "index_bytes": index_bytes,
+                "results": await measure(
+                    session,
+                    args.samples,
+                    args.hours,
+                    args.window,
+                    now,
+                ),
+            }
+            await session.rollback()
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--active", type=int, default=3_000, help="active orders")
+    parser.add_argument("--hours", type=int, default=4, help="spread of pickups")
+    parser.add_argument("--window", type=int, default=15, help="window in minutes")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
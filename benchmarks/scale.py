@@ -0,0 +1,235 @@
+"""
+Latency of the repository methods and view refreshes as the data grows.
+
+Grows the configured database, which must be migrated and should start
+empty, with `benchmarks.datagen` to each of the given numbers of orders,
+and at each size times the repository methods and the refresh of each
+materialized view::
+
+    python -m benchmarks.scale --sizes 10000,100000,1000000 --output scale.json
+    python -m benchmarks.scale --sizes 1000000,10000000 --workers 8
+
+For every size after the first, `p50_ratio` is the growth of the median
+latency since the previous size. With the right indexes it stays near 1 for
+lookups, and near the growth of the data for queries whose result grows with
+it; anything above that is non-linear scaling.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from benchmarks.datagen import Profile, generate
+from huuva_backend.core.entities.item import ItemCreate, ItemUpdate
+from huuva_backend.core.entities.item_status import ItemStatus as ItemStatusEntity
+from huuva_backend.core.entities.order import (
+    Customer,
+    DeliveryAddress,
+    OrderCreate,
+    OrderUpdate,
+)
+from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEntity
+from huuva_backend.core.entities.order_status import OrderStatusHistory
+from huuva_backend.db.models.item import Item
+from huuva_backend.db.models.order import Order
+from huuva_backend.db.models.order_status import OrderStatus
+from huuva_backend.db.repositories.item import ItemRepository
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.services.analytics import MATERIALIZED_VIEWS
+from huuva_backend.settings import settings
+
+Call = Callable[[AsyncSession, int], Awaitable[Any]]
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    quantiles = statistics.quantiles(timings, n=100)
+    return {"p50_ms": round(quantiles[49], 3), "p95_ms": round(quantiles[94], 3)}
+
+
+async def _time(
+    session_factory: "async_sessionmaker[AsyncSession]",
+    call: Call,
+    samples: int,
+) -> Dict[str, float]:
+    """Time `call(session, sample)` in a new session per sample, rolled back."""
+    timings = []
+    for sample in range(samples):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await call(session, sample)
+            timings.append((time.perf_counter() - start) * 1000)
+            await session.rollback()
+    return _summary(timings)
+
+
+def _new_order(sample: int) -> OrderCreate:
+    now = datetime.now(timezone.utc)
+    return OrderCreate(
+        account=f"account-{sample}",
+        brand_id="brand-0",
+        channel_order_id=f"scale-{sample}",
+        customer=Customer(name="Scale Test", phone_number="+358401234567"),
+        delivery_address=DeliveryAddress(
+            city="Helsinki",
+            street="Huuvatie 1",
+            postal_code="00100",
+        ),
+        pickup_time=now + timedelta(minutes=30),
+        items=[ItemCreate(name="Burger", plu="PLU1", quantity=1)],
+        status=OrderStatusEntity.RECEIVED,
+        status_history=[
+            OrderStatusHistory(status=OrderStatusEntity.RECEIVED, timestamp=now),
+        ],
+    )
+
+
+async def measure(
+    engine: AsyncEngine,
+    samples: int,
+    profile: Profile,
+) -> Dict[str, Dict[str, Any]]:
+    """Latency of each repository method and of refreshing each view."""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        # ORDER BY random() scans the table, but only once per size.
+        items: List[Tuple[str, str]] = [
+            (row.order_id, row.plu)
+            for row in await session.execute(
+                select(Item.order_id, Item.plu).order_by(func.random()).limit(samples),
+            )
+        ]
+    order_ids = [order_id for order_id, _ in items]
+    # Accounts of middling popularity, whose order count grows with the data.
+    accounts = [f"account-{random.randrange(1000, 2000)}" for _ in range(samples)]
+    # An hour of a day in the middle of the generated period.
+    hour = profile.end - timedelta(days=profile.days // 2, hours=12)
+
+    calls: Dict[str, Call] = {
+        "order_get": lambda db, i: OrderRepository(db).get(order_ids[i]),
+        "order_list_account": lambda db, i: OrderRepository(db).list(
+            account=accounts[i],
+        ),
+        "order_list_hour": lambda db, i: OrderRepository(db).list(
+            from_date=hour,
+            to_date=hour + timedelta(hours=1),
+        ),
+        "order_list_preparing": lambda db, i: OrderRepository(db).list(
+            status=OrderStatus.PREPARING,
+        ),
+        "order_create": lambda db, i: OrderRepository(db).create(_new_order(i)),
+        "order_update": lambda db, i: OrderRepository(db).update(
+            order_ids[i],
+            OrderUpdate(status=OrderStatusEntity.CANCELLED),
+        ),
+        "item_get": lambda db, i: ItemRepository(db).get(*items[i]),
+        "item_update": lambda db, i: ItemRepository(db).update(
+            *items[i],
+            ItemUpdate(status=ItemStatusEntity.CANCELLED),
+        ),
+    }
+    async with session_factory() as session:
+        has_pg_trgm = await session.scalar(
+            text("SELECT EXISTS (SELECT FROM pg_extension WHERE extname = 'pg_trgm')"),
+        )
+    if has_pg_trgm:
+        # Six digits of the phone number of one of the accounts.
+        phones = [f"{random.randrange(1000, 2000):07d}"[1:] for _ in range(samples)]
+        calls["order_search_phone"] = lambda db, i: OrderRepository(db).search(
+            phones[i],
+            limit=20,
+        )
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, call in calls.items():
+        results[name] = await _time(session_factory, call, samples)
+
+    for view in MATERIALIZED_VIEWS:
+        async with engine.begin() as conn:
+            start = time.perf_counter()
+            await conn.execute(text(f"REFRESH MATERIALIZED VIEW {view}"))
+            seconds = time.perf_counter() - start
+        results[f"refresh_{view}"] = {"p50_ms": round(seconds * 1000, 3)}
+    return results
+
+
+async def _order_count(engine: AsyncEngine) -> int:
+    async with engine.connect() as conn:
+        return int(await conn.scalar(select(func.count()).select_from(Order)) or 0)
+
+
+async def run(
+    engine: AsyncEngine,
+    sizes: List[int],
+    samples: int,
+    workers: int,
+) -> List[Dict[str, Any]]:
+    """Grow the database to each size and measure it there."""
+    profile = Profile()
+    reports: List[Dict[str, Any]] = []
+    previous: Optional[Dict[str, Any]] = None
+    for size in sorted(sizes):
+        count = await _order_count(engine)
+        if count < size:
+            await generate(
+                engine,
+                size - count,
+                start=count,
+                workers=workers,
+                profile=profile,
+            )
+        results = await measure(engine, samples, profile)
+        if previous is not None:
+            for name, result in results.items():
+                result["p50_ratio"] = round(
+                    result["p50_ms"] / previous["results"][name]["p50_ms"],
+                    2,
+                )
+        report = {"orders": max(size, count), "results": results}
+        print(json.dumps(report), flush=True)
+        reports.append(report)
+        previous = report
+    return reports
+
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    engine = create_async_engine(str(settings.db_url))
+    try:
+        return await run(engine, args.sizes, args.samples, args.workers)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=lambda sizes: [int(size) for size in sizes.split(",")],
+        default=[10_000, 100_000, 1_000_000],
+        help="comma separated numbers of orders",
+    )
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    reports = asyncio.run(_run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Boot time, respawn time and memory of the gunicorn workers.
+
+Starts the app with `python -m huuva_backend`, i.e. under gunicorn, against
+the configured database, and reports the memory of each worker from
+`/proc/<pid>/smaps_rollup` (Linux only). Run it with and without a
+preloaded application::
+
+    python -m benchmarks.workers --workers 4 --output before.json
+    HUUVA_BACKEND_PRELOAD_APP=true python -m benchmarks.workers --workers 4
+
+`pss_mib` splits pages shared by several processes between them, so it is
+the memory that a worker really costs; `private_mib` is what it does not
+share with anyone.
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List, Set
+
+import httpx
+
+from benchmarks.load import Workload, _free_port
+
+STARTUP_COMPLETE = re.compile(r"\[(\d+)\] \[INFO\] Application startup complete")
+
+
+def _watch_startups(stream: IO[str], started: "queue.Queue[int]") -> None:
+    """Put the pid of every worker that completes its startup in `started`."""
+    for line in stream:
+        match = STARTUP_COMPLETE.search(line)
+        if match:
+            started.put(int(match.group(1)))
+
+
+def _wait_for_workers(
+    started: "queue.Queue[int]",
+    count: int,
+    timeout: float = 60,
+) -> Set[int]:
+    pids: Set[int] = set()
+    deadline = time.monotonic() + timeout
+    while len(pids) < count:
+        try:
+            pids.add(started.get(timeout=max(deadline - time.monotonic(), 0)))
+        except queue.Empty:
+            raise SystemExit("the workers did not start") from None
+    return pids
+
+
+def _memory_mib(pid: int) -> Dict[str, float]:
+    fields: Dict[str, int] = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":")
+        fields[name] = int(value.split()[0])
+    return {
+        "rss_mib": round(fields["Rss"] / 1024, 1),
+        "pss_mib": round(fields["Pss"] / 1024, 1),
+        "private_mib": round(
+            (fields["Private_Clean"] + fields["Private_Dirty"]) / 1024,
+            1,
+        ),
+    }
+
+
+def _warm_up(url: str, requests: int) -> None:
+    """Send requests, so every worker has served some before it is measured."""
+    workload = Workload(accounts=["benchmark-account"], items=3)
+    with httpx.Client(base_url=url) as client:
+        order_ids: List[str] = [
+            client.post("/api/orders/", json=workload.order_payload()).json()["id"]
+            for _ in range(10)
+        ]
+        for i in range(requests):
+            client.get(f"/api/orders/{order_ids[i % len(order_ids)]}")
+
+
+def measure(workers: int, warmup_requests: int) -> Dict[str, Any]:
+    """Start the server, and measure its boot, its workers and a respawn."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "HUUVA_BACKEND_PORT": str(port),
+        "HUUVA_BACKEND_WORKERS_COUNT": str(workers),
+        "HUUVA_BACKEND_RELOAD": "false",
+        "HUUVA_BACKEND_DB_ECHO": "false",
+    }
+    started: "queue.Queue[int]" = queue.Queue()
+    start = time.perf_counter()
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "huuva_backend"],
+        env=env,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+    )
+    assert process.stderr is not None  # noqa: S101
+    threading.Thread(
+        target=_watch_startups,
+        args=(process.stderr, started),
+        daemon=True,
+    ).start()
+    try:
+        pids = _wait_for_workers(started, workers)
+        boot_seconds = time.perf_counter() - start
+
+        _warm_up(f"http://127.0.0.1:{port}", warmup_requests)
+        memory = {pid: _memory_mib(pid) for pid in sorted(pids)}
+        master = _memory_mib(process.pid)
+
+        victim = min(pids)
+        start = time.perf_counter()
+        os.kill(victim, signal.SIGKILL)
+        _wait_for_workers(started, 1)
+        respawn_seconds = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "config": {
+            "workers": workers,
+            "preload_app": os.environ.get("HUUVA_BACKEND_PRELOAD_APP", "false"),
+            "warmup_requests": warmup_requests,
+        },
+        "boot_seconds": round(boot_seconds, 3),
+        "respawn_seconds": round(respawn_seconds, 3),
+        "master": master,
+        "workers": memory,
+        "mean_worker": {
+            key: round(sum(m[key] for m in memory.values()) / len(memory), 1)
+            for key in ("rss_mib", "pss_mib", "private_mib")
+        },
+    }
+
+
+def main() -> None:
+    """Entrypoint of the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--warmup-requests", type=int, default=200)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = measure(args.workers, args.warmup_requests)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,28 @@
+import os
+import shutil
+
 import uvicorn
 
-from huuva_backend.gunicorn_runner import GunicornApplication
+from huuva_backend.gunicorn_runner import GunicornApplication, child_exit
 from huuva_backend.settings import settings
 
 
+def set_multiproc_dir() -> None:
+    """
+    Make every worker write its Prometheus metrics to `settings.prometheus_dir`.
+
+    It must run before prometheus_client is imported, which happens when the
+    workers load the app. Leftover files of a previous run are removed.
+    """
+    shutil.rmtree(settings.prometheus_dir, ignore_errors=True)
+    settings.prometheus_dir.mkdir(parents=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(settings.prometheus_dir.absolute())
+
+
 def main() -> None:
     """Entrypoint of the application."""
+    if settings.metrics_enabled:
+        set_multiproc_dir()
     if settings.reload:
         uvicorn.run(
             "huuva_backend.web.application:get_app",
@@ -29,6 +46,8 @@ def main() -> None:
             accesslog="-",
             loglevel=settings.log_level.value.lower(),
             access_log_format='%r "-" %s "-" %Tf',
+            child_exit=child_exit,
+            preload_app=settings.preload_app,
         ).run()
 
 
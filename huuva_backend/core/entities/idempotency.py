@@ -0,0 +1,8 @@
+from typing import Any
+
+from huuva_backend.core.entities.base import OrmSchema
+
+
+class StoredResponse(OrmSchema):
+    status_code: int
+    response: Any
@@ -21,9 +21,19 @@ class ItemUpdate(BaseSchema):
     status: ItemStatus
 
 
+class ItemStatusChange(BaseSchema):
+    order_id: str
+    plu: str
+    status: ItemStatus
+
+
 class Item(OrmSchema):
     name: str
     plu: str
     quantity: int
     status: ItemStatus
     status_history: List[ItemStatusHistory]
+
+
+class OrderItem(Item):
+    order_id: str
@@ -1,27 +1,37 @@
+from typing import Any, Dict
+
 from huuva_backend.core.entities.order import Customer, DeliveryAddress, OrderCreate
 from huuva_backend.core.entities.order import Order as OrderEntity
 from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEntity
 from huuva_backend.core.entities.order_status import OrderStatusHistory
 from huuva_backend.db.mappings.item import item_db_to_entity
 from huuva_backend.db.models.order import Order
+from huuva_backend.db.models.order_status import OrderStatus
 
 
-def order_create_to_db(order_create: OrderCreate) -> Order:
-    """Convert an OrderCreate schema to a database model Order."""
-    return Order(
-        id=order_create.id,
-        created_at=order_create.created,
-        account=order_create.account,
-        brand_id=order_create.brand_id,
-        channel_order_id=order_create.channel_order_id,
-        customer_name=order_create.customer.name,
-        customer_phone=order_create.customer.phone_number,
-        delivery_city=order_create.delivery_address.city,
-        delivery_street=order_create.delivery_address.street,
-        delivery_postal_code=order_create.delivery_address.postal_code,
-        pickup_time=order_create.pickup_time,
-        status=order_create.status,
-    )
+def order_create_to_row(order_create: OrderCreate) -> Dict[str, Any]:
+    """
+    Convert an OrderCreate schema to insert values for the orders table.
+
+    A missing `id` or `created` is left out, so the column defaults apply.
+    """
+    row: Dict[str, Any] = {
+        "account": order_create.account,
+        "brand_id": order_create.brand_id,
+        "channel_order_id": order_create.channel_order_id,
+        "customer_name": order_create.customer.name,
+        "customer_phone": order_create.customer.phone_number,
+        "delivery_city": order_create.delivery_address.city,
+        "delivery_street": order_create.delivery_address.street,
+        "delivery_postal_code": order_create.delivery_address.postal_code,
+        "pickup_time": order_create.pickup_time,
+        "status": OrderStatus(order_create.status.value),
+    }
+    if order_create.id is not None:
+        row["id"] = order_create.id
+    if order_create.created is not None:
+        row["created_at"] = order_create.created
+    return row
 
 
 def order_db_to_entity(order: Order) -> OrderEntity:
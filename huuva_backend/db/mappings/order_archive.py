@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Union
+
+from huuva_backend.db.models.item import Item
+from huuva_backend.db.models.item_status import ItemStatus, ItemStatusHistory
+from huuva_backend.db.models.order import Order
+from huuva_backend.db.models.order_archive import OrderArchive
+from huuva_backend.db.models.order_status import OrderStatus, OrderStatusHistory
+
+
+def _history_to_pairs(
+    history: Sequence[Union[OrderStatusHistory, ItemStatusHistory]],
+) -> List[List[str]]:
+    """Fold status history rows into compact `[status, timestamp]` pairs."""
+    return [[entry.status.name, entry.timestamp.isoformat()] for entry in history]
+
+
+def order_db_to_archive(order: Order) -> Dict[str, Any]:
+    """Convert an Order (with items and histories loaded) to archive row values."""
+    return {
+        "id": order.id,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+        "account": order.account,
+        "brand_id": order.brand_id,
+        "channel_order_id": order.channel_order_id,
+        "customer_name": order.customer_name,
+        "customer_phone": order.customer_phone,
+        "delivery_city": order.delivery_city,
+        "delivery_street": order.delivery_street,
+        "delivery_postal_code": order.delivery_postal_code,
+        "pickup_time": order.pickup_time,
+        "status": order.status,
+        "items": [
+            {
+                "plu": item.plu,
+                "name": item.name,
+                "quantity": item.quantity,
+                "status": item.status.name,
+                "status_history": _history_to_pairs(item.status_history),
+            }
+            for item in order.items
+        ],
+        "status_history": _history_to_pairs(order.status_history),
+    }
+
+
+def order_archive_to_db(archive: OrderArchive) -> Order:
+    """
+    Rebuild a transient Order graph from an archived order.
+
+    The result is never added to the session; it only exists so archived
+    orders can be read through the same mapping as live ones.
+    """
+    order = Order(
+        id=archive.id,
+        created_at=archive.created_at,
+        updated_at=archive.updated_at,
+        account=archive.account,
+        brand_id=archive.brand_id,
+        channel_order_id=archive.channel_order_id,
+        customer_name=archive.customer_name,
+        customer_phone=archive.customer_phone,
+        delivery_city=archive.delivery_city,
+        delivery_street=archive.delivery_street,
+        delivery_postal_code=archive.delivery_postal_code,
+        pickup_time=archive.pickup_time,
+        status=archive.status,
+    )
+    order.items = [
+        Item(
+            order_id=archive.id,
+            plu=item["plu"],
+            name=item["name"],
+            quantity=item["quantity"],
+            status=ItemStatus[item["status"]],
+            status_history=[
+                ItemStatusHistory(
+                    order_id=archive.id,
+                    item_plu=item["plu"],
+                    status=ItemStatus[status],
+                    timestamp=datetime.fromisoformat(timestamp),
+                )
+                for status, timestamp in item["status_history"]
+            ],
+        )
+        for item in archive.items
+    ]
+    order.status_history = [
+        OrderStatusHistory(
+            order_id=archive.id,
+            status=OrderStatus[status],
+            timestamp=datetime.fromisoformat(timestamp),
+        )
+        for status, timestamp in archive.status_history
+    ]
+    return order
@@ -1,11 +1,13 @@
 import asyncio
 from logging.config import fileConfig
+from typing import Any, Optional
 
 from alembic import context
 from sqlalchemy.ext.asyncio.engine import create_async_engine
 from sqlalchemy.future import Connection
 from huuva_backend.db.meta import meta
 from huuva_backend.db.models import load_all_models
+from huuva_backend.db.partitions import is_partition
 from huuva_backend.settings import settings
 
 # this is the Alembic Config object, which provides
@@ -22,6 +24,22 @@ if config.config_file_name is not None:
 target_metadata = meta
 
 
+def include_object(
+    object_: Any,
+    name: Optional[str],
+    type_: str,
+    reflected: bool,
+    compare_to: Any,
+) -> bool:
+    """
+    Leave the partitions of the history tables out of autogenerate.
+
+    They are created at runtime and by migrations, not from the models, so
+    autogenerate would otherwise propose dropping them.
+    """
+    return not (type_ == "table" and name is not None and is_partition(name))
+
+
 async def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -39,6 +57,7 @@ async def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -51,7 +70,11 @@ def do_run_migrations(connection: Connection) -> None:
 
     :param connection: connection to the database.
     """
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
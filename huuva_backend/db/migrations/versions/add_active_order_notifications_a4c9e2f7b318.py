@@ -0,0 +1,65 @@
+"""add active order notifications.
+
+Revision ID: a4c9e2f7b318
+Revises: f6b2d8e1a347
+Create Date: 2025-05-20 09:14:52.310458
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4c9e2f7b318"
+down_revision = "f6b2d8e1a347"
+branch_labels = None
+depends_on = None
+
+# RECEIVED, PREPARING and READY.
+ACTIVE = "('RECEIVED', 'PREPARING', 'READY')"
+# Only connections of apps with the active order board notify, see
+# `huuva_backend.db.notifications`.
+NOTIFYING = "current_setting('huuva_backend.notify_active_orders', true) = 'on'"
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION notify_active_order() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_notify('active_orders', to_jsonb(NEW) ->> TG_ARGV[0]);
+        RETURN NULL;
+    END $$;
+    """,
+    )
+    op.execute(
+        f"""
+    CREATE TRIGGER orders_notify_active_insert AFTER INSERT ON orders
+    FOR EACH ROW WHEN ({NOTIFYING} AND NEW.status IN {ACTIVE})
+    EXECUTE FUNCTION notify_active_order('id');
+    """,
+    )
+    op.execute(
+        f"""
+    CREATE TRIGGER orders_notify_active_update AFTER UPDATE OF status ON orders
+    FOR EACH ROW WHEN ({NOTIFYING} AND
+        (OLD.status IN {ACTIVE} OR NEW.status IN {ACTIVE}))
+    EXECUTE FUNCTION notify_active_order('id');
+    """,
+    )
+    op.execute(
+        f"""
+    CREATE TRIGGER items_notify_active_update AFTER UPDATE OF status ON items
+    FOR EACH ROW WHEN ({NOTIFYING} AND OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_active_order('order_id');
+    """,
+    )
+
+
+def downgrade() -> None:
+    """Undo the migration."""
+    op.execute("DROP TRIGGER IF EXISTS items_notify_active_update ON items;")
+    op.execute("DROP TRIGGER IF EXISTS orders_notify_active_update ON orders;")
+    op.execute("DROP TRIGGER IF EXISTS orders_notify_active_insert ON orders;")
+    op.execute("DROP FUNCTION IF EXISTS notify_active_order();")
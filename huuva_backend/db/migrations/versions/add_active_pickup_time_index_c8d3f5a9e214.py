@@ -0,0 +1,32 @@
+"""add active pickup time index.
+
+Revision ID: c8d3f5a9e214
+Revises: a4c9e2f7b318
+Create Date: 2025-05-22 10:03:17.648201
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c8d3f5a9e214"
+down_revision = "a4c9e2f7b318"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    op.create_index(
+        "ix_orders_active_pickup_time",
+        "orders",
+        ["pickup_time"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('RECEIVED', 'PREPARING', 'READY')"),
+    )
+
+
+def downgrade() -> None:
+    """Undo the migration."""
+    op.drop_index("ix_orders_active_pickup_time", table_name="orders")
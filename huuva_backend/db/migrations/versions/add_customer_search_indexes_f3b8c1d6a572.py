@@ -0,0 +1,39 @@
+"""add customer search indexes.
+
+Revision ID: f3b8c1d6a572
+Revises: e2a7b9c4d165
+Create Date: 2025-05-26 11:48:05.392714
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f3b8c1d6a572"
+down_revision = "e2a7b9c4d165"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("customer_name", "customer_phone")
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    # Fails where the contrib modules are not installed, rather than leaving
+    # the search without its indexes.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in COLUMNS:
+        op.create_index(
+            f"ix_orders_{column}_trgm",
+            "orders",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Undo the migration."""
+    for column in COLUMNS:
+        op.drop_index(f"ix_orders_{column}_trgm", table_name="orders")
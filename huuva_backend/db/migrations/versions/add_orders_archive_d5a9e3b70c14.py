@@ -0,0 +1,231 @@
+"""add orders archive.
+
+Revision ID: d5a9e3b70c14
+Revises: c2e8f4a1d905
+Create Date: 2025-05-12 10:04:51.226318
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "d5a9e3b70c14"
+down_revision = "c2e8f4a1d905"
+branch_labels = None
+depends_on = None
+
+VIEWS = (
+    "order_status_duration_avg",
+    "item_status_duration_avg",
+    "order_hourly_throughput",
+    "customer_order_count",
+)
+
+# Row sources of the analytics views, with and without archived orders.
+ORDERS_WITH_ARCHIVE = """
+    (
+        SELECT account, created_at FROM orders
+        UNION ALL
+        SELECT account, created_at FROM orders_archive
+    ) AS all_orders
+"""
+ORDERS_WITHOUT_ARCHIVE = "orders"
+
+ORDER_HISTORY_WITH_ARCHIVE = """
+    (
+        SELECT order_id, status, timestamp FROM order_status_history
+        UNION ALL
+        SELECT a.id, h ->> 0, (h ->> 1)::timestamptz
+        FROM orders_archive a
+        CROSS JOIN LATERAL jsonb_array_elements(a.status_history) h
+    ) AS all_history
+"""
+ORDER_HISTORY_WITHOUT_ARCHIVE = "order_status_history"
+
+ITEM_HISTORY_WITH_ARCHIVE = """
+    (
+        SELECT order_id, item_plu, status, timestamp FROM item_status_history
+        UNION ALL
+        SELECT a.id, i ->> 'plu', h ->> 0, (h ->> 1)::timestamptz
+        FROM orders_archive a
+        CROSS JOIN LATERAL jsonb_array_elements(a.items) i
+        CROSS JOIN LATERAL jsonb_array_elements(i -> 'status_history') h
+    ) AS all_history
+"""
+ITEM_HISTORY_WITHOUT_ARCHIVE = "item_status_history"
+
+
+def _drop_views() -> None:
+    for view in VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view};")
+
+
+def _create_views(orders: str, order_history: str, item_history: str) -> None:
+    op.execute(
+        f"""
+    CREATE MATERIALIZED VIEW order_status_duration_avg AS
+    WITH status_periods AS (
+        SELECT
+            order_id,
+            status,
+            timestamp AS start_time,
+            LEAD(timestamp) OVER (PARTITION BY order_id ORDER BY timestamp) AS end_time
+        FROM {order_history}
+    )
+    SELECT
+        status,
+        AVG(EXTRACT(EPOCH FROM (end_time - start_time))) AS avg_duration_seconds
+    FROM status_periods
+    WHERE
+        end_time IS NOT NULL
+        AND status IN ('RECEIVED', 'PREPARING', 'READY')
+    GROUP BY status;
+    """
+    )
+    op.execute(
+        f"""
+    CREATE MATERIALIZED VIEW item_status_duration_avg AS
+    WITH status_periods AS (
+        SELECT
+            order_id,
+            item_plu,
+            status,
+            timestamp AS start_time,
+            LEAD(timestamp) OVER (PARTITION BY order_id, item_plu ORDER BY timestamp) AS end_time
+        FROM {item_history}
+    )
+    SELECT
+        status,
+        AVG(EXTRACT(EPOCH FROM (end_time - start_time))) AS avg_duration_seconds
+    FROM status_periods
+    WHERE
+        end_time IS NOT NULL
+        AND status IN ('ORDERED', 'PREPARING', 'READY')
+    GROUP BY status;
+    """
+    )
+    op.execute(
+        f"""
+    CREATE MATERIALIZED VIEW order_hourly_throughput AS
+    SELECT
+        DATE_TRUNC('hour', created_at) AS hour,
+        COUNT(*) AS order_count
+    FROM {orders}
+    GROUP BY DATE_TRUNC('hour', created_at)
+    ORDER BY hour;
+    """
+    )
+    op.execute(
+        f"""
+    CREATE MATERIALIZED VIEW customer_order_count AS
+    SELECT
+        account,
+        COUNT(*) AS order_count,
+        MIN(created_at) AS first_order_at,
+        MAX(created_at) AS last_order_at
+    FROM {orders}
+    GROUP BY account;
+    """
+    )
+
+    op.execute(
+        "CREATE INDEX idx_order_status_duration_avg_status "
+        "ON order_status_duration_avg (status);"
+    )
+    op.execute(
+        "CREATE INDEX idx_item_status_duration_avg_status "
+        "ON item_status_duration_avg (status);"
+    )
+    op.execute(
+        "CREATE INDEX idx_order_hourly_throughput_hour "
+        "ON order_hourly_throughput (hour);"
+    )
+    op.execute(
+        "CREATE INDEX idx_customer_order_count_account "
+        "ON customer_order_count (account);"
+    )
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("account", sa.String(), nullable=False),
+        sa.Column("brand_id", sa.String(), nullable=False),
+        sa.Column("channel_order_id", sa.String(), nullable=False),
+        sa.Column("customer_name", sa.String(), nullable=False),
+        sa.Column("customer_phone", sa.String(), nullable=False),
+        sa.Column("pickup_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("delivery_city", sa.String(), nullable=False),
+        sa.Column("delivery_street", sa.String(), nullable=False),
+        sa.Column("delivery_postal_code", sa.String(), nullable=False),
+        sa.Column("items", postgresql.JSONB(), nullable=False),
+        sa.Column("status_history", postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    _drop_views()
+    _create_views(
+        ORDERS_WITH_ARCHIVE,
+        ORDER_HISTORY_WITH_ARCHIVE,
+        ITEM_HISTORY_WITH_ARCHIVE,
+    )
+
+
+def downgrade() -> None:
+    """Undo the migration, moving archived orders back into the hot tables."""
+    _drop_views()
+
+    op.execute(
+        """
+    INSERT INTO orders (
+        id, created_at, updated_at, account, brand_id, channel_order_id,
+        customer_name, customer_phone, pickup_time, status,
+        delivery_city, delivery_street, delivery_postal_code
+    )
+    SELECT
+        id, created_at, updated_at, account, brand_id, channel_order_id,
+        customer_name, customer_phone, pickup_time, status,
+        delivery_city, delivery_street, delivery_postal_code
+    FROM orders_archive;
+    """
+    )
+    op.execute(
+        """
+    INSERT INTO items (order_id, plu, name, quantity, status)
+    SELECT a.id, i ->> 'plu', i ->> 'name', (i ->> 'quantity')::int, i ->> 'status'
+    FROM orders_archive a
+    CROSS JOIN LATERAL jsonb_array_elements(a.items) i;
+    """
+    )
+    op.execute(
+        """
+    INSERT INTO order_status_history (id, order_id, status, timestamp)
+    SELECT gen_random_uuid()::text, a.id, h ->> 0, (h ->> 1)::timestamptz
+    FROM orders_archive a
+    CROSS JOIN LATERAL jsonb_array_elements(a.status_history) h;
+    """
+    )
+    op.execute(
+        """
+    INSERT INTO item_status_history (id, order_id, item_plu, status, timestamp)
+    SELECT gen_random_uuid()::text, a.id, i ->> 'plu', h ->> 0, (h ->> 1)::timestamptz
+    FROM orders_archive a
+    CROSS JOIN LATERAL jsonb_array_elements(a.items) i
+    CROSS JOIN LATERAL jsonb_array_elements(i -> 'status_history') h;
+    """
+    )
+    op.drop_table("orders_archive")
+
+    _create_views(
+        ORDERS_WITHOUT_ARCHIVE,
+        ORDER_HISTORY_WITHOUT_ARCHIVE,
+        ITEM_HISTORY_WITHOUT_ARCHIVE,
+    )
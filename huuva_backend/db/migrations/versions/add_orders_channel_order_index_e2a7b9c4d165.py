@@ -0,0 +1,31 @@
+"""add orders channel order index.
+
+Revision ID: e2a7b9c4d165
+Revises: c8d3f5a9e214
+Create Date: 2025-05-23 14:21:40.117935
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e2a7b9c4d165"
+down_revision = "c8d3f5a9e214"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    # Fails, naming one of them, if a channel order was taken more than once.
+    op.create_index(
+        "ix_orders_brand_channel_order_id",
+        "orders",
+        ["brand_id", "channel_order_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Undo the migration."""
+    op.drop_index("ix_orders_brand_channel_order_id", table_name="orders")
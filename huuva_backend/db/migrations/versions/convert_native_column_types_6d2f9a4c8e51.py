@@ -0,0 +1,221 @@
+"""convert to native column types.
+
+Revision `native_types@head`, on a branch of its own that is only applied on
+request. It stores statuses as SMALLINT and generated history ids as native
+UUID; set `HUUVA_BACKEND_DB_NATIVE_TYPES` to match::
+
+    alembic upgrade native_types@head
+    alembic downgrade native_types@base
+
+Revision ID: 6d2f9a4c8e51
+Revises:
+Create Date: 2025-05-27 10:02:44.518306
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6d2f9a4c8e51"
+down_revision = None
+branch_labels = ("native_types",)
+depends_on = "f3b8c1d6a572"
+
+# Status names in the order of their integer values.
+ORDER_STATUSES = ("RECEIVED", "PREPARING", "READY", "PICKED_UP", "CANCELLED")
+ITEM_STATUSES = ("ORDERED", "PREPARING", "READY", "PICKED_UP", "CANCELLED")
+
+STATUS_COLUMNS = (
+    ("orders", ORDER_STATUSES),
+    ("orders_archive", ORDER_STATUSES),
+    ("order_status_history", ORDER_STATUSES),
+    ("items", ITEM_STATUSES),
+    ("item_status_history", ITEM_STATUSES),
+)
+HISTORY_TABLES = ("order_status_history", "item_status_history")
+
+# The duration views, the partial indexes and the notification triggers read
+# the status columns and must be rebuilt around the type change. Archived
+# histories keep their statuses by name, so the views keep working on names.
+ORDER_STATUS_DURATION_VIEW = """
+    CREATE MATERIALIZED VIEW order_status_duration_avg AS
+    WITH status_periods AS (
+        SELECT
+            order_id,
+            status,
+            timestamp AS start_time,
+            LEAD(timestamp) OVER (PARTITION BY order_id ORDER BY timestamp) AS end_time
+        FROM (
+            SELECT order_id, {status} AS status, timestamp FROM order_status_history
+            UNION ALL
+            SELECT a.id, h ->> 0, (h ->> 1)::timestamptz
+            FROM orders_archive a
+            CROSS JOIN LATERAL jsonb_array_elements(a.status_history) h
+        ) AS all_history
+    )
+    SELECT
+        status,
+        AVG(EXTRACT(EPOCH FROM (end_time - start_time))) AS avg_duration_seconds
+    FROM status_periods
+    WHERE
+        end_time IS NOT NULL
+        AND status IN ('RECEIVED', 'PREPARING', 'READY')
+    GROUP BY status;
+"""
+
+ITEM_STATUS_DURATION_VIEW = """
+    CREATE MATERIALIZED VIEW item_status_duration_avg AS
+    WITH status_periods AS (
+        SELECT
+            order_id,
+            item_plu,
+            status,
+            timestamp AS start_time,
+            LEAD(timestamp) OVER (PARTITION BY order_id, item_plu ORDER BY timestamp) AS end_time
+        FROM (
+            SELECT order_id, item_plu, {status} AS status, timestamp
+            FROM item_status_history
+            UNION ALL
+            SELECT a.id, i ->> 'plu', h ->> 0, (h ->> 1)::timestamptz
+            FROM orders_archive a
+            CROSS JOIN LATERAL jsonb_array_elements(a.items) i
+            CROSS JOIN LATERAL jsonb_array_elements(i -> 'status_history') h
+        ) AS all_history
+    )
+    SELECT
+        status,
+        AVG(EXTRACT(EPOCH FROM (end_time - start_time))) AS avg_duration_seconds
+    FROM status_periods
+    WHERE
+        end_time IS NOT NULL
+        AND status IN ('ORDERED', 'PREPARING', 'READY')
+    GROUP BY status;
+"""
+
+
+# Only connections of apps with the active order board notify, see
+# `huuva_backend.db.notifications`.
+NOTIFYING = "current_setting('huuva_backend.notify_active_orders', true) = 'on'"
+
+# Partial indexes on the active statuses: (name, columns).
+ACTIVE_INDEXES = (
+    ("ix_orders_active_created_at", [sa.text("created_at DESC")]),
+    ("ix_orders_active_pickup_time", ["pickup_time"]),
+)
+
+
+def _names_array(names: tuple[str, ...]) -> str:
+    quoted = ", ".join(f"'{name}'" for name in names)
+    return f"ARRAY[{quoted}]::text[]"
+
+
+def _drop_dependents() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS order_status_duration_avg;")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS item_status_duration_avg;")
+    for name, _ in ACTIVE_INDEXES:
+        op.drop_index(name, table_name="orders")
+    op.execute("DROP TRIGGER orders_notify_active_insert ON orders;")
+    op.execute("DROP TRIGGER orders_notify_active_update ON orders;")
+    op.execute("DROP TRIGGER items_notify_active_update ON items;")
+
+
+def _create_dependents(order_status: str, item_status: str, active: str) -> None:
+    op.execute(ORDER_STATUS_DURATION_VIEW.format(status=order_status))
+    op.execute(ITEM_STATUS_DURATION_VIEW.format(status=item_status))
+    op.execute(
+        "CREATE INDEX idx_order_status_duration_avg_status "
+        "ON order_status_duration_avg (status);"
+    )
+    op.execute(
+        "CREATE INDEX idx_item_status_duration_avg_status "
+        "ON item_status_duration_avg (status);"
+    )
+    for name, columns in ACTIVE_INDEXES:
+        op.create_index(
+            name,
+            "orders",
+            columns,
+            unique=False,
+            postgresql_where=sa.text(f"status IN {active}"),
+        )
+    op.execute(
+        f"""
+    CREATE TRIGGER orders_notify_active_insert AFTER INSERT ON orders
+    FOR EACH ROW WHEN ({NOTIFYING} AND NEW.status IN {active})
+    EXECUTE FUNCTION notify_active_order('id');
+    """,
+    )
+    op.execute(
+        f"""
+    CREATE TRIGGER orders_notify_active_update AFTER UPDATE OF status ON orders
+    FOR EACH ROW WHEN ({NOTIFYING} AND
+        (OLD.status IN {active} OR NEW.status IN {active}))
+    EXECUTE FUNCTION notify_active_order('id');
+    """,
+    )
+    op.execute(
+        f"""
+    CREATE TRIGGER items_notify_active_update AFTER UPDATE OF status ON items
+    FOR EACH ROW WHEN ({NOTIFYING} AND OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_active_order('order_id');
+    """,
+    )
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    _drop_dependents()
+
+    for table, names in STATUS_COLUMNS:
+        op.alter_column(
+            table,
+            "status",
+            type_=sa.SmallInteger(),
+            existing_type=sa.String(),
+            existing_nullable=False,
+            postgresql_using=(
+                f"array_position({_names_array(names)}, status::text)::smallint"
+            ),
+        )
+    for table in HISTORY_TABLES:
+        op.alter_column(
+            table,
+            "id",
+            type_=sa.Uuid(),
+            existing_type=sa.String(),
+            existing_nullable=False,
+            postgresql_using="id::uuid",
+        )
+
+    _create_dependents(
+        f"({_names_array(ORDER_STATUSES)})[status]",
+        f"({_names_array(ITEM_STATUSES)})[status]",
+        "(1, 2, 3)",
+    )
+
+
+def downgrade() -> None:
+    """Undo the migration."""
+    _drop_dependents()
+
+    for table, names in STATUS_COLUMNS:
+        op.alter_column(
+            table,
+            "status",
+            type_=sa.String(),
+            existing_type=sa.SmallInteger(),
+            existing_nullable=False,
+            postgresql_using=f"({_names_array(names)})[status]",
+        )
+    for table in HISTORY_TABLES:
+        op.alter_column(
+            table,
+            "id",
+            type_=sa.String(),
+            existing_type=sa.Uuid(),
+            existing_nullable=False,
+            postgresql_using="id::text",
+        )
+
+    _create_dependents("status", "status", "('RECEIVED', 'PREPARING', 'READY')")
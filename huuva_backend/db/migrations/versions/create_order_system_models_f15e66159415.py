@@ -12,7 +12,8 @@ from alembic import op
 # revision identifiers, used by Alembic.
 revision = "f15e66159415"
 down_revision = None
-branch_labels = None
+# `alembic upgrade main@head`; `native_types` is the other, opt-in branch.
+branch_labels = ("main",)
 depends_on = None
 
 
@@ -0,0 +1,211 @@
+"""partition status history tables by month.
+
+Revision ID: c2e8f4a1d905
+Revises: b7c41e9d2a63
+Create Date: 2025-05-08 14:37:02.871530
+
+"""
+
+from datetime import datetime, timezone
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c2e8f4a1d905"
+down_revision = "b7c41e9d2a63"
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created ahead of the current month.
+MONTHS_AHEAD = 3
+
+ORDER_STATUS_DURATION_VIEW = """
+    CREATE MATERIALIZED VIEW order_status_duration_avg AS
+    WITH status_periods AS (
+        SELECT
+            order_id,
+            status,
+            timestamp AS start_time,
+            LEAD(timestamp) OVER (PARTITION BY order_id ORDER BY timestamp) AS end_time
+        FROM order_status_history
+    )
+    SELECT
+        status,
+        AVG(EXTRACT(EPOCH FROM (end_time - start_time))) AS avg_duration_seconds
+    FROM status_periods
+    WHERE
+        end_time IS NOT NULL
+        AND status IN ('RECEIVED', 'PREPARING', 'READY')
+    GROUP BY status;
+"""
+
+ITEM_STATUS_DURATION_VIEW = """
+    CREATE MATERIALIZED VIEW item_status_duration_avg AS
+    WITH status_periods AS (
+        SELECT
+            order_id,
+            item_plu,
+            status,
+            timestamp AS start_time,
+            LEAD(timestamp) OVER (PARTITION BY order_id, item_plu ORDER BY timestamp) AS end_time
+        FROM item_status_history
+    )
+    SELECT
+        status,
+        AVG(EXTRACT(EPOCH FROM (end_time - start_time))) AS avg_duration_seconds
+    FROM status_periods
+    WHERE
+        end_time IS NOT NULL
+        AND status IN ('ORDERED', 'PREPARING', 'READY')
+    GROUP BY status;
+"""
+
+
+def _month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _drop_duration_views() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS order_status_duration_avg;")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS item_status_duration_avg;")
+
+
+def _create_duration_views() -> None:
+    op.execute(ORDER_STATUS_DURATION_VIEW)
+    op.execute(ITEM_STATUS_DURATION_VIEW)
+    op.execute(
+        "CREATE INDEX idx_order_status_duration_avg_status "
+        "ON order_status_duration_avg (status);"
+    )
+    op.execute(
+        "CREATE INDEX idx_item_status_duration_avg_status "
+        "ON item_status_duration_avg (status);"
+    )
+
+
+def _history_columns(table: str) -> list[sa.Column[Any]]:
+    columns: list[sa.Column[Any]] = [
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("order_id", sa.String(), nullable=False),
+    ]
+    if table == "item_status_history":
+        columns.append(sa.Column("item_plu", sa.String(), nullable=False))
+    columns += [
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.TIMESTAMP(timezone=True), nullable=False),
+    ]
+    return columns
+
+
+def _foreign_key(table: str) -> sa.ForeignKeyConstraint:
+    if table == "item_status_history":
+        return sa.ForeignKeyConstraint(
+            ["order_id", "item_plu"],
+            ["items.order_id", "items.plu"],
+            name="item_status_history_order_id_item_plu_fkey",
+            ondelete="CASCADE",
+        )
+    return sa.ForeignKeyConstraint(
+        ["order_id"],
+        ["orders.id"],
+        name="order_status_history_order_id_fkey",
+        ondelete="CASCADE",
+    )
+
+
+def _create_indexes(table: str) -> None:
+    if table == "item_status_history":
+        op.create_index(
+            "ix_item_status_history_order_id_item_plu",
+            table,
+            ["order_id", "item_plu"],
+            unique=False,
+        )
+    else:
+        op.create_index(
+            "ix_order_status_history_order_id",
+            table,
+            ["order_id"],
+            unique=False,
+        )
+
+
+def _partition_table(table: str) -> None:
+    """Replace `table` with a copy range-partitioned by month on `timestamp`."""
+    new_table = f"{table}_partitioned"
+    op.create_table(
+        new_table,
+        *_history_columns(table),
+        _foreign_key(table),
+        sa.PrimaryKeyConstraint("id", "timestamp", name=f"{new_table}_pkey"),
+        postgresql_partition_by="RANGE (timestamp)",
+    )
+
+    # One partition per month that already holds rows, plus the upcoming ones.
+    existing = op.get_bind().scalars(
+        sa.text(
+            "SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC') "
+            f"FROM {table}"
+        )
+    )
+    current = _month_start(datetime.now(timezone.utc))
+    months = {month.replace(tzinfo=timezone.utc) for month in existing}
+    months.update(_add_months(current, offset) for offset in range(MONTHS_AHEAD + 1))
+    for month in sorted(months):
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {new_table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {new_table} DEFAULT")
+
+    op.execute(f"INSERT INTO {new_table} SELECT * FROM {table}")
+    op.drop_table(table)
+    op.rename_table(new_table, table)
+    op.execute(
+        f"ALTER TABLE {table} RENAME CONSTRAINT {new_table}_pkey TO {table}_pkey"
+    )
+    _create_indexes(table)
+
+
+def _unpartition_table(table: str) -> None:
+    """Replace the partitioned `table` with a plain heap table."""
+    new_table = f"{table}_plain"
+    op.create_table(
+        new_table,
+        *_history_columns(table),
+        _foreign_key(table),
+        sa.PrimaryKeyConstraint("id", name=f"{new_table}_pkey"),
+    )
+    op.execute(f"INSERT INTO {new_table} SELECT * FROM {table}")
+    # Dropping the parent drops all of its partitions.
+    op.drop_table(table)
+    op.rename_table(new_table, table)
+    op.execute(
+        f"ALTER TABLE {table} RENAME CONSTRAINT {new_table}_pkey TO {table}_pkey"
+    )
+    _create_indexes(table)
+
+
+def upgrade() -> None:
+    """Run the migration."""
+    _drop_duration_views()
+    _partition_table("order_status_history")
+    _partition_table("item_status_history")
+    _create_duration_views()
+
+
+def downgrade() -> None:
+    """Undo the migration."""
+    _drop_duration_views()
+    _unpartition_table("item_status_history")
+    _unpartition_table("order_status_history")
+    _create_duration_views()
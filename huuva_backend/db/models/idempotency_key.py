@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import TIMESTAMP, Index, LargeBinary, SmallInteger, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from huuva_backend.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response stored for a request sent with an `Idempotency-Key` header.
+
+    `fingerprint` is a SHA-256 digest of the request payload, so that a key
+    reused for a different request can be told apart from a retry. Rows are
+    ignored once `expires_at` has passed and purged by the scheduler.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index(
+            "ix_idempotency_keys_expires_at",
+            "expires_at",
+            unique=False,
+        ),
+    )
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    fingerprint: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    status_code: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    response: Mapped[Any] = mapped_column(JSONB, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
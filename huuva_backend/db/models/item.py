@@ -3,12 +3,13 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, List
 from uuid import uuid4
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Integer, String, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import Enum as SQLAlchemyEnum
 
 from huuva_backend.db.base import Base
 from huuva_backend.db.models.item_status import ItemStatus
+from huuva_backend.db.notifications import ITEMS_UPDATE_TRIGGER_DDL
+from huuva_backend.db.types import status_type
 
 if TYPE_CHECKING:
     from huuva_backend.db.models.item_status import ItemStatusHistory
@@ -29,7 +30,7 @@ class Item(Base):
     name: Mapped[str] = mapped_column(String, nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     status: Mapped[ItemStatus] = mapped_column(
-        SQLAlchemyEnum(ItemStatus, native_enum=False),
+        status_type(ItemStatus),
         nullable=False,
         default=ItemStatus.ORDERED,
     )
@@ -38,4 +39,9 @@ class Item(Base):
     status_history: Mapped[List["ItemStatusHistory"]] = relationship(
         back_populates="item",
         cascade="all, delete-orphan",
+        # History is partitioned, so rows come back partition by partition.
+        order_by="ItemStatusHistory.timestamp",
     )
+
+
+event.listen(Item.__table__, "after_create", ITEMS_UPDATE_TRIGGER_DDL)
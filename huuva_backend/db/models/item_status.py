@@ -5,11 +5,12 @@ from enum import IntEnum
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from sqlalchemy import TIMESTAMP, ForeignKeyConstraint, Index
+from sqlalchemy import TIMESTAMP, ForeignKeyConstraint, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import Enum as SQLAlchemyEnum
 
 from huuva_backend.db.base import Base
+from huuva_backend.db.partitions import DEFAULT_PARTITION_DDL
+from huuva_backend.db.types import generated_id_type, status_type
 
 if TYPE_CHECKING:
     from huuva_backend.db.models.item import Item
@@ -37,9 +38,12 @@ class ItemStatusHistory(Base):
             "item_plu",
             unique=False,
         ),
+        # Monthly range partitions are managed by `PartitionService`.
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
     id: Mapped[str] = mapped_column(
+        generated_id_type(),
         primary_key=True,
         default=lambda: str(uuid4()),
     )
@@ -50,11 +54,13 @@ class ItemStatusHistory(Base):
         nullable=False,
     )
     status: Mapped[ItemStatus] = mapped_column(
-        SQLAlchemyEnum(ItemStatus, native_enum=False),
+        status_type(ItemStatus),
         nullable=False,
     )
+    # Part of the primary key because it is the partition key.
     timestamp: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
+        primary_key=True,
         onupdate=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
@@ -64,3 +70,6 @@ class ItemStatusHistory(Base):
         primaryjoin="and_(ItemStatusHistory.order_id==Item.order_id,"
         "ItemStatusHistory.item_plu==Item.plu)",
     )
+
+
+event.listen(ItemStatusHistory.__table__, "after_create", DEFAULT_PARTITION_DDL)
@@ -4,12 +4,18 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 from uuid import uuid4
 
-from sqlalchemy import TIMESTAMP, Index, String
+from sqlalchemy import TIMESTAMP, Index, String, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import Enum as SQLAlchemyEnum
 
 from huuva_backend.db.base import Base
 from huuva_backend.db.models.order_status import OrderStatus
+from huuva_backend.db.notifications import (
+    NOTIFY_ACTIVE_ORDER_FUNCTION_DDL,
+    ORDERS_INSERT_TRIGGER_DDL,
+    ORDERS_UPDATE_TRIGGER_DDL,
+)
+from huuva_backend.db.search import CUSTOMER_SEARCH_DDL
+from huuva_backend.db.types import status_type
 
 if TYPE_CHECKING:
     from huuva_backend.db.models.item import Item
@@ -20,15 +26,32 @@ class Order(Base):
     __tablename__ = "orders"
     __table_args__ = (
         Index(
-            "ix_orders_account",
+            "ix_created_at",
+            "created_at",
+            unique=False,
+        ),
+        # Composite indexes matching the `list` filters, so that filtering and
+        # the `created_at DESC` ordering are both served by a single index scan.
+        Index(
+            "ix_orders_account_created_at",
             "account",
+            text("created_at DESC"),
             unique=False,
         ),
         Index(
-            "ix_created_at",
-            "created_at",
+            "ix_orders_status_created_at",
+            "status",
+            text("created_at DESC"),
             unique=False,
         ),
+        # A channel order is taken once per brand; serves lookups by channel
+        # order id and rejects resends.
+        Index(
+            "ix_orders_brand_channel_order_id",
+            "brand_id",
+            "channel_order_id",
+            unique=True,
+        ),
     )
 
     id: Mapped[str] = mapped_column(
@@ -58,11 +81,10 @@ class Order(Base):
 
     pickup_time: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
-        onupdate=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
     status: Mapped[OrderStatus] = mapped_column(
-        SQLAlchemyEnum(OrderStatus, native_enum=False),
+        status_type(OrderStatus),
         default=OrderStatus.RECEIVED,
         nullable=False,
     )
@@ -78,4 +100,33 @@ class Order(Base):
     status_history: Mapped[List["OrderStatusHistory"]] = relationship(
         back_populates="order",
         cascade="all, delete-orphan",
+        # History is partitioned, so rows come back partition by partition.
+        order_by="OrderStatusHistory.timestamp",
     )
+
+
+# Small index over the orders the kitchen is still working on. Declared here
+# so that the predicate is rendered with the status column type.
+Index(
+    "ix_orders_active_created_at",
+    Order.created_at.desc(),
+    unique=False,
+    postgresql_where=Order.status.in_(
+        [OrderStatus.RECEIVED, OrderStatus.PREPARING, OrderStatus.READY],
+    ),
+)
+# Pickup windows of the orders still to be picked up, soonest first.
+Index(
+    "ix_orders_active_pickup_time",
+    Order.pickup_time,
+    unique=False,
+    postgresql_where=Order.status.in_(
+        [OrderStatus.RECEIVED, OrderStatus.PREPARING, OrderStatus.READY],
+    ),
+)
+
+
+event.listen(Order.__table__, "after_create", NOTIFY_ACTIVE_ORDER_FUNCTION_DDL)
+event.listen(Order.__table__, "after_create", ORDERS_INSERT_TRIGGER_DDL)
+event.listen(Order.__table__, "after_create", ORDERS_UPDATE_TRIGGER_DDL)
+event.listen(Order.__table__, "after_create", CUSTOMER_SEARCH_DDL)
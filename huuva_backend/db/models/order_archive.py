@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, List
+
+from sqlalchemy import TIMESTAMP, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from huuva_backend.db.base import Base
+from huuva_backend.db.models.order_status import OrderStatus
+from huuva_backend.db.types import status_type
+
+
+class OrderArchive(Base):
+    """
+    Completed order moved out of the hot tables.
+
+    One row per order: items and both status histories are folded into JSONB
+    columns, so an archived order costs a single heap tuple and one index
+    entry instead of rows and index entries in four tables.
+
+    `items` holds `{"plu", "name", "quantity", "status", "status_history"}`
+    objects and every status history is a list of `[status, timestamp]` pairs.
+    """
+
+    __tablename__ = "orders_archive"
+
+    id: Mapped[str] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    account: Mapped[str] = mapped_column(String, nullable=False)
+    brand_id: Mapped[str] = mapped_column(String, nullable=False)
+    channel_order_id: Mapped[str] = mapped_column(String, nullable=False)
+
+    customer_name: Mapped[str] = mapped_column(String, nullable=False)
+    customer_phone: Mapped[str] = mapped_column(String, nullable=False)
+
+    pickup_time: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
+    status: Mapped[OrderStatus] = mapped_column(
+        status_type(OrderStatus),
+        nullable=False,
+    )
+
+    delivery_city: Mapped[str] = mapped_column(String, nullable=False)
+    delivery_street: Mapped[str] = mapped_column(String, nullable=False)
+    delivery_postal_code: Mapped[str] = mapped_column(String, nullable=False)
+
+    items: Mapped[List[Any]] = mapped_column(JSONB, nullable=False)
+    status_history: Mapped[List[Any]] = mapped_column(JSONB, nullable=False)
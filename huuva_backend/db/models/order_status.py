@@ -5,11 +5,12 @@ from enum import IntEnum
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from sqlalchemy import TIMESTAMP, ForeignKey, Index
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import Enum as SQLAlchemyEnum
 
 from huuva_backend.db.base import Base
+from huuva_backend.db.partitions import DEFAULT_PARTITION_DDL
+from huuva_backend.db.types import generated_id_type, status_type
 
 if TYPE_CHECKING:
     from huuva_backend.db.models.order import Order
@@ -32,9 +33,12 @@ class OrderStatusHistory(Base):
             "order_id",
             unique=False,
         ),
+        # Monthly range partitions are managed by `PartitionService`.
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
     id: Mapped[str] = mapped_column(
+        generated_id_type(),
         primary_key=True,
         default=lambda: str(uuid4()),
     )
@@ -42,13 +46,18 @@ class OrderStatusHistory(Base):
         ForeignKey("orders.id", ondelete="CASCADE"),
     )
     status: Mapped[OrderStatus] = mapped_column(
-        SQLAlchemyEnum(OrderStatus, native_enum=False),
+        status_type(OrderStatus),
         nullable=False,
     )
+    # Part of the primary key because it is the partition key.
     timestamp: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
+        primary_key=True,
         onupdate=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
 
     order: Mapped["Order"] = relationship(back_populates="status_history")
+
+
+event.listen(OrderStatusHistory.__table__, "after_create", DEFAULT_PARTITION_DDL)
@@ -0,0 +1,49 @@
+from sqlalchemy import DDL
+
+from huuva_backend.settings import settings
+
+# Channel on which the id of an order is notified when it enters, changes
+# within or leaves the active statuses, or when one of its items changes.
+ACTIVE_ORDERS_CHANNEL = "active_orders"
+
+# Only the writes of connections with this setting on notify, so that
+# deployments without the active order board do not pay for NOTIFY, which
+# serializes the commits of the notifying transactions.
+NOTIFY_SETTING = "huuva_backend.notify_active_orders"
+# Connection arguments of an engine whose writes notify.
+NOTIFY_CONNECT_ARGS = {"server_settings": {NOTIFY_SETTING: "on"}}
+_NOTIFYING = f"current_setting('{NOTIFY_SETTING}', true) = 'on'"
+
+# RECEIVED, PREPARING and READY, as the statuses are stored (see `db.types`).
+if settings.db_native_types:
+    _ACTIVE = "(1, 2, 3)"
+else:
+    _ACTIVE = "('RECEIVED', 'PREPARING', 'READY')"
+
+# Notifies the column named by the trigger argument; a transaction that
+# changes an order several times notifies it once.
+NOTIFY_ACTIVE_ORDER_FUNCTION_DDL = DDL(
+    "CREATE OR REPLACE FUNCTION notify_active_order() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    f"PERFORM pg_notify('{ACTIVE_ORDERS_CHANNEL}', to_jsonb(NEW) ->> TG_ARGV[0]); "
+    "RETURN NULL; END $$",
+)
+
+# Imported and generated historical orders are inserted in a final status,
+# so they do not notify.
+ORDERS_INSERT_TRIGGER_DDL = DDL(
+    "CREATE TRIGGER orders_notify_active_insert AFTER INSERT ON orders "
+    f"FOR EACH ROW WHEN ({_NOTIFYING} AND NEW.status IN {_ACTIVE}) "
+    "EXECUTE FUNCTION notify_active_order('id')",
+)
+ORDERS_UPDATE_TRIGGER_DDL = DDL(
+    "CREATE TRIGGER orders_notify_active_update AFTER UPDATE OF status ON orders "
+    f"FOR EACH ROW WHEN ({_NOTIFYING} AND "
+    f"(OLD.status IN {_ACTIVE} OR NEW.status IN {_ACTIVE})) "
+    "EXECUTE FUNCTION notify_active_order('id')",
+)
+ITEMS_UPDATE_TRIGGER_DDL = DDL(
+    "CREATE TRIGGER items_notify_active_update AFTER UPDATE OF status ON items "
+    f"FOR EACH ROW WHEN ({_NOTIFYING} AND OLD.status IS DISTINCT FROM NEW.status) "
+    "EXECUTE FUNCTION notify_active_order('order_id')",
+)
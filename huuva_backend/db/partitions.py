@@ -0,0 +1,44 @@
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL
+
+# Tables range-partitioned by month on their `timestamp` column.
+PARTITIONED_TABLES = ("order_status_history", "item_status_history")
+
+# Names of the monthly and default partitions of the tables above.
+PARTITION_NAME_RE = re.compile(
+    rf"^(?:{'|'.join(PARTITIONED_TABLES)})_(?:p\d{{4}}_\d{{2}}|default)$",
+)
+
+# Catches rows outside every monthly partition (e.g. old client timestamps).
+DEFAULT_PARTITION_DDL = DDL(
+    "CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT",
+)
+
+
+def month_start(moment: datetime) -> datetime:
+    """Return the first instant (UTC) of the month containing `moment`."""
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Shift a month start returned by `month_start` by `months` months."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Name of the partition of `table` holding rows of the given month."""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the default partition of `table`."""
+    return f"{table}_default"
+
+
+def is_partition(name: str) -> bool:
+    """Whether `name` is a monthly or default partition of a partitioned table."""
+    return PARTITION_NAME_RE.match(name) is not None
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.db.models.idempotency_key import (
+    IdempotencyKey as IdempotencyKeyModel,
+)
+
+
+@dataclass
+class IdempotencyKeyRepository:
+    db: AsyncSession
+
+    async def get(self, key: str, now: datetime) -> Optional[IdempotencyKeyModel]:
+        """Retrieve the stored response for `key`, or None if absent or expired."""
+        result = await self.db.execute(
+            select(IdempotencyKeyModel).where(
+                IdempotencyKeyModel.key == key,
+                IdempotencyKeyModel.expires_at > now,
+            ),
+        )
+        return result.scalar_one_or_none()
+
+    async def save(
+        self,
+        key: str,
+        fingerprint: bytes,
+        status_code: int,
+        response: Any,
+        now: datetime,
+        expires_at: datetime,
+    ) -> None:
+        """
+        Store the response for `key`.
+
+        An expired row with the same key is replaced; a live one is kept, so a
+        concurrent request can never overwrite the first stored response.
+        """
+        stmt = insert(IdempotencyKeyModel).values(
+            key=key,
+            fingerprint=fingerprint,
+            status_code=status_code,
+            response=response,
+            expires_at=expires_at,
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[IdempotencyKeyModel.key],
+                set_={
+                    "fingerprint": stmt.excluded.fingerprint,
+                    "status_code": stmt.excluded.status_code,
+                    "response": stmt.excluded.response,
+                    "expires_at": stmt.excluded.expires_at,
+                },
+                where=IdempotencyKeyModel.expires_at <= now,
+            ),
+        )
+
+    async def delete_expired(self, now: datetime) -> int:
+        """Delete every row expired at `now`. Returns the number of deleted rows."""
+        result = await self.db.execute(
+            delete(IdempotencyKeyModel).where(IdempotencyKeyModel.expires_at <= now),
+        )
+        return result.rowcount  # type: ignore[attr-defined]
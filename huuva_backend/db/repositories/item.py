@@ -1,11 +1,24 @@
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
-
-from sqlalchemy import Select, select
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import (
+    Select,
+    String,
+    column,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from huuva_backend.core.entities.item import ItemUpdate
+from huuva_backend.core.entities.item import ItemStatusChange, ItemUpdate
 from huuva_backend.db.models.item import Item
 from huuva_backend.db.models.item import Item as ItemModel
 from huuva_backend.db.models.item_status import (
@@ -46,35 +59,166 @@ class ItemRepository:
         """
         Atomically update the status of an individual order item and log the change.
 
-        Acquires a row-level lock to avoid concurrency issues.
+        The UPDATE takes the row lock, so concurrent updates are serialized.
         Raises NotFoundError if the item is not found.
+
+        Issues three statements: `UPDATE ... RETURNING` for the item, the
+        history INSERT and a SELECT of the item's history for the response.
         """
+        status = ItemStatusModel(item_update.status.value)
 
-        # Acquire a row-level lock on the item to prevent concurrent updates
         result = await self.db.execute(
-            self._get_item_query(order_id, plu).with_for_update(),
+            update(ItemModel)
+            .where(
+                ItemModel.order_id == order_id,
+                ItemModel.plu == plu,
+            )
+            .values(status=status)
+            .returning(ItemModel)
+            .execution_options(populate_existing=True),
         )
         item = result.scalar_one_or_none()
 
         if not item:
             raise NotFoundError("Item", f"{order_id}:{plu}")
 
-        # Convert entity enum to model enum
-        item.status = ItemStatusModel(item_update.status.value)
-        history_entry = ItemStatusHistoryModel(
-            order_id=item.order_id,
-            item_plu=item.plu,
-            status=ItemStatusModel(item_update.status.value),
-            timestamp=datetime.now(timezone.utc),
+        await self.db.execute(
+            insert(ItemStatusHistoryModel),
+            [
+                {
+                    "order_id": order_id,
+                    "item_plu": plu,
+                    "status": status,
+                    "timestamp": datetime.now(timezone.utc),
+                },
+            ],
         )
 
-        item.status_history.append(history_entry)
-
-        await self.db.flush()
-        await self.db.refresh(item, attribute_names=["status_history"])
+        history = await self.db.scalars(
+            select(ItemStatusHistoryModel)
+            .where(
+                ItemStatusHistoryModel.order_id == order_id,
+                ItemStatusHistoryModel.item_plu == plu,
+            )
+            .order_by(ItemStatusHistoryModel.timestamp)
+            .execution_options(populate_existing=True),
+        )
+        set_committed_value(item, "status_history", list(history))
 
         return item
 
+    async def update_many(self, changes: List[ItemStatusChange]) -> List[ItemModel]:
+        """
+        Atomically apply status changes to items of one or more orders.
+
+        The last change wins when an item is listed twice. Raises
+        NotFoundError, leaving every item untouched, if any item is not found.
+
+        Issues five statements whatever the number of changes: one
+        `UPDATE ... FROM (VALUES ...) RETURNING` for the items, one multi-row
+        history INSERT, both inside a savepoint so that a missing item undoes
+        the batch, and a SELECT of the items' histories for the response.
+        """
+        by_key = {(change.order_id, change.plu): change for change in changes}
+        status_type = ItemModel.__table__.c.status.type
+        changed = (
+            values(
+                column("order_id", String),
+                column("plu", String),
+                column("status", status_type),
+                name="changes",
+            )
+            .data(
+                [
+                    (order_id, plu, ItemStatusModel(change.status.value))
+                    for (order_id, plu), change in by_key.items()
+                ],
+            )
+            .alias("changes")
+        )
+        now = datetime.now(timezone.utc)
+
+        async with self.db.begin_nested():
+            items = list(
+                await self.db.scalars(
+                    update(ItemModel)
+                    .where(
+                        ItemModel.order_id == changed.c.order_id,
+                        ItemModel.plu == changed.c.plu,
+                    )
+                    .values(status=changed.c.status)
+                    .returning(ItemModel)
+                    .execution_options(
+                        synchronize_session=False,
+                        populate_existing=True,
+                    ),
+                ),
+            )
+            if len(items) < len(by_key):
+                found = {(item.order_id, item.plu) for item in items}
+                missing = [key for key in by_key if key not in found]
+                # The savepoint is rolled back, the statuses loaded by
+                # RETURNING into the session would not be.
+                for item in items:
+                    self.db.expire(item)
+                raise NotFoundError(
+                    "Item",
+                    ", ".join(f"{order_id}:{plu}" for order_id, plu in missing),
+                )
+
+            await self.db.execute(
+                insert(ItemStatusHistoryModel),
+                [
+                    {
+                        "order_id": item.order_id,
+                        "item_plu": item.plu,
+                        "status": item.status,
+                        "timestamp": now,
+                    }
+                    for item in items
+                ],
+            )
+
+        history = await self.db.scalars(
+            select(ItemStatusHistoryModel)
+            .where(
+                tuple_(
+                    ItemStatusHistoryModel.order_id,
+                    ItemStatusHistoryModel.item_plu,
+                ).in_(list(by_key)),
+            )
+            .order_by(ItemStatusHistoryModel.timestamp)
+            .execution_options(populate_existing=True),
+        )
+        history_by_item: Dict[Tuple[str, str], List[ItemStatusHistoryModel]] = (
+            defaultdict(list)
+        )
+        for entry in history:
+            history_by_item[entry.order_id, entry.item_plu].append(entry)
+        for item in items:
+            set_committed_value(
+                item,
+                "status_history",
+                history_by_item[item.order_id, item.plu],
+            )
+
+        return items
+
+    async def status_counts(
+        self,
+        order_ids: Iterable[str],
+    ) -> Dict[str, Dict[ItemStatusModel, int]]:
+        """Number of items of each order in each status, in one aggregate query."""
+        result = await self.db.execute(
+            select(ItemModel.order_id, ItemModel.status, func.count())
+            .where(ItemModel.order_id.in_(set(order_ids)))
+            .group_by(ItemModel.order_id, ItemModel.status),
+        )
+        counts: Dict[str, Dict[ItemStatusModel, int]] = defaultdict(dict)
+        for order_id, status, count in result.tuples():
+            counts[order_id][status] = count
+        return counts
+
     def _get_item_query(self, order_id: str, plu: str) -> Select[tuple[Item]]:
         """
         Helper method to construct a query for retrieving an item.
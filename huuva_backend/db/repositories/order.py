@@ -1,14 +1,29 @@
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-from sqlalchemy import Select, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Select, exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import make_transient_to_detached, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from huuva_backend.core.entities.order import OrderCreate, OrderUpdate
-from huuva_backend.db.mappings.order import order_create_to_db
+from huuva_backend.db.base import Base
+from huuva_backend.db.mappings.order import order_create_to_row
+from huuva_backend.db.mappings.order_archive import order_archive_to_db
 from huuva_backend.db.models.item import Item as ItemModel
 from huuva_backend.db.models.item_status import (
     ItemStatus as ItemStatusModel,
@@ -18,13 +33,24 @@ from huuva_backend.db.models.item_status import (
 )
 from huuva_backend.db.models.order import Order
 from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.models.order_archive import OrderArchive as OrderArchiveModel
 from huuva_backend.db.models.order_status import (
     OrderStatus as OrderStatusModel,
 )
 from huuva_backend.db.models.order_status import (
     OrderStatusHistory as OrderStatusHistoryModel,
 )
-from huuva_backend.exceptions.exceptions import ConflictError, NotFoundError
+from huuva_backend.db.repositories.order_archive import OrderArchiveRepository
+from huuva_backend.exceptions.exceptions import (
+    ConflictError,
+    NotFoundError,
+    UnavailableError,
+)
+
+M = TypeVar("M", bound=Base)
+
+# SQLSTATE of an unknown operator, raised when pg_trgm is not installed.
+UNDEFINED_FUNCTION = "42883"
 
 
 @dataclass
@@ -38,35 +64,72 @@ class OrderRepository:
         Assumptions:
             - The 'account' uniquely identifies a customer.
             - We are not receiving an item status and status history for the order.
-        """
-        # Check if the order already exists
-        existing = await self.db.get(OrderModel, order_in.id)
-        if existing:
-            raise ConflictError("Order", str(order_in.id))
-
-        order = order_create_to_db(order_in)
 
-        # Create items for the order
-        items: List[ItemModel] = self._create_items(order, order_in)
-        order.items = items
-
-        # Create status history for the order
-        status_history: List[OrderStatusHistoryModel] = (
-            self._create_order_status_history(
-                order,
-                order_in,
+        The order row is written with `INSERT ... ON CONFLICT DO NOTHING`, so an
+        existing order, by id or by brand and channel order id (a resend by the
+        channel), is detected by the probes of the unique indexes the insert
+        makes anyway rather than by a separate lookup. Archived orders are not
+        in those indexes, so the row of a given id is inserted from a SELECT
+        that yields nothing when the id is archived.
+        Raises ConflictError if the order already exists.
+
+        Issues one `INSERT ... RETURNING` per table whatever the number of
+        items, and builds the returned order from the returned rows instead of
+        reading it back.
+        """
+        row = order_create_to_row(order_in)
+        statement = insert(OrderModel)
+        if order_in.id is None:
+            statement = statement.values(row)
+        else:
+            columns = OrderModel.__table__.c
+            statement = statement.from_select(
+                list(row),
+                select(
+                    *(
+                        literal(value, columns[name].type)
+                        for name, value in row.items()
+                    ),
+                ).where(~exists().where(OrderArchiveModel.id == order_in.id)),
             )
+        result = await self.db.execute(
+            statement.on_conflict_do_nothing().returning(
+                OrderModel.id,
+                OrderModel.created_at,
+                OrderModel.updated_at,
+            ),
         )
-        order.status_history = status_history
-
+        inserted = result.one_or_none()
+        if inserted is None:
+            # Either unique index may have matched, so both keys are named.
+            identifier = f"{order_in.brand_id}/{order_in.channel_order_id}"
+            if order_in.id is not None:
+                identifier = f"{order_in.id} or {identifier}"
+            raise ConflictError("Order", identifier)
+
+        # Attach the inserted row to the session without loading it back.
+        order = OrderModel(**{**inserted._asdict(), **row})
+        make_transient_to_detached(order)
         self.db.add(order)
+
         try:
-            await self.db.flush()
+            items = await self._insert_returning(
+                ItemModel,
+                self._item_rows(order.id, order_in),
+            )
+            order_history = await self._insert_returning(
+                OrderStatusHistoryModel,
+                self._order_status_history_rows(order.id, order_in),
+            )
+            item_history = await self._insert_returning(
+                ItemStatusHistoryModel,
+                self._item_status_history_rows(items),
+            )
         except IntegrityError as e:
             await self.db.rollback()
             raise ConflictError("Order", str(order_in.id)) from e
 
-        await self.db.refresh(order, attribute_names=["items", "status_history"])
+        self._set_collections(order, items, order_history, item_history)
 
         return order
 
@@ -74,52 +137,176 @@ class OrderRepository:
         """
         Retrieve an Order by its UUID.
 
+        Falls back to the archive for completed orders that were moved out of
+        the hot tables; those are returned as transient, read-only objects.
         Raises NotFoundError if not found.
         """
         result = await self.db.execute(self._get_order_query(order_id))
         order = result.scalar_one_or_none()
 
         if not order:
-            raise NotFoundError("Order", str(order_id))
+            archived = await OrderArchiveRepository(self.db).get(order_id)
+            if not archived:
+                raise NotFoundError("Order", str(order_id))
+            return order_archive_to_db(archived)
 
         return order
 
-    async def update(self, order_id: str, order_update: OrderUpdate) -> OrderModel:
+    async def get_by_channel(self, brand_id: str, channel_order_id: str) -> OrderModel:
         """
-        Atomically update the status of an Order and log the change.
+        Retrieve an Order by its brand and the order id of its channel.
 
-        Uses a row-level lock to ensure concurrency safety.
-        Raises NotFoundError if the Order is not found.
+        Archived orders are only found by `get`. Raises NotFoundError if not
+        found.
         """
-
         result = await self.db.execute(
-            self._get_order_query(order_id).with_for_update(),
+            select(OrderModel)
+            .options(
+                selectinload(OrderModel.items).selectinload(ItemModel.status_history),
+                selectinload(OrderModel.status_history),
+            )
+            .where(
+                OrderModel.brand_id == brand_id,
+                OrderModel.channel_order_id == channel_order_id,
+            ),
         )
         order = result.scalar_one_or_none()
 
         if not order:
+            raise NotFoundError("Order", f"{brand_id}/{channel_order_id}")
+
+        return order
+
+    async def update(
+        self,
+        order_id: str,
+        order_update: OrderUpdate,
+    ) -> Tuple[OrderModel, OrderStatusModel]:
+        """
+        Atomically update the status of an Order and all its items, and log the change.
+
+        Returns the updated Order and its status from before the update, which
+        is read under the row lock, so concurrent updates are serialized.
+        Raises NotFoundError if the Order is not found.
+
+        Issues six statements whatever the number of items: an
+        `UPDATE ... RETURNING` for the order and one for its items, an INSERT
+        per history table, and a SELECT per history table for the response.
+        """
+        order_status = OrderStatusModel(order_update.status.value)
+        # Items follow the order status, see the README.
+        item_status = ItemStatusModel(order_update.status.value)
+        now = datetime.now(timezone.utc)
+
+        previous = (
+            select(OrderModel.id, OrderModel.status)
+            .where(OrderModel.id == order_id)
+            .with_for_update()
+            .subquery("previous")
+        )
+        result = await self.db.execute(
+            update(OrderModel)
+            .where(OrderModel.id == previous.c.id)
+            .values(status=order_status)
+            .returning(OrderModel, previous.c.status)
+            .execution_options(populate_existing=True),
+        )
+        row = result.one_or_none()
+
+        if not row:
             raise NotFoundError("Order", str(order_id))
+        order, previous_status = row
+
+        items = list(
+            await self.db.scalars(
+                update(ItemModel)
+                .where(ItemModel.order_id == order_id)
+                .values(status=item_status)
+                .returning(ItemModel)
+                .execution_options(populate_existing=True),
+            ),
+        )
 
-        # Convert entity enum to model enum
-        order.status = OrderStatusModel(order_update.status.value)
+        await self.db.execute(
+            insert(OrderStatusHistoryModel),
+            [{"order_id": order_id, "status": order_status, "timestamp": now}],
+        )
+        if items:
+            await self.db.execute(
+                insert(ItemStatusHistoryModel),
+                [
+                    {
+                        "order_id": order_id,
+                        "item_plu": item.plu,
+                        "status": item_status,
+                        "timestamp": now,
+                    }
+                    for item in items
+                ],
+            )
 
-        history_entry = OrderStatusHistoryModel(
-            order_id=order.id,
-            status=OrderStatusModel(order_update.status.value),
-            timestamp=datetime.now(timezone.utc),
+        order_history = await self.db.scalars(
+            select(OrderStatusHistoryModel)
+            .where(OrderStatusHistoryModel.order_id == order_id)
+            .execution_options(populate_existing=True),
+        )
+        item_history = await self.db.scalars(
+            select(ItemStatusHistoryModel)
+            .where(ItemStatusHistoryModel.order_id == order_id)
+            .execution_options(populate_existing=True),
         )
+        self._set_collections(order, items, list(order_history), list(item_history))
 
-        # Create a new list if status_history doesn't exist yet
-        if order.status_history is None:
-            order.status_history = [history_entry]
-        else:
-            order.status_history.append(history_entry)
+        return order, previous_status
+
+    async def lock_statuses(
+        self,
+        order_ids: Iterable[str],
+    ) -> Dict[str, OrderStatusModel]:
+        """
+        Lock orders with `SELECT ... FOR UPDATE` and return their statuses.
 
-        await self.db.flush()
+        Orders are locked in id order, so concurrent callers cannot deadlock.
+        Unknown ids are left out of the result.
+        """
+        result = await self.db.execute(
+            select(OrderModel.id, OrderModel.status)
+            .where(OrderModel.id.in_(sorted(set(order_ids))))
+            .order_by(OrderModel.id)
+            .with_for_update(),
+        )
+        return dict(result.tuples().all())
 
-        await self.db.refresh(order, attribute_names=["status_history"])
+    async def set_statuses(self, statuses: Dict[str, OrderStatusModel]) -> None:
+        """
+        Set the status of orders, leaving their items as they are, and log the change.
 
-        return order
+        Issues an UPDATE per distinct status and one history INSERT; the
+        orders are not loaded.
+        """
+        now = datetime.now(timezone.utc)
+        by_status: Dict[OrderStatusModel, List[str]] = defaultdict(list)
+        for order_id, status in statuses.items():
+            by_status[status].append(order_id)
+
+        for status, order_ids in by_status.items():
+            orders = await self.db.scalars(
+                update(OrderModel)
+                .where(OrderModel.id.in_(order_ids))
+                .values(status=status)
+                .returning(OrderModel)
+                .execution_options(populate_existing=True),
+            )
+            # A history already loaded into the session misses the new entry.
+            for order in orders:
+                self.db.expire(order, ["status_history"])
+        await self.db.execute(
+            insert(OrderStatusHistoryModel),
+            [
+                {"order_id": order_id, "status": status, "timestamp": now}
+                for order_id, status in statuses.items()
+            ],
+        )
 
     async def list(
         self,
@@ -127,6 +314,8 @@ class OrderRepository:
         account: Optional[str] = None,
         from_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None,
+        pickup_from: Optional[datetime] = None,
+        pickup_to: Optional[datetime] = None,
     ) -> List[OrderModel]:
         """
         List orders with optional filtering.
@@ -136,82 +325,225 @@ class OrderRepository:
             account: Filter by account ID
             from_date: Filter orders created after this date
             to_date: Filter orders created before this date
+            pickup_from: Filter orders to be picked up after this date
+            pickup_to: Filter orders to be picked up before this date
 
         Returns:
-            A list of Order models matching the filters
+            A list of Order models matching the filters, newest first, or
+            soonest pickup first when filtering by pickup time
         """
-        query = select(OrderModel).options(
+        query = self._list_query(
+            status,
+            account,
+            from_date,
+            to_date,
+            pickup_from,
+            pickup_to,
+        ).options(
             selectinload(OrderModel.items).selectinload(ItemModel.status_history),
             selectinload(OrderModel.status_history),
         )
 
-        if status is not None:
-            query = query.where(OrderModel.status == status)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
 
-        if account is not None:
-            query = query.where(OrderModel.account == account)
+    async def search(self, text: str, limit: int) -> List[OrderModel]:
+        """
+        Find orders by part of the customer name or phone number, best match first.
 
-        if from_date is not None:
-            query = query.where(OrderModel.created_at >= from_date)
+        Matches by pg_trgm word similarity, so `text` may be a fragment of a
+        name or number and contain typos; case does not matter. Both columns
+        have a trigram GIN index, so the matching rows are found without
+        scanning the table; only they are ranked, and the best `limit` are
+        returned. Raises UnavailableError if pg_trgm is not installed.
+        """
+        term = literal(text)
+        query = (
+            select(OrderModel)
+            .where(
+                term.op("<%")(OrderModel.customer_name)
+                | term.op("<%")(OrderModel.customer_phone),
+            )
+            .order_by(
+                func.greatest(
+                    func.word_similarity(term, OrderModel.customer_name),
+                    func.word_similarity(term, OrderModel.customer_phone),
+                ).desc(),
+                OrderModel.created_at.desc(),
+            )
+            .limit(limit)
+            .options(
+                selectinload(OrderModel.items).selectinload(ItemModel.status_history),
+                selectinload(OrderModel.status_history),
+            )
+        )
 
-        if to_date is not None:
-            query = query.where(OrderModel.created_at <= to_date)
+        try:
+            result = await self.db.execute(query)
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) != UNDEFINED_FUNCTION:
+                raise
+            raise UnavailableError("Customer search") from e
+        return list(result.scalars().all())
 
-        # Order by creation date, newest first
-        query = query.order_by(OrderModel.created_at.desc())
+    async def list_in_statuses(
+        self,
+        statuses: Collection[OrderStatusModel],
+        order_ids: Optional[Collection[str]] = None,
+    ) -> List[OrderModel]:
+        """
+        List the orders in one of `statuses`, optionally only those of `order_ids`.
+
+        Orders not in one of `statuses` are left out, also when given by id.
+        """
+        query = (
+            select(OrderModel)
+            .where(OrderModel.status.in_(statuses))
+            .options(
+                selectinload(OrderModel.items).selectinload(ItemModel.status_history),
+                selectinload(OrderModel.status_history),
+            )
+        )
+        if order_ids is not None:
+            query = query.where(OrderModel.id.in_(order_ids))
 
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
-    def _create_items(
+    async def _insert_returning(
         self,
-        order: OrderModel,
-        order_in: OrderCreate,
-    ) -> List[ItemModel]:
-        """Create items for the order. Also handles status history for each item."""
-        items: List[ItemModel] = []
+        model: Type[M],
+        rows: List[Dict[str, Any]],
+    ) -> List[M]:
+        """Insert `rows` in a single statement and return them as models."""
+        if not rows:
+            return []
+        result = await self.db.scalars(
+            insert(model).returning(model, sort_by_parameter_order=True),
+            rows,
+        )
+        return list(result.all())
+
+    def _item_rows(self, order_id: str, order_in: OrderCreate) -> List[Dict[str, Any]]:
+        """Insert values for the items of the order."""
+        rows: List[Dict[str, Any]] = []
         for item_in in order_in.items:
             # Handle potential None status safely
             status_value = ItemStatusModel.ORDERED
             if item_in.status is not None:
                 status_value = ItemStatusModel(item_in.status.value)
 
-            item = ItemModel(
-                order_id=order.id,
-                plu=item_in.plu,
-                name=item_in.name,
-                quantity=item_in.quantity,
-                status=status_value,
+            rows.append(
+                {
+                    "order_id": order_id,
+                    "plu": item_in.plu,
+                    "name": item_in.name,
+                    "quantity": item_in.quantity,
+                    "status": status_value,
+                },
             )
+        return rows
 
-            # Create history entry
-            history_entry = ItemStatusHistoryModel(
-                order_id=order.id,
-                item_plu=item_in.plu,
-                status=status_value,
-                timestamp=datetime.now(timezone.utc),
-            )
-
-            item.status_history = [history_entry]
+    def _item_status_history_rows(
+        self,
+        items: List[ItemModel],
+    ) -> List[Dict[str, Any]]:
+        """Insert values for the initial status history entry of each item."""
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "order_id": item.order_id,
+                "item_plu": item.plu,
+                "status": item.status,
+                "timestamp": now,
+            }
+            for item in items
+        ]
+
+    def _order_status_history_rows(
+        self,
+        order_id: str,
+        order_in: OrderCreate,
+    ) -> List[Dict[str, Any]]:
+        """Insert values for the initial order status history, if provided."""
+        return [
+            {
+                "order_id": order_id,
+                "status": OrderStatusModel(hist_in.status.value),
+                "timestamp": hist_in.timestamp,
+            }
+            for hist_in in order_in.status_history
+        ]
+
+    @staticmethod
+    def _set_collections(
+        order: OrderModel,
+        items: List[ItemModel],
+        order_history: List[OrderStatusHistoryModel],
+        item_history: List[ItemStatusHistoryModel],
+    ) -> None:
+        """
+        Populate the collections of `order` and its items from rows at hand.
 
-            items.append(item)
-        return items
+        Sets them as loaded state, ordered like the relationships, so that
+        building the response does not read them back.
+        """
+        history_by_plu: Dict[str, List[ItemStatusHistoryModel]] = defaultdict(list)
+        for item_entry in sorted(item_history, key=lambda entry: entry.timestamp):
+            history_by_plu[item_entry.item_plu].append(item_entry)
+
+        for item in items:
+            set_committed_value(item, "status_history", history_by_plu[item.plu])
+        set_committed_value(order, "items", items)
+        set_committed_value(
+            order,
+            "status_history",
+            sorted(order_history, key=lambda entry: entry.timestamp),
+        )
 
-    def _create_order_status_history(
+    def _list_query(
         self,
-        order: OrderModel,
-        order_in: OrderCreate,
-    ) -> List[OrderStatusHistoryModel]:
-        """Create initial order status history if provided."""
-        status_history: List[OrderStatusHistoryModel] = []
-        for hist_in in order_in.status_history:
-            history_entry = OrderStatusHistoryModel(
-                order_id=order.id,
-                status=OrderStatusModel(hist_in.status.value),
-                timestamp=hist_in.timestamp,
-            )
-            status_history.append(history_entry)
-        return status_history
+        status: Optional[OrderStatusModel] = None,
+        account: Optional[str] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        pickup_from: Optional[datetime] = None,
+        pickup_to: Optional[datetime] = None,
+    ) -> Select[tuple[Order]]:
+        """
+        Build the filtered and ordered query behind `list`.
+
+        Every filter combination is covered by one of the indexes declared on
+        the Order model, so the planner can avoid both a sequential scan and a
+        sort step. Pickup windows are indexed for the RECEIVED, PREPARING and
+        READY statuses only, so they are meant to be combined with one of them.
+        """
+        query = select(OrderModel)
+
+        if status is not None:
+            query = query.where(OrderModel.status == status)
+
+        if account is not None:
+            query = query.where(OrderModel.account == account)
+
+        if from_date is not None:
+            query = query.where(OrderModel.created_at >= from_date)
+
+        if to_date is not None:
+            query = query.where(OrderModel.created_at <= to_date)
+
+        if pickup_from is not None:
+            query = query.where(OrderModel.pickup_time >= pickup_from)
+
+        if pickup_to is not None:
+            query = query.where(OrderModel.pickup_time <= pickup_to)
+
+        if pickup_from is not None or pickup_to is not None:
+            # Order by pickup time, soonest first
+            return query.order_by(OrderModel.pickup_time)
+
+        # Order by creation date, newest first
+        return query.order_by(OrderModel.created_at.desc())
 
     def _get_order_query(self, order_id: str) -> Select[tuple[Order]]:
         """Get the order query with the specified order ID."""
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from huuva_backend.db.mappings.order_archive import order_db_to_archive
+from huuva_backend.db.models.item import Item as ItemModel
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.models.order_archive import OrderArchive as OrderArchiveModel
+from huuva_backend.db.models.order_status import (
+    OrderStatus as OrderStatusModel,
+)
+
+# Orders in these statuses never change again and can be archived.
+TERMINAL_ORDER_STATUSES = (OrderStatusModel.PICKED_UP, OrderStatusModel.CANCELLED)
+
+
+@dataclass
+class OrderArchiveRepository:
+    db: AsyncSession
+
+    async def get(self, order_id: str) -> Optional[OrderArchiveModel]:
+        """Retrieve an archived Order by its ID, or None if it isn't archived."""
+        return await self.db.get(OrderArchiveModel, order_id)
+
+    async def archive(self, older_than: datetime, batch_size: int) -> int:
+        """
+        Move one batch of terminal orders into the archive.
+
+        Picks up to `batch_size` orders in a terminal status whose last update
+        is older than `older_than`, writes them to the archive and deletes them
+        from the hot tables (items and histories go with them through the
+        cascading foreign keys). Rows locked by a concurrent writer are skipped.
+
+        Returns the number of archived orders.
+        """
+        result = await self.db.execute(
+            select(OrderModel)
+            .options(
+                selectinload(OrderModel.items).selectinload(ItemModel.status_history),
+                selectinload(OrderModel.status_history),
+            )
+            .where(
+                OrderModel.status.in_(TERMINAL_ORDER_STATUSES),
+                OrderModel.updated_at < older_than,
+            )
+            .order_by(OrderModel.updated_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True),
+        )
+        orders = list(result.scalars().all())
+        if not orders:
+            return 0
+
+        await self.db.execute(
+            insert(OrderArchiveModel)
+            .values([order_db_to_archive(order) for order in orders])
+            .on_conflict_do_nothing(index_elements=[OrderArchiveModel.id]),
+        )
+        await self.db.execute(
+            delete(OrderModel).where(
+                OrderModel.id.in_([order.id for order in orders]),
+            ),
+        )
+
+        return len(orders)
@@ -0,0 +1,20 @@
+from sqlalchemy import DDL
+
+# Columns of the orders table searched by trigram similarity.
+CUSTOMER_SEARCH_COLUMNS = ("customer_name", "customer_phone")
+
+# pg_trgm ships with the PostgreSQL contrib modules, which not every server
+# has. The migration requires it; tables created from the models, as in the
+# tests, only get the extension and the GIN indexes where it can be
+# installed, and the search is unavailable otherwise.
+CUSTOMER_SEARCH_DDL = DDL(
+    "DO $$ BEGIN "
+    "IF EXISTS (SELECT FROM pg_available_extensions WHERE name = 'pg_trgm') THEN "
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+    + "".join(
+        f"CREATE INDEX IF NOT EXISTS ix_orders_{column}_trgm "
+        f"ON orders USING gin ({column} gin_trgm_ops); "
+        for column in CUSTOMER_SEARCH_COLUMNS
+    )
+    + "END IF; END $$",
+)
@@ -0,0 +1,76 @@
+from enum import IntEnum
+from typing import Any, Optional, Type, TypeVar
+
+from sqlalchemy import Dialect, SmallInteger, String, Uuid
+from sqlalchemy.types import Enum as SQLAlchemyEnum
+from sqlalchemy.types import TypeDecorator, TypeEngine
+
+from huuva_backend.settings import settings
+
+E = TypeVar("E", bound=IntEnum)
+
+
+class IntEnumType(TypeDecorator[E]):
+    """
+    Store an IntEnum as its value in a SMALLINT column.
+
+    Accepts any IntEnum member (entity and model enums share their values)
+    as well as member names, and always loads members of `enum_class`.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[E]) -> None:
+        super().__init__()
+        self.enum_class = enum_class
+
+    @property
+    def python_type(self) -> Type[E]:
+        """Python type of the loaded values."""
+        return self.enum_class
+
+    def _to_int(self, value: Any) -> Optional[int]:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return int(self.enum_class[value])
+        return int(value)
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Optional[int]:
+        """Convert a member (or its name) to its integer value."""
+        return self._to_int(value)
+
+    def process_literal_param(self, value: Any, dialect: Dialect) -> str:
+        """Render a member as an integer literal, e.g. in index predicates."""
+        return str(self._to_int(value))
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Optional[E]:
+        """Convert a stored integer back to a member of `enum_class`."""
+        if value is None:
+            return None
+        return self.enum_class(value)
+
+
+def status_type(enum_class: Type[E]) -> TypeEngine[Any]:
+    """
+    Column type for a status enum.
+
+    Statuses are stored by name in a VARCHAR unless `db_native_types` is
+    enabled, in which case they take a two byte SMALLINT.
+    """
+    if settings.db_native_types:
+        return IntEnumType(enum_class)
+    return SQLAlchemyEnum(enum_class, native_enum=False)
+
+
+def generated_id_type() -> TypeEngine[str]:
+    """
+    Column type for server generated UUID keys.
+
+    A native 16 byte `uuid` when `db_native_types` is enabled, a VARCHAR
+    otherwise. Values are `str` either way.
+    """
+    if settings.db_native_types:
+        return Uuid(as_uuid=False)
+    return String()
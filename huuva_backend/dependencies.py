@@ -1,6 +1,12 @@
+from typing import List, Optional
+
 from fastapi import Body, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
 
+from huuva_backend.core.entities.item import (
+    ItemStatusChange as CoreItemStatusChange,
+)
 from huuva_backend.core.entities.item import (
     ItemUpdate as CoreItemUpdate,
 )
@@ -13,11 +19,24 @@ from huuva_backend.core.entities.order import (
 from huuva_backend.db.database import get_db_session
 from huuva_backend.db.repositories.item import ItemRepository
 from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.exceptions.exceptions import UnavailableError
+from huuva_backend.services.active_orders import ActiveOrderBoard
+from huuva_backend.services.idempotency import IdempotencyService
 from huuva_backend.services.item import ItemService
 from huuva_backend.services.order import OrderService
+from huuva_backend.settings import settings
+from huuva_backend.web.api.api_formats.item import (
+    MAX_ITEM_STATUS_CHANGES,
+)
+from huuva_backend.web.api.api_formats.item import (
+    ItemStatusChange as ApiItemStatusChange,
+)
 from huuva_backend.web.api.api_formats.item import (
     ItemUpdate as ApiItemUpdate,
 )
+from huuva_backend.web.api.api_formats.item import (
+    OrderItemStatusChange as ApiOrderItemStatusChange,
+)
 from huuva_backend.web.api.api_formats.order import (
     OrderCreate as ApiOrderCreate,
 )
@@ -65,15 +84,82 @@ def get_item_update_entity(item_up: ApiItemUpdate = Body(...)) -> CoreItemUpdate
     return CoreItemUpdate.model_validate(data)
 
 
-def get_order_service(db: AsyncSession = Depends(get_db_session)) -> OrderService:
+def get_item_status_changes(
+    order_id: str,
+    changes: List[ApiItemStatusChange] = Body(
+        ...,
+        min_length=1,
+        max_length=MAX_ITEM_STATUS_CHANGES,
+    ),
+) -> List[CoreItemStatusChange]:
+    """Transform the item status changes of the order `order_id` to core entities."""
+    return [
+        CoreItemStatusChange.model_validate(
+            {**change.model_dump(), "order_id": order_id},
+        )
+        for change in changes
+    ]
+
+
+def get_order_item_status_changes(
+    changes: List[ApiOrderItemStatusChange] = Body(
+        ...,
+        min_length=1,
+        max_length=MAX_ITEM_STATUS_CHANGES,
+    ),
+) -> List[CoreItemStatusChange]:
+    """Transform item status changes across orders to core entities."""
+    return [
+        CoreItemStatusChange.model_validate(change.model_dump()) for change in changes
+    ]
+
+
+def get_active_order_board(request: Request) -> Optional[ActiveOrderBoard]:
+    """The active order board of this worker, None unless it is enabled."""
+    return getattr(request.app.state, "active_orders", None)
+
+
+def get_ready_active_order_board(
+    board: Optional[ActiveOrderBoard] = Depends(get_active_order_board),
+) -> ActiveOrderBoard:
+    """
+    The active order board of this worker, to be read from.
+
+    Raises UnavailableError if it is disabled, or not loaded or following
+    the changes at the moment.
+    """
+    if board is None or not board.ready:
+        raise UnavailableError("Active order board")
+    return board
+
+
+def get_order_service(
+    db: AsyncSession = Depends(get_db_session),
+    active_orders: Optional[ActiveOrderBoard] = Depends(get_active_order_board),
+) -> OrderService:
     """Dependency to get the OrderService instance."""
     order_repo = OrderRepository(db=db)
-    item_repo = ItemRepository(db=db)
 
-    return OrderService(order_repository=order_repo, item_repository=item_repo)
+    return OrderService(order_repository=order_repo, active_orders=active_orders)
 
 
-def get_item_service(db: AsyncSession = Depends(get_db_session)) -> ItemService:
+def get_item_service(
+    db: AsyncSession = Depends(get_db_session),
+    active_orders: Optional[ActiveOrderBoard] = Depends(get_active_order_board),
+) -> ItemService:
     """Dependency to get the ItemService instance."""
     repo = ItemRepository(db=db)
-    return ItemService(item_repository=repo)
+    if settings.derive_order_status:
+        return ItemService(
+            item_repository=repo,
+            order_repository=OrderRepository(db),
+            active_orders=active_orders,
+        )
+    return ItemService(item_repository=repo, active_orders=active_orders)
+
+
+def get_idempotency_service(
+    db: AsyncSession = Depends(get_db_session),
+) -> IdempotencyService:
+    """Dependency to get the IdempotencyService instance."""
+    return IdempotencyService(db)
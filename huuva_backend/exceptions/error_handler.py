@@ -1,22 +1,63 @@
 import logging
+import time
+from typing import Dict
 
 from fastapi import FastAPI, Request
 from fastapi.responses import UJSONResponse
 
-from huuva_backend.exceptions.exceptions import ConflictError, NotFoundError
+from huuva_backend.exceptions.exceptions import (
+    BaseAPIError,
+    ConflictError,
+    NotFoundError,
+    UnavailableError,
+)
+from huuva_backend.metrics import API_ERRORS
+from huuva_backend.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
+class ExpectedErrorLog:
+    """
+    Log of expected API errors, such as 404s of stale polls.
+
+    They are part of normal operation, so they are counted per type, and
+    logged at INFO without a traceback at most once per
+    `settings.expected_error_log_interval_seconds` and type.
+    """
+
+    def __init__(self) -> None:
+        self._next_log: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+
+    def record(self, exc: BaseAPIError) -> None:
+        """Count `exc` and log it unless its type was logged recently."""
+        error = type(exc).__name__
+        API_ERRORS.labels(error).inc()
+        now = time.monotonic()
+        if now < self._next_log.get(error, 0):
+            self._suppressed[error] = self._suppressed.get(error, 0) + 1
+            return
+        self._next_log[error] = now + settings.expected_error_log_interval_seconds
+        logger.info(
+            "%s: %s (%d more since the last one logged)",
+            error,
+            exc.message,
+            self._suppressed.pop(error, 0),
+        )
+
+
 def register_exception_handlers(app: FastAPI) -> None:
     """Registers custom exception handlers for the FastAPI application."""
+    expected_errors = ExpectedErrorLog()
 
     @app.exception_handler(NotFoundError)
     async def not_found_exception_handler(
         request: Request,
         exc: NotFoundError,
     ) -> UJSONResponse:
-        logger.error(f"NotFoundError: {exc}", exc_info=True)
+        """Handles NotFoundError exceptions, counts them, and returns a 404."""
+        expected_errors.record(exc)
         return UJSONResponse(status_code=404, content={"detail": str(exc)})
 
     @app.exception_handler(ConflictError)
@@ -24,10 +65,19 @@ def register_exception_handlers(app: FastAPI) -> None:
         request: Request,
         exc: ConflictError,
     ) -> UJSONResponse:
-        """Handles ConflictError exceptions, logs them, and returns a 409 response."""
-        logger.error(f"ConflictError: {exc}", exc_info=True)
+        """Handles ConflictError exceptions, counts them, and returns a 409."""
+        expected_errors.record(exc)
         return UJSONResponse(status_code=409, content={"detail": exc.message})
 
+    @app.exception_handler(UnavailableError)
+    async def unavailable_exception_handler(
+        request: Request,
+        exc: UnavailableError,
+    ) -> UJSONResponse:
+        """Handles UnavailableError exceptions, counts them, and returns a 503."""
+        expected_errors.record(exc)
+        return UJSONResponse(status_code=503, content={"detail": exc.message})
+
     @app.exception_handler(Exception)
     async def global_exception_handler(
         request: Request,
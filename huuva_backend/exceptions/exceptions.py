@@ -16,3 +16,9 @@ class ConflictError(BaseAPIError):
     def __init__(self, entity_name: str, identifier: str) -> None:
         message = f"Conflict with {entity_name} with identifier: {identifier}"
         super().__init__(message)
+
+
+class UnavailableError(BaseAPIError):
+    def __init__(self, resource: str) -> None:
+        message = f"{resource} is not available, try again later"
+        super().__init__(message)
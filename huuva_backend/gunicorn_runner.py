@@ -1,6 +1,9 @@
-from typing import Any
+import gc
+import os
+from typing import Any, Callable
 
 from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
 from gunicorn.util import import_app
 from uvicorn_worker import UvicornWorker as BaseUvicornWorker
 
@@ -28,6 +31,29 @@ class UvicornWorker(BaseUvicornWorker):
     }
 
 
+class PreloadedUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker serving an application built in the gunicorn master.
+
+    The worker gets the application object itself instead of its factory.
+    """
+
+    CONFIG_KWARGS: dict[str, Any] = {  # noqa: RUF012
+        **UvicornWorker.CONFIG_KWARGS,
+        "factory": False,
+    }
+
+
+def child_exit(server: Arbiter, worker: BaseUvicornWorker) -> None:
+    """Drop the live gauge values of a dead worker from the metrics."""
+    # Imported here so that the master does not import prometheus_client
+    # before PROMETHEUS_MULTIPROC_DIR is set.
+    from prometheus_client import multiprocess
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
+
+
 class GunicornApplication(BaseApplication):
     """
     Custom gunicorn application.
@@ -44,10 +70,13 @@ class GunicornApplication(BaseApplication):
         workers: int,
         **kwargs: Any,
     ) -> None:
+        worker_class = (
+            "PreloadedUvicornWorker" if kwargs.get("preload_app") else "UvicornWorker"
+        )
         self.options = {
             "bind": f"{host}:{port}",
             "workers": workers,
-            "worker_class": "huuva_backend.gunicorn_runner.UvicornWorker",
+            "worker_class": f"huuva_backend.gunicorn_runner.{worker_class}",
             **kwargs,
         }
         self.app = app
@@ -66,14 +95,27 @@ class GunicornApplication(BaseApplication):
             if key in self.cfg.settings and value is not None:
                 self.cfg.set(key.lower(), value)
 
-    def load(self) -> str:
+    def load(self) -> Callable[..., Any]:
         """
         Load actual application.
 
         Gunicorn loads application based on this
-        function's returns. We return python's path to
-        the app's factory.
+        function's returns. We return the app's factory,
+        which each worker calls.
+
+        With `preload_app` this runs once in the master, which
+        builds the application itself for the workers to
+        inherit. The objects that exist then are frozen out of
+        the garbage collector, so that collections in the
+        workers do not write to, and copy, the shared pages.
+        The database engine and the scheduler are only created
+        by the lifespan, after the fork.
 
-        :returns: python path to app factory.
+        :returns: app factory, or the app with `preload_app`.
         """
-        return import_app(self.app)
+        factory = import_app(self.app)
+        if not self.cfg.preload_app:
+            return factory
+        app = factory()
+        gc.freeze()
+        return app
@@ -0,0 +1,516 @@
+"""
+Offline importer of historical orders.
+
+Streams a JSON array or NDJSON file of order payloads, in the format of
+`POST /api/orders`, into the configured database::
+
+    python -m huuva_backend.importer orders.ndjson --batch-size 2000 --workers 4
+
+Payloads are validated and turned into rows in a process pool, and each
+batch is loaded with `COPY` into the four order tables in one transaction.
+Orders that already exist, by id or by brand and channel order id, are
+skipped. The number of records done is saved to a checkpoint file after
+every batch, so an interrupted import resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import functools
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import Table, or_, select, tuple_
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from huuva_backend.core.entities.order import OrderCreate
+from huuva_backend.db.mappings.order import order_create_to_row
+from huuva_backend.db.models.item import Item as ItemModel
+from huuva_backend.db.models.item_status import ItemStatus as ItemStatusModel
+from huuva_backend.db.models.item_status import (
+    ItemStatusHistory as ItemStatusHistoryModel,
+)
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.models.order_archive import OrderArchive as OrderArchiveModel
+from huuva_backend.db.models.order_status import OrderStatus as OrderStatusModel
+from huuva_backend.db.models.order_status import (
+    OrderStatusHistory as OrderStatusHistoryModel,
+)
+from huuva_backend.db.partitions import month_start
+from huuva_backend.services.partition import PartitionService
+from huuva_backend.settings import settings
+from huuva_backend.web.api.api_formats.order import OrderCreate as ApiOrderCreate
+
+logger = logging.getLogger(__name__)
+
+# In dependency order, the order a batch is copied in.
+TABLES: Tuple[Table, ...] = (
+    OrderModel.__table__,  # type: ignore[assignment]
+    ItemModel.__table__,  # type: ignore[assignment]
+    OrderStatusHistoryModel.__table__,  # type: ignore[assignment]
+    ItemStatusHistoryModel.__table__,  # type: ignore[assignment]
+)
+
+Record = Union[str, Dict[str, Any]]
+
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def _array_records(file: TextIO, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """Decode the objects of a JSON array one by one, reading chunk by chunk."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("expected a JSON array or NDJSON")
+    position = 1
+    at_end = False
+    while True:
+        position = _SEPARATOR.match(buffer, position).end()  # type: ignore[union-attr]
+        if buffer.startswith("]", position):
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if at_end:
+                raise
+            chunk = file.read(chunk_size)
+            at_end = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield record
+
+
+def read_records(path: Path, chunk_size: int = 1 << 20) -> Iterator[Record]:
+    """
+    Stream the records of a JSON array or NDJSON file.
+
+    NDJSON lines are yielded undecoded, to be parsed by the workers; objects
+    of a JSON array have to be decoded to be found.
+    """
+    with path.open(encoding="utf-8") as file:
+        first = file.read(chunk_size).lstrip()[:1]
+        file.seek(0)
+        if first == "[":
+            yield from _array_records(file, chunk_size)
+            return
+        for line in file:
+            if line.strip():
+                yield line
+
+
+@dataclass
+class OrderRows:
+    """COPY records of an order, per table name."""
+
+    order_id: str
+    # Brand id and channel order id, unique like the order id.
+    channel_order: Tuple[str, str]
+    rows: Dict[str, List[Tuple[Any, ...]]]
+    # Times of the history entries, whose months need partitions.
+    timestamps: List[datetime]
+
+
+@dataclass
+class Batch:
+    """Records `start` to `end` of the input, converted to rows."""
+
+    start: int
+    end: int
+    orders: List[OrderRows] = field(default_factory=list)
+    months: Set[datetime] = field(default_factory=set)
+    invalid: List[str] = field(default_factory=list)
+
+
+@functools.lru_cache(maxsize=None)
+def _columns(table: Table) -> Tuple[List[str], List[Any]]:
+    """Column names of `table` and the conversion of values for asyncpg."""
+    dialect = asyncpg_dialect()
+    names = [column.name for column in table.columns]
+    processors = [column.type.bind_processor(dialect) for column in table.columns]
+    return names, processors
+
+
+def copy_record(table: Table, row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """COPY record of `row`, a value per column of `table`."""
+    names, processors = _columns(table)
+    return tuple(
+        process(row[name]) if process is not None else row[name]
+        for name, process in zip(names, processors)
+    )
+
+
+def order_rows(order: OrderCreate) -> OrderRows:
+    """
+    Rows of an order and its items and histories, as `create` would insert them.
+
+    Historical orders keep their times: without `created`, the order is
+    dated by its first status history entry, and the initial status entries
+    of the items by the order.
+    """
+    history_times = [entry.timestamp for entry in order.status_history]
+    row = order_create_to_row(order)
+    row.setdefault("id", str(uuid4()))
+    created_at = row.setdefault(
+        "created_at",
+        min(history_times, default=datetime.now(timezone.utc)),
+    )
+    row["updated_at"] = max([*history_times, created_at])
+    order_id = row["id"]
+
+    items = [
+        {
+            "order_id": order_id,
+            "plu": item.plu,
+            "name": item.name,
+            "quantity": item.quantity,
+            "status": (
+                ItemStatusModel(item.status.value)
+                if item.status is not None
+                else ItemStatusModel.ORDERED
+            ),
+        }
+        for item in order.items
+    ]
+    order_history = [
+        {
+            "id": str(uuid4()),
+            "order_id": order_id,
+            "status": OrderStatusModel(entry.status.value),
+            "timestamp": entry.timestamp,
+        }
+        for entry in order.status_history
+    ]
+    item_history = [
+        {
+            "id": str(uuid4()),
+            "order_id": order_id,
+            "item_plu": item["plu"],
+            "status": item["status"],
+            "timestamp": created_at,
+        }
+        for item in items
+    ]
+
+    tables = dict(zip(TABLES, ([row], items, order_history, item_history)))
+    return OrderRows(
+        order_id=order_id,
+        channel_order=(order.brand_id, order.channel_order_id),
+        rows={
+            table.name: [copy_record(table, table_row) for table_row in table_rows]
+            for table, table_rows in tables.items()
+        },
+        timestamps=[*history_times, created_at],
+    )
+
+
+def convert_batch(start: int, records: List[Record]) -> Batch:
+    """
+    Validate `records` and convert them to rows. Runs in the process pool.
+
+    Invalid records and repeated orders, by order id or channel order id,
+    are left out; the former are reported in `invalid`. An order listing a
+    PLU twice is invalid: its items would break the primary key of the items
+    table, as they do for `POST /api/orders`, and fail the whole COPY.
+    """
+    batch = Batch(start=start, end=start + len(records))
+    seen: Set[Any] = set()
+    for number, record in enumerate(records, start=start + 1):
+        try:
+            if isinstance(record, str):
+                api_order = ApiOrderCreate.model_validate_json(record)
+            else:
+                api_order = ApiOrderCreate.model_validate(record)
+            order = OrderCreate.model_validate(api_order.model_dump())
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            batch.invalid.append(f"record {number}: {location}: {error['msg']}")
+            continue
+        plus = [item.plu for item in order.items]
+        repeated = sorted({plu for plu in plus if plus.count(plu) > 1})
+        if repeated:
+            batch.invalid.append(
+                f"record {number}: items: repeated PLU {', '.join(repeated)}",
+            )
+            continue
+
+        rows = order_rows(order)
+        if rows.order_id in seen or rows.channel_order in seen:
+            continue
+        seen.update((rows.order_id, rows.channel_order))
+        batch.orders.append(rows)
+        batch.months.update(month_start(moment) for moment in rows.timestamps)
+    return batch
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import."""
+
+    records: int = 0
+    imported: int = 0
+    skipped_existing: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+
+
+class Checkpoint:
+    """Number of input records already done, kept in a file."""
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+
+    def read(self) -> int:
+        """Records done by previous runs, 0 without a checkpoint."""
+        if self.path is None or not self.path.exists():
+            return 0
+        return int(json.loads(self.path.read_text())["records"])
+
+    def write(self, records: int) -> None:
+        """Save the number of records done; atomically, so a crash cannot corrupt it."""
+        if self.path is None:
+            return
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps({"records": records}))
+        temporary.replace(self.path)
+
+
+class OrderImporter:
+    """Loads batches of converted orders with COPY."""
+
+    def __init__(self, engine: AsyncEngine, checkpoint: Checkpoint) -> None:
+        self.engine = engine
+        self.checkpoint = checkpoint
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        self.partitioned_months: Set[datetime] = set()
+        self.report = ImportReport()
+
+    async def load(self, batch: Batch) -> None:
+        """Copy the orders of `batch` that do not exist yet, in one transaction."""
+        for message in batch.invalid:
+            logger.warning("Invalid order, skipped: %s", message)
+        await self._create_partitions(batch.months)
+
+        async with self.engine.begin() as conn:
+            order_ids = [order.order_id for order in batch.orders]
+            channel_order = tuple_(OrderModel.brand_id, OrderModel.channel_order_id)
+            result = await conn.execute(
+                select(
+                    OrderModel.id,
+                    OrderModel.brand_id,
+                    OrderModel.channel_order_id,
+                ).where(
+                    or_(
+                        OrderModel.id.in_(order_ids),
+                        channel_order.in_(
+                            [order.channel_order for order in batch.orders],
+                        ),
+                    ),
+                ),
+            )
+            existing: Set[Any] = set()
+            for order_id, brand_id, channel_order_id in result:
+                existing.update((order_id, (brand_id, channel_order_id)))
+            # Archived orders are no longer in the unique indexes of orders.
+            existing.update(
+                await conn.scalars(
+                    select(OrderArchiveModel.id).where(
+                        OrderArchiveModel.id.in_(order_ids),
+                    ),
+                ),
+            )
+            orders = [
+                order
+                for order in batch.orders
+                if order.order_id not in existing
+                and order.channel_order not in existing
+            ]
+            # The SELECT has begun the transaction the COPYs run in.
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            for table in TABLES:
+                records = [
+                    record for order in orders for record in order.rows[table.name]
+                ]
+                if records:
+                    await driver.copy_records_to_table(  # type: ignore[union-attr]
+                        table.name,
+                        records=records,
+                        columns=_columns(table)[0],
+                    )
+
+        self.checkpoint.write(batch.end)
+        self.report.records = batch.end
+        self.report.imported += len(orders)
+        self.report.skipped_existing += len(batch.orders) - len(orders)
+        self.report.invalid += len(batch.invalid)
+        logger.info(
+            "Imported records %d-%d: %d orders, %d existing, %d invalid",
+            batch.start + 1,
+            batch.end,
+            len(orders),
+            len(batch.orders) - len(orders),
+            len(batch.invalid),
+        )
+
+    async def _create_partitions(self, months: Set[datetime]) -> None:
+        missing = months - self.partitioned_months
+        if not missing:
+            return
+        async with self.session_factory() as session:
+            await PartitionService(session).create_partitions(missing)
+        self.partitioned_months |= missing
+
+
+def _batches(
+    records: Iterator[Record],
+    size: int,
+    start: int,
+) -> Iterator[Tuple[int, List[Record]]]:
+    while batch := list(itertools.islice(records, size)):
+        yield start, batch
+        start += len(batch)
+
+
+async def load_batches(
+    importer: OrderImporter,
+    convert: Callable[..., Batch],
+    jobs: Iterable[Tuple[Any, ...]],
+    workers: int,
+) -> None:
+    """
+    Load the batches made by `convert(*job)` for each job, in job order.
+
+    With `workers=0` the batches are made in this process. Otherwise at
+    most two batches per worker are in flight, which bounds the memory used.
+    """
+    if workers == 0:
+        for job in jobs:
+            await importer.load(convert(*job))
+        return
+
+    loop = asyncio.get_running_loop()
+    pool: Executor = ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    with pool:
+        pending: Deque["asyncio.Future[Batch]"] = deque()
+        for job in jobs:
+            pending.append(loop.run_in_executor(pool, convert, *job))
+            if len(pending) >= 2 * workers:
+                await importer.load(await pending.popleft())
+        while pending:
+            await importer.load(await pending.popleft())
+
+
+async def import_orders(
+    path: Path,
+    engine: AsyncEngine,
+    batch_size: int = 1000,
+    workers: int = 0,
+    checkpoint: Optional[Path] = None,
+) -> ImportReport:
+    """
+    Import the orders of `path`, resuming after the records in `checkpoint`.
+
+    The records are converted by `workers` processes, or by this one with 0.
+    """
+    started = time.perf_counter()
+    saved = Checkpoint(checkpoint)
+    done = saved.read()
+    if done:
+        logger.info("Resuming after record %d", done)
+    importer = OrderImporter(engine, saved)
+    importer.report.records = done
+    records = itertools.islice(read_records(path), done, None)
+    batches = _batches(records, batch_size, done)
+    await load_batches(importer, convert_batch, batches, workers)
+
+    importer.report.seconds = round(time.perf_counter() - started, 3)
+    return importer.report
+
+
+async def _run(args: argparse.Namespace) -> ImportReport:
+    engine = create_async_engine(str(settings.db_url))
+    try:
+        return await import_orders(
+            args.path,
+            engine,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            checkpoint=None if args.no_checkpoint else args.checkpoint,
+        )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Entrypoint of the importer."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", type=Path, help="JSON array or NDJSON file")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="orders per COPY transaction",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="validating processes, 0 to validate in the main process",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="checkpoint file, <path>.checkpoint by default",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="neither resume nor save progress",
+    )
+    args = parser.parse_args()
+    if args.checkpoint is None:
+        args.checkpoint = args.path.with_name(args.path.name + ".checkpoint")
+
+    logging.basicConfig(
+        level=settings.log_level.value,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    report = asyncio.run(_run(args))
+    sys.stdout.write(json.dumps(dataclasses.asdict(report), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
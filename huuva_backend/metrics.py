@@ -0,0 +1,63 @@
+"""
+Prometheus metrics of the application.
+
+Under gunicorn, `PROMETHEUS_MULTIPROC_DIR` is set before the workers start,
+so every worker writes its values to files there and a scrape of any worker
+aggregates all of them. Gauges declare how values of several workers
+combine.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route template.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured size of the database connection pools.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Open database connections.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections in use by a request or job.",
+    multiprocess_mode="livesum",
+)
+
+MATERIALIZED_VIEW_REFRESH_DURATION = Histogram(
+    "materialized_view_refresh_duration_seconds",
+    "Time to refresh all analytics materialized views.",
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300),
+)
+# The age is `time() - materialized_view_last_refresh_timestamp_seconds`.
+MATERIALIZED_VIEW_LAST_REFRESH = Gauge(
+    "materialized_view_last_refresh_timestamp_seconds",
+    "Unix time of the last successful materialized view refresh.",
+    multiprocess_mode="max",
+)
+
+API_ERRORS = Counter(
+    "api_errors",
+    "Expected API errors, such as unknown ids and conflicts, by type.",
+    ["error"],
+)
+
+ORDER_STATUS_TRANSITIONS = Counter(
+    "order_status_transitions",
+    "Order status changes. New orders come from the NONE status.",
+    ["from_status", "to_status"],
+)
@@ -1,10 +1,14 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from huuva_backend.services.analytics import AnalyticsService
+from huuva_backend.services.archive import ArchiveService
+from huuva_backend.services.idempotency import IdempotencyService
+from huuva_backend.services.partition import PartitionService
+from huuva_backend.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,53 @@ class AnalyticsScheduler:
         finally:
             await session.close()
 
+    async def create_future_partitions(self) -> None:
+        """Job to create the upcoming monthly partitions of the history tables."""
+        logger.info("Starting partition maintenance job at %s", datetime.now())
+        try:
+            session: AsyncSession = self.session_factory()
+            partition_service = PartitionService(session)
+
+            created = await partition_service.create_future_partitions(
+                settings.partition_months_ahead,
+            )
+            logger.info("Created partitions: %s", ", ".join(created) or "none")
+        except Exception as e:
+            logger.error("Error creating partitions: %s", str(e))
+        finally:
+            await session.close()
+
+    async def archive_completed_orders(self) -> None:
+        """Job to move old picked up and cancelled orders into the archive."""
+        logger.info("Starting order archival job at %s", datetime.now())
+        try:
+            session: AsyncSession = self.session_factory()
+            archive_service = ArchiveService(session)
+
+            archived = await archive_service.archive_completed_orders(
+                older_than=timedelta(days=settings.archive_after_days),
+                batch_size=settings.archive_batch_size,
+            )
+            logger.info("Archived %d completed orders", archived)
+        except Exception as e:
+            logger.error("Error archiving completed orders: %s", str(e))
+        finally:
+            await session.close()
+
+    async def purge_idempotency_keys(self) -> None:
+        """Job to delete expired idempotency keys."""
+        logger.info("Starting idempotency key purge job at %s", datetime.now())
+        try:
+            session: AsyncSession = self.session_factory()
+            idempotency_service = IdempotencyService(session)
+
+            deleted = await idempotency_service.purge_expired()
+            logger.info("Purged %d expired idempotency keys", deleted)
+        except Exception as e:
+            logger.error("Error purging idempotency keys: %s", str(e))
+        finally:
+            await session.close()
+
     def start(self) -> None:
         """Start the scheduler."""
         # Schedule the job to run every hour
@@ -50,6 +101,33 @@ class AnalyticsScheduler:
             replace_existing=True,
         )
 
+        # Keep the history partitions ahead of the clock
+        self.scheduler.add_job(
+            self.create_future_partitions,
+            "interval",
+            days=1,
+            next_run_time=datetime.now(),
+            id="create_future_partitions",
+            replace_existing=True,
+        )
+
+        if settings.archive_enabled:
+            self.scheduler.add_job(
+                self.archive_completed_orders,
+                "interval",
+                minutes=settings.archive_interval_minutes,
+                id="archive_completed_orders",
+                replace_existing=True,
+            )
+
+        self.scheduler.add_job(
+            self.purge_idempotency_keys,
+            "interval",
+            hours=1,
+            id="purge_idempotency_keys",
+            replace_existing=True,
+        )
+
         self.scheduler.start()
         logger.info("Analytics scheduler started")
 
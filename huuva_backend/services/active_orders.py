@@ -0,0 +1,274 @@
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from huuva_backend.core.entities.item import Item
+from huuva_backend.core.entities.order import Order
+from huuva_backend.core.entities.order_status import OrderStatus
+from huuva_backend.db.mappings.order import order_db_to_entity
+from huuva_backend.db.models.order_status import OrderStatus as OrderStatusModel
+from huuva_backend.db.notifications import ACTIVE_ORDERS_CHANNEL
+from huuva_backend.db.repositories.order import OrderRepository
+
+logger = logging.getLogger(__name__)
+
+# Orders the kitchen is still working on.
+ACTIVE_ORDER_STATUSES = frozenset(
+    {OrderStatus.RECEIVED, OrderStatus.PREPARING, OrderStatus.READY},
+)
+_ACTIVE_STATUS_MODELS = [
+    OrderStatusModel(status.value) for status in sorted(ACTIVE_ORDER_STATUSES)
+]
+
+# Key of the actions waiting for the commit in `Session.info`.
+_AFTER_COMMIT = "active_orders_after_commit"
+
+
+def after_commit(session: AsyncSession, action: Callable[[], None]) -> None:
+    """
+    Run `action` once the transaction of `session` commits.
+
+    Actions of a transaction that rolls back are dropped, so neither the board
+    nor the metrics ever show a change the database does not have.
+    """
+    sync_session = session.sync_session
+    if _AFTER_COMMIT not in sync_session.info:
+        sync_session.info[_AFTER_COMMIT] = []
+        event.listen(sync_session, "after_commit", _run_actions)
+        event.listen(sync_session, "after_rollback", _drop_actions)
+    sync_session.info[_AFTER_COMMIT].append(action)
+
+
+def _run_actions(sync_session: Any) -> None:
+    actions = sync_session.info[_AFTER_COMMIT]
+    sync_session.info[_AFTER_COMMIT] = []
+    for action in actions:
+        action()
+
+
+def _drop_actions(sync_session: Any) -> None:
+    sync_session.info[_AFTER_COMMIT] = []
+
+
+class ActiveOrderBoard:
+    """
+    The orders in an active status, in memory, indexed by brand and status.
+
+    Each worker has its own board, filled by an `ActiveOrderListener`. The
+    write paths of the worker put the orders they change on the board as soon
+    as they commit; changes made by other workers arrive as notifications. Orders that
+    reach a final status are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._orders: Dict[str, Order] = {}
+        # Ids of the orders by brand and status.
+        self._index: DefaultDict[str, Dict[OrderStatus, Set[str]]] = defaultdict(dict)
+        # False until loaded, and while the notifications may have been missed.
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def load(self, orders: Iterable[Order]) -> None:
+        """Replace the board with `orders`."""
+        self._orders.clear()
+        self._index.clear()
+        for order in orders:
+            self.put(order)
+        self.ready = True
+
+    def replace(self, order_ids: Iterable[str], orders: Iterable[Order]) -> None:
+        """Drop the orders of `order_ids`, then put `orders`, their active ones."""
+        for order_id in order_ids:
+            self.discard(order_id)
+        for order in orders:
+            self.put(order)
+
+    def put(self, order: Order) -> None:
+        """Add or replace `order`, or drop it if it is no longer active."""
+        self.discard(order.id)
+        if order.status not in ACTIVE_ORDER_STATUSES:
+            return
+        self._orders[order.id] = order
+        self._index[order.brand_id].setdefault(order.status, set()).add(order.id)
+
+    def put_item(self, order_id: str, item: Item) -> None:
+        """Replace an item of an order on the board."""
+        order = self._orders.get(order_id)
+        if order is None:
+            return
+        items = [item if old.plu == item.plu else old for old in order.items]
+        self._orders[order_id] = order.model_copy(update={"items": items})
+
+    def discard(self, order_id: str) -> None:
+        """Drop an order, if it is on the board."""
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return
+        by_status = self._index[order.brand_id]
+        by_status[order.status].discard(order_id)
+        if not by_status[order.status]:
+            del by_status[order.status]
+            if not by_status:
+                del self._index[order.brand_id]
+
+    def orders(
+        self,
+        brand_id: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+    ) -> List[Order]:
+        """Active orders, optionally of a brand and a status, oldest first."""
+        brands = [brand_id] if brand_id is not None else list(self._index)
+        statuses = [status] if status is not None else list(ACTIVE_ORDER_STATUSES)
+        orders = [
+            self._orders[order_id]
+            for brand in brands
+            if brand in self._index
+            for board_status in statuses
+            for order_id in self._index[brand].get(board_status, ())
+        ]
+        return sorted(orders, key=lambda order: order.created_at)
+
+
+class ActiveOrderListener:
+    """
+    Loads an `ActiveOrderBoard` and keeps it current from the database.
+
+    A connection taken out of the pool LISTENs on `ACTIVE_ORDERS_CHANNEL`,
+    where the triggers of the orders and items tables notify the id of every
+    active order that changes. Notified orders are read back in batches, one
+    query per batch. When the connection is lost, the board is marked not
+    ready until it is reconnected and loaded again.
+    """
+
+    def __init__(
+        self,
+        board: ActiveOrderBoard,
+        engine: AsyncEngine,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.board = board
+        self.engine = engine
+        self.session_factory = session_factory
+        self.reconnect_delay = reconnect_delay
+        self._connection: Optional[AsyncConnection] = None
+        self._driver: Any = None
+        self._pending: Set[str] = set()
+        self._wake = asyncio.Event()
+        self._lost = False
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Listen and load the board, then follow the notifications in a task."""
+        await self._listen()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop following the notifications and close the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        await self._close()
+
+    async def _listen(self) -> None:
+        self._lost = False
+        self._connection = await self.engine.connect()
+        raw = await self._connection.get_raw_connection()
+        driver: Any = raw.driver_connection
+        self._driver = driver
+        driver.add_termination_listener(self._on_termination)
+        await driver.add_listener(ACTIVE_ORDERS_CHANNEL, self._on_notification)
+        # Listening already, so an order changed during the load is read again.
+        self._pending.clear()
+        async with self.session_factory() as session:
+            orders = await OrderRepository(session).list_in_statuses(
+                _ACTIVE_STATUS_MODELS,
+            )
+        self.board.load(order_db_to_entity(order) for order in orders)
+        logger.info("Loaded %d active orders", len(self.board))
+
+    async def _close(self) -> None:
+        self._driver = None
+        if self._connection is None:
+            return
+        # Still listening, the connection must not go back to the pool.
+        with contextlib.suppress(Exception):
+            await self._connection.invalidate()
+        with contextlib.suppress(Exception):
+            await self._connection.close()
+        self._connection = None
+
+    def _on_notification(
+        self,
+        connection: Any,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        self._pending.add(payload)
+        self._wake.set()
+
+    def _on_termination(self, connection: Any) -> None:
+        # Connections closed by `_close` are no longer the current one.
+        if connection is self._driver:
+            self._lost = True
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if self._lost:
+                await self._reconnect()
+                continue
+            order_ids, self._pending = self._pending, set()
+            try:
+                await self._refresh(order_ids)
+            except Exception:
+                logger.exception("Error refreshing active orders, retrying")
+                self._pending |= order_ids
+                await asyncio.sleep(self.reconnect_delay)
+                self._wake.set()
+
+    async def _refresh(self, order_ids: Collection[str]) -> None:
+        async with self.session_factory() as session:
+            orders = await OrderRepository(session).list_in_statuses(
+                _ACTIVE_STATUS_MODELS,
+                order_ids,
+            )
+        self.board.replace(order_ids, (order_db_to_entity(order) for order in orders))
+
+    async def _reconnect(self) -> None:
+        self.board.ready = False
+        logger.warning("Lost the active order notifications, reconnecting")
+        while True:
+            await self._close()
+            try:
+                await self._listen()
+                return
+            except Exception:
+                logger.exception("Error reconnecting the active order listener")
+                await asyncio.sleep(self.reconnect_delay)
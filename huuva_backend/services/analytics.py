@@ -3,6 +3,18 @@ from typing import Any, Dict, List
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from huuva_backend.metrics import (
+    MATERIALIZED_VIEW_LAST_REFRESH,
+    MATERIALIZED_VIEW_REFRESH_DURATION,
+)
+
+MATERIALIZED_VIEWS = (
+    "order_status_duration_avg",
+    "item_status_duration_avg",
+    "order_hourly_throughput",
+    "customer_order_count",
+)
+
 
 class AnalyticsService:
     """Service for analytics data operations."""
@@ -12,17 +24,12 @@ class AnalyticsService:
 
     async def refresh_materialized_views(self) -> None:
         """Refresh all materialized views for analytics."""
-        views = [
-            "order_status_duration_avg",
-            "item_status_duration_avg",
-            "order_hourly_throughput",
-            "customer_order_count",
-        ]
-
-        for view in views:
-            await self.db.execute(text(f"REFRESH MATERIALIZED VIEW {view};"))
+        with MATERIALIZED_VIEW_REFRESH_DURATION.time():
+            for view in MATERIALIZED_VIEWS:
+                await self.db.execute(text(f"REFRESH MATERIALIZED VIEW {view};"))
 
-        await self.db.commit()
+            await self.db.commit()
+        MATERIALIZED_VIEW_LAST_REFRESH.set_to_current_time()
 
     async def get_order_status_durations(self) -> List[Dict[str, Any]]:
         """Get average time spent in each order status."""
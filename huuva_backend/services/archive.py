@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.db.repositories.order_archive import OrderArchiveRepository
+
+
+class ArchiveService:
+    """Service for moving completed orders out of the hot tables."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.archive_repository = OrderArchiveRepository(db)
+
+    async def archive_completed_orders(
+        self,
+        older_than: timedelta,
+        batch_size: int,
+    ) -> int:
+        """
+        Archive every terminal order last updated more than `older_than` ago.
+
+        Each batch is committed on its own, so row locks are held briefly and
+        an interrupted run keeps the batches it already finished.
+        Returns the total number of archived orders.
+        """
+        cutoff = datetime.now(timezone.utc) - older_than
+        total = 0
+
+        while True:
+            archived = await self.archive_repository.archive(cutoff, batch_size)
+            await self.db.commit()
+            total += archived
+            if archived < batch_size:
+                return total
@@ -0,0 +1,72 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.core.entities.idempotency import StoredResponse
+from huuva_backend.db.repositories.idempotency_key import IdempotencyKeyRepository
+from huuva_backend.exceptions.exceptions import ConflictError
+from huuva_backend.settings import settings
+
+
+def payload_fingerprint(payload: BaseModel) -> bytes:
+    """SHA-256 digest identifying a request payload."""
+    return hashlib.sha256(payload.model_dump_json().encode()).digest()
+
+
+class IdempotencyService:
+    """Service for replaying responses of requests sent with an Idempotency-Key."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.idempotency_repository = IdempotencyKeyRepository(db)
+
+    async def get_response(
+        self,
+        key: str,
+        payload: BaseModel,
+    ) -> Optional[StoredResponse]:
+        """
+        Return the response stored for `key`, or None if there is none yet.
+
+        Raises ConflictError if the key was used for a different payload.
+        """
+        stored = await self.idempotency_repository.get(key, datetime.now(timezone.utc))
+        if stored is None:
+            return None
+        if stored.fingerprint != payload_fingerprint(payload):
+            raise ConflictError("Idempotency-Key", key)
+        return StoredResponse.model_validate(stored)
+
+    async def save_response(
+        self,
+        key: str,
+        payload: BaseModel,
+        status_code: int,
+        response: Any,
+    ) -> None:
+        """
+        Store the JSON-compatible `response` for `key`.
+
+        It is written in the request's transaction, so it is only kept if the
+        request's own changes are committed.
+        """
+        now = datetime.now(timezone.utc)
+        await self.idempotency_repository.save(
+            key,
+            payload_fingerprint(payload),
+            status_code,
+            response,
+            now,
+            now + timedelta(hours=settings.idempotency_key_ttl_hours),
+        )
+
+    async def purge_expired(self) -> int:
+        """Delete expired keys. Returns the number of deleted keys."""
+        deleted = await self.idempotency_repository.delete_expired(
+            datetime.now(timezone.utc),
+        )
+        await self.db.commit()
+        return deleted
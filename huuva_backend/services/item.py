@@ -1,7 +1,50 @@
 from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Iterable, List, Mapping, Optional
 
-from huuva_backend.core.entities.item import Item, ItemUpdate
+from huuva_backend.core.entities.item import (
+    Item,
+    ItemStatusChange,
+    ItemUpdate,
+    OrderItem,
+)
+from huuva_backend.core.entities.item_status import ItemStatus
+from huuva_backend.core.entities.order_status import OrderStatus
+from huuva_backend.db.models.order_status import OrderStatus as OrderStatusModel
 from huuva_backend.db.repositories.item import ItemRepository
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.metrics import ORDER_STATUS_TRANSITIONS
+from huuva_backend.services.active_orders import ActiveOrderBoard, after_commit
+
+# Orders in these statuses keep them whatever happens to their items.
+FINAL_ORDER_STATUSES = frozenset({OrderStatus.PICKED_UP, OrderStatus.CANCELLED})
+
+
+def derive_order_status(counts: Mapping[ItemStatus, int]) -> Optional[OrderStatus]:
+    """
+    Order status implied by the number of its items in each status.
+
+    Cancelled items do not count, unless every item is cancelled:
+    - all items ORDERED: RECEIVED
+    - all items PICKED_UP: PICKED_UP
+    - all items READY or PICKED_UP: READY
+    - otherwise: PREPARING
+
+    Returns None for an order without items.
+    """
+    active = {status for status, count in counts.items() if count}
+    if active == {ItemStatus.CANCELLED}:
+        return OrderStatus.CANCELLED
+    active.discard(ItemStatus.CANCELLED)
+    if not active:
+        return None
+    if active == {ItemStatus.ORDERED}:
+        return OrderStatus.RECEIVED
+    if active == {ItemStatus.PICKED_UP}:
+        return OrderStatus.PICKED_UP
+    if active <= {ItemStatus.READY, ItemStatus.PICKED_UP}:
+        return OrderStatus.READY
+    return OrderStatus.PREPARING
 
 
 @dataclass
@@ -11,9 +54,18 @@ class ItemService:
 
     This service provides methods to retrieve and update items.
     It interacts with the ItemRepository to perform database operations.
+
+    With an `order_repository`, item updates also set the status of their
+    orders as given by `derive_order_status`, in the same transaction.
+
+    With an `active_orders` board, updated items are also put on it once
+    their transaction commits; the derived order statuses reach it by
+    notification.
     """
 
     item_repository: ItemRepository
+    order_repository: Optional[OrderRepository] = None
+    active_orders: Optional[ActiveOrderBoard] = None
 
     async def get(self, order_id: str, plu: str) -> Item:
         """
@@ -33,6 +85,83 @@ class ItemService:
         The logic of the logging is handled in the repository, but it should be
         here. I decided to keep the logic in the repository for practicability reasons.
         """
-        return Item.model_validate(
-            await self.item_repository.update(order_id, plu, item_update),
-        )
+        order_statuses = await self._lock_orders([order_id])
+        item = await self.item_repository.update(order_id, plu, item_update)
+        await self._derive_order_statuses(order_statuses)
+
+        updated = Item.model_validate(item)
+        self._publish(order_id, updated)
+        return updated
+
+    async def update_many(self, changes: List[ItemStatusChange]) -> List[OrderItem]:
+        """
+        Atomically apply status changes to items of one or more orders.
+
+        Raises NotFoundError, without changing any item, if an item is not found.
+        """
+        order_statuses = await self._lock_orders(change.order_id for change in changes)
+        items = await self.item_repository.update_many(changes)
+        await self._derive_order_statuses(order_statuses)
+
+        updated = [OrderItem.model_validate(item) for item in items]
+        for order_item in updated:
+            self._publish(
+                order_item.order_id,
+                Item.model_validate(order_item.model_dump()),
+            )
+        return updated
+
+    def _publish(self, order_id: str, item: Item) -> None:
+        """Put a changed item on the active order board, if any, on commit."""
+        if self.active_orders is not None:
+            after_commit(
+                self.item_repository.db,
+                partial(self.active_orders.put_item, order_id, item),
+            )
+
+    async def _lock_orders(
+        self,
+        order_ids: Iterable[str],
+    ) -> Dict[str, OrderStatusModel]:
+        """
+        Lock the orders whose status is to be derived, and return their statuses.
+
+        Taking the order lock before the item locks serializes concurrent item
+        updates of an order, so the last one sees all the others' statuses.
+        """
+        if self.order_repository is None:
+            return {}
+        return await self.order_repository.lock_statuses(order_ids)
+
+    async def _derive_order_statuses(
+        self,
+        order_statuses: Dict[str, OrderStatusModel],
+    ) -> None:
+        """Set the status of the orders as given by their item status counts."""
+        if self.order_repository is None or not order_statuses:
+            return
+
+        counts = await self.item_repository.status_counts(order_statuses)
+        derived: Dict[str, OrderStatusModel] = {}
+        for order_id, current in order_statuses.items():
+            if OrderStatus(current.value) in FINAL_ORDER_STATUSES:
+                continue
+            status = derive_order_status(
+                {
+                    ItemStatus(status.value): count
+                    for status, count in counts[order_id].items()
+                },
+            )
+            if status is not None and status.value != current.value:
+                derived[order_id] = OrderStatusModel(status.value)
+
+        if derived:
+            await self.order_repository.set_statuses(derived)
+            for order_id, new_status in derived.items():
+                after_commit(
+                    self.item_repository.db,
+                    ORDER_STATUS_TRANSITIONS.labels(
+                        order_statuses[order_id].name,
+                        new_status.name,
+                    ).inc,
+                )
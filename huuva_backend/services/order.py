@@ -1,15 +1,15 @@
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
-from huuva_backend.core.entities.item import ItemUpdate as ItemUpdateModel
-from huuva_backend.core.entities.item_status import ItemStatus as ItemStatusModel
 from huuva_backend.core.entities.order import Order, OrderCreate, OrderUpdate
 from huuva_backend.core.entities.order_status import OrderStatus
 from huuva_backend.db.mappings.order import order_db_to_entity
 from huuva_backend.db.models.order import OrderStatus as OrderStatusModel
-from huuva_backend.db.repositories.item import ItemRepository
 from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.metrics import ORDER_STATUS_TRANSITIONS
+from huuva_backend.services.active_orders import ActiveOrderBoard, after_commit
 
 
 @dataclass
@@ -19,10 +19,13 @@ class OrderService:
 
     This class is responsible for creating, updating, and retrieving orders.
     It interacts with the OrderRepository to perform database operations.
+
+    With an `active_orders` board, created and updated orders are also put
+    on it once their transaction commits.
     """
 
     order_repository: OrderRepository
-    item_repository: ItemRepository
+    active_orders: Optional[ActiveOrderBoard] = None
 
     async def create_order(self, order_in: OrderCreate) -> Order:
         """
@@ -32,8 +35,9 @@ class OrderService:
         and uses the repository to persist it. Returns the created order.
         """
         order = await self.order_repository.create(order_in)
+        self._count_transition("NONE", order.status.name)
 
-        return order_db_to_entity(order)
+        return self._publish(order_db_to_entity(order))
 
     async def get_order(self, order_id: str) -> Order:
         """
@@ -46,42 +50,82 @@ class OrderService:
 
         return order_db_to_entity(order)
 
+    async def get_order_by_channel(
+        self,
+        brand_id: str,
+        channel_order_id: str,
+    ) -> Order:
+        """
+        Retrieve an order by its brand and the order id of its channel.
+
+        Raises NotFoundError if the order is not found.
+        """
+        order = await self.order_repository.get_by_channel(brand_id, channel_order_id)
+
+        return order_db_to_entity(order)
+
     async def list_orders(
         self,
         status: Optional[OrderStatus] = None,
         account: Optional[str] = None,
         from_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None,
+        pickup_from: Optional[datetime] = None,
+        pickup_to: Optional[datetime] = None,
     ) -> list[Order]:
         """
         List orders based on filtering criteria.
 
-        This method allows filtering orders by status, account, and date range.
-        It returns a list of orders that match the criteria.
+        This method allows filtering orders by status, account, and creation
+        and pickup time ranges. It returns a list of orders that match the
+        criteria.
         """
         orders = await self.order_repository.list(
             OrderStatusModel(status.value) if status else None,
             account,
             from_date,
             to_date,
+            pickup_from,
+            pickup_to,
         )
 
         return [order_db_to_entity(order) for order in orders]
 
+    async def search_orders(self, text: str, limit: int) -> list[Order]:
+        """
+        Find orders by part of the customer name or phone number.
+
+        Returns at most `limit` orders, best match first.
+        """
+        orders = await self.order_repository.search(text, limit)
+
+        return [order_db_to_entity(order) for order in orders]
+
     async def update_order(self, order_id: str, order_update: OrderUpdate) -> Order:
         """
         Update the status of an order. Also updates the items in the order.
 
         This method takes an OrderUpdate object, which contains the new status,
-        and uses the repository to update the order in the database.
+        and uses the repository to update the order and its items in the
+        database in a fixed number of statements.
         """
-        order = await self.order_repository.update(order_id, order_update)
+        order, previous = await self.order_repository.update(order_id, order_update)
+        self._count_transition(previous.name, order.status.name)
 
-        # Update the status of items in the order to the new status
-        for item in order.items:
-            item_update = ItemUpdateModel(
-                status=ItemStatusModel(order_update.status.value),
-            )
-            await self.item_repository.update(order_id, item.plu, item_update)
+        return self._publish(order_db_to_entity(order))
 
-        return await self.get_order(order_id)
+    def _count_transition(self, previous: str, status: str) -> None:
+        """Count an order status transition once the transaction commits."""
+        after_commit(
+            self.order_repository.db,
+            ORDER_STATUS_TRANSITIONS.labels(previous, status).inc,
+        )
+
+    def _publish(self, order: Order) -> Order:
+        """Put a changed order on the active order board, if any, on commit."""
+        if self.active_orders is not None:
+            after_commit(
+                self.order_repository.db,
+                partial(self.active_orders.put, order),
+            )
+        return order
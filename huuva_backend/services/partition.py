@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.db.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    default_partition_name,
+    month_start,
+    partition_name,
+)
+
+
+class PartitionService:
+    """Service for managing the monthly partitions of the history tables."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def create_future_partitions(
+        self,
+        months_ahead: int,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Create the missing monthly partitions from the current month on.
+
+        Partitions are created for the current month and the following
+        `months_ahead` months, so inserts never have to fall back to the
+        default partition. Returns the names of the created partitions.
+        """
+        first_month = month_start(now or datetime.now(timezone.utc))
+        created: List[str] = []
+
+        for table in PARTITIONED_TABLES:
+            for offset in range(months_ahead + 1):
+                month = add_months(first_month, offset)
+                if await self._create_partition(table, month):
+                    created.append(partition_name(table, month))
+
+        await self.db.commit()
+        return created
+
+    async def create_partitions(self, moments: Iterable[datetime]) -> List[str]:
+        """
+        Create the missing monthly partitions for the months of `moments`.
+
+        Used for history of past months, e.g. when importing old orders, which
+        would otherwise all end up in the default partition.
+        """
+        months = sorted({month_start(moment) for moment in moments})
+        created: List[str] = []
+
+        for table in PARTITIONED_TABLES:
+            for month in months:
+                if await self._create_partition(table, month):
+                    created.append(partition_name(table, month))
+
+        await self.db.commit()
+        return created
+
+    async def _create_partition(self, table: str, month: datetime) -> bool:
+        """
+        Create the partition of `table` for `month` unless it already exists.
+
+        Postgres refuses to add a partition while the default partition holds
+        rows for its range, so those rows are moved into the new partition.
+        Every worker runs this job, so the check and the creation happen under
+        an advisory lock held until the transaction ends.
+        """
+        name = partition_name(table, month)
+        await self.db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:name))"),
+            {"name": name},
+        )
+        exists = await self.db.scalar(
+            text("SELECT to_regclass(:name) IS NOT NULL"),
+            {"name": name},
+        )
+        if exists:
+            return False
+
+        default = default_partition_name(table)
+        bounds: Dict[str, Any] = {"start": month, "end": add_months(month, 1)}
+        in_range = "timestamp >= :start AND timestamp < :end"
+        create = text(
+            f"CREATE TABLE {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') "
+            f"TO ('{bounds['end'].isoformat()}')",
+        )
+
+        stray_rows_sql = (
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"  # noqa: S608
+        )
+        stray_rows = await self.db.scalar(text(stray_rows_sql), bounds)
+        if not stray_rows:
+            await self.db.execute(create)
+            return True
+
+        await self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        await self.db.execute(create)
+        move = (
+            f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"  # noqa: S608
+        )
+        await self.db.execute(text(move), bounds)
+        await self.db.execute(
+            text(f"DELETE FROM {default} WHERE {in_range}"),  # noqa: S608
+            bounds,
+        )
+        await self.db.execute(
+            text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"),
+        )
+        return True
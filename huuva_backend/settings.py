@@ -32,6 +32,8 @@ class Settings(BaseSettings):
     port: int = 8000
     # quantity of workers for uvicorn
     workers_count: int = 1
+    # Build the app once in the gunicorn master and fork the workers from it
+    preload_app: bool = False
     # Enable uvicorn reloading
     reload: bool = False
 
@@ -46,6 +48,57 @@ class Settings(BaseSettings):
     db_pass: str = "huuva_backend"
     db_base: str = "huuva_backend"
     db_echo: bool = True
+    # Store statuses as SMALLINT and generated ids as native UUID.
+    # Must match the schema, see the `native_types` migration branch.
+    db_native_types: bool = False
+    # Monthly history partitions to keep created ahead of the current month
+    partition_months_ahead: int = 3
+
+    # Archival of picked up and cancelled orders. Archived orders are only
+    # found by id: they drop out of lists, channel lookups and search.
+    archive_enabled: bool = False
+    archive_after_days: int = 30
+    archive_batch_size: int = 500
+    archive_interval_minutes: int = 60
+
+    # Send a Server-Timing header and log SQL, pool wait and serialization
+    # time of every request
+    request_timing: bool = False
+
+    # Compress responses of at least this many bytes with the encoding the
+    # client prefers, ties going to the earliest of these; an empty list
+    # turns compression off.
+    # br and zstd need the `compression` extra (brotli, zstandard).
+    compression_minimum_size: int = 1024
+    compression_encodings: List[str] = ["zstd", "br", "gzip"]
+
+    # Prometheus metrics at /metrics. Workers write them to `prometheus_dir`.
+    metrics_enabled: bool = True
+    prometheus_dir: Path = TEMP_DIR / "prom"
+
+    # Log statements slower than this many milliseconds, 0 turns the log off.
+    # A share of the slow SELECTs is re-run with EXPLAIN ANALYZE and the plans
+    # of the last ones served at /api/admin/slow-queries.
+    slow_query_threshold_ms: float = 0
+    slow_query_explain_rate: float = 0.0
+    slow_query_explain_buffer_size: int = 50
+    # Show the values of the parameters of slow statements, customer names and
+    # phone numbers included, rather than their types.
+    slow_query_parameters: bool = False
+
+    # How long responses of requests sent with an Idempotency-Key are replayed
+    idempotency_key_ttl_hours: int = 24
+
+    # Expected 404/409 errors are logged at most this often per error type
+    expected_error_log_interval_seconds: float = 60
+
+    # Set the status of an order from the statuses of its items whenever they
+    # change, e.g. READY once all items are READY
+    derive_order_status: bool = False
+
+    # Serve GET /api/orders/active from an in-memory board of the active
+    # orders in each worker, kept current by database notifications
+    active_order_board: bool = False
 
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from huuva_backend.web.api.api_formats.base import OrmSchema
+
+
+class SlowQuery(OrmSchema):
+    captured_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: str
+    caller: str
+    route: str
+    plan: str
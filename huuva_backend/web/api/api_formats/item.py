@@ -21,6 +21,19 @@ class ItemUpdate(BaseSchema):
     status: ItemStatus
 
 
+# Each change is three bind parameters of the batch UPDATE.
+MAX_ITEM_STATUS_CHANGES = 1000
+
+
+class ItemStatusChange(BaseSchema):
+    plu: str
+    status: ItemStatus
+
+
+class OrderItemStatusChange(ItemStatusChange):
+    order_id: str
+
+
 class Item(OrmSchema):
     name: str
     plu: str
@@ -31,3 +44,7 @@ class Item(OrmSchema):
     )
     status: ItemStatus
     status_history: List[ItemStatusHistory]
+
+
+class OrderItem(Item):
+    order_id: str
@@ -61,3 +61,16 @@ class OrderQueryParams(BaseSchema):
     account: Optional[str] = None
     from_date: Optional[datetime] = Field(None, alias="from")
     to_date: Optional[datetime] = Field(None, alias="to")
+    pickup_from: Optional[datetime] = None
+    pickup_to: Optional[datetime] = None
+
+
+class OrderSearchQueryParams(BaseSchema):
+    # Shorter text has no trigram to look up in the index.
+    q: str = Field(min_length=3)
+    limit: int = Field(20, ge=1, le=100)
+
+
+class ActiveOrderQueryParams(BaseSchema):
+    brand: Optional[str] = None
+    status: Optional[OrderStatus] = None
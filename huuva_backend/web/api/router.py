@@ -8,8 +8,10 @@ api_router = APIRouter()
 # Alternatively, you can still include routers manually:
 api_router.include_router(views.health_router)
 api_router.include_router(views.order_router, prefix="/orders", tags=["orders"])
+api_router.include_router(views.item_router, prefix="/items", tags=["items"])
 api_router.include_router(
     views.analytics_router,
     prefix="/analytics",
     tags=["analytics"],
 )
+api_router.include_router(views.admin_router, prefix="/admin", tags=["admin"])
@@ -1,5 +1,13 @@
+from huuva_backend.web.api.views.admin import router as admin_router
 from huuva_backend.web.api.views.analytics import router as analytics_router
 from huuva_backend.web.api.views.health import router as health_router
+from huuva_backend.web.api.views.item import router as item_router
 from huuva_backend.web.api.views.order import router as order_router
 
-__all__ = ["analytics_router", "health_router", "order_router"]
+__all__ = [
+    "admin_router",
+    "analytics_router",
+    "health_router",
+    "item_router",
+    "order_router",
+]
@@ -0,0 +1,21 @@
+from typing import List
+
+from fastapi import APIRouter
+
+from huuva_backend.web.api.api_formats.admin import SlowQuery
+from huuva_backend.web.slow_queries import SlowQuery as CapturedSlowQuery
+from huuva_backend.web.slow_queries import captured_queries
+from huuva_backend.web.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/slow-queries", response_model=List[SlowQuery])
+async def get_slow_queries() -> List[CapturedSlowQuery]:
+    """
+    Slow queries captured with their EXPLAIN ANALYZE plan, most recent first.
+
+    The buffer is kept per worker process, so each call shows the queries of
+    the worker that served it.
+    """
+    return captured_queries()
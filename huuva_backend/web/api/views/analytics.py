@@ -10,8 +10,9 @@ from huuva_backend.web.api.api_formats.analytics import (
     HourlyThroughput,
     StatusDuration,
 )
+from huuva_backend.web.negotiation import NegotiatedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 
 @router.get("/order-status-durations", response_model=List[StatusDuration])
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
-router = APIRouter()
+from huuva_backend.web.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/health")
@@ -0,0 +1,26 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from huuva_backend.core.entities.item import ItemStatusChange as CoreItemStatusChange
+from huuva_backend.dependencies import get_item_service, get_order_item_status_changes
+from huuva_backend.services.item import ItemService
+from huuva_backend.web.api.api_formats.item import OrderItem as ApiOrderItem
+from huuva_backend.web.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.patch("/", response_model=List[ApiOrderItem])
+async def update_order_item_statuses(
+    changes: List[CoreItemStatusChange] = Depends(get_order_item_status_changes),
+    item_service: ItemService = Depends(get_item_service),
+) -> List[ApiOrderItem]:
+    """
+    Update the status of items of several orders at once and log the changes.
+
+    The body is a list of `{"orderId": ..., "plu": ..., "status": ...}`.
+    Either every item is updated or, if one of them is not found, none is.
+    """
+    cores = await item_service.update_many(changes)
+    return [ApiOrderItem.model_validate(core.model_dump()) for core in cores]
@@ -1,29 +1,38 @@
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Request, Response, status
 
+from huuva_backend.core.entities.item import ItemStatusChange as CoreItemStatusChange
 from huuva_backend.core.entities.item import ItemUpdate as CoreItemUpdate
 from huuva_backend.core.entities.order import OrderCreate as CoreOrderCreate
 from huuva_backend.core.entities.order import OrderUpdate as CoreOrderUpdate
 from huuva_backend.core.entities.order_status import OrderStatus as CoreOrderStatus
 from huuva_backend.dependencies import (
+    get_idempotency_service,
     get_item_service,
+    get_item_status_changes,
     get_item_update_entity,
     get_order_create_entity,
     get_order_service,
     get_order_update_entity,
+    get_ready_active_order_board,
 )
+from huuva_backend.services.active_orders import ActiveOrderBoard
+from huuva_backend.services.idempotency import IdempotencyService
 from huuva_backend.services.item import ItemService
 from huuva_backend.services.order import OrderService
 from huuva_backend.web.api.api_formats.item import Item as ApiItem
 from huuva_backend.web.api.api_formats.order import (
-    Order as ApiOrder,
+    ActiveOrderQueryParams,
+    OrderQueryParams,
+    OrderSearchQueryParams,
 )
 from huuva_backend.web.api.api_formats.order import (
-    OrderQueryParams,
+    Order as ApiOrder,
 )
+from huuva_backend.web.negotiation import NegotiatedRoute, negotiated_response
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 
 @router.get("/", response_model=List[ApiOrder])
@@ -39,6 +48,12 @@ async def list_orders(
     - account: Filter by account UUID
     - from:   Filter orders created after this date
     - to:     Filter orders created before this date
+    - pickupFrom: Filter orders to be picked up after this date
+    - pickupTo:   Filter orders to be picked up before this date
+
+    Orders are listed newest first, or soonest pickup first when filtering by
+    pickup time. Pickup windows are indexed for the RECEIVED, PREPARING and
+    READY statuses, so combine them with one of those.
     """
     cores = await order_service.list_orders(
         status=(
@@ -47,6 +62,8 @@ async def list_orders(
         account=query_params.account,
         from_date=query_params.from_date,
         to_date=query_params.to_date,
+        pickup_from=query_params.pickup_from,
+        pickup_to=query_params.pickup_to,
     )
     # Dump core and re-validate into ApiOrder so that the response_model
     # sees the right camelCase fields and enum names.
@@ -55,11 +72,99 @@ async def list_orders(
 
 @router.post("/", response_model=ApiOrder, status_code=status.HTTP_201_CREATED)
 async def create_order(
+    request: Request,
     order_in: CoreOrderCreate = Depends(get_order_create_entity),
     order_service: OrderService = Depends(get_order_service),
-) -> ApiOrder:
-    """Create a new order and its associated items and status history."""
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    idempotency_key: Optional[str] = Header(
+        default=None,
+        alias="Idempotency-Key",
+        max_length=255,
+    ),
+) -> Union[ApiOrder, Response]:
+    """
+    Create a new order and its associated items and status history.
+
+    With an `Idempotency-Key` header the response is stored, and a retry with
+    the same key and payload gets the stored response back (marked with an
+    `Idempotent-Replayed` header) without touching the orders. Reusing a key
+    for a different payload is a 409.
+    """
+    if idempotency_key is None:
+        core = await order_service.create_order(order_in)
+        return ApiOrder.model_validate(core.model_dump())
+
+    stored = await idempotency_service.get_response(idempotency_key, order_in)
+    if stored is not None:
+        return negotiated_response(
+            request,
+            stored.response,
+            status_code=stored.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
     core = await order_service.create_order(order_in)
+    api_order = ApiOrder.model_validate(core.model_dump())
+    await idempotency_service.save_response(
+        idempotency_key,
+        order_in,
+        status.HTTP_201_CREATED,
+        api_order.model_dump(mode="json", by_alias=True),
+    )
+    return api_order
+
+
+@router.get("/active", response_model=List[ApiOrder])
+async def list_active_orders(
+    query_params: ActiveOrderQueryParams = Depends(),
+    board: ActiveOrderBoard = Depends(get_ready_active_order_board),
+) -> List[ApiOrder]:
+    """
+    List the orders in RECEIVED, PREPARING or READY status, oldest first.
+
+    Served from the in-memory board of the worker, without a database query,
+    when `HUUVA_BACKEND_ACTIVE_ORDER_BOARD` is enabled; 503 otherwise.
+
+    Query parameters:
+    - brand:  Filter by brand ID
+    - status: Filter by order status value (as integer)
+    """
+    cores = board.orders(
+        brand_id=query_params.brand,
+        status=(
+            CoreOrderStatus(query_params.status.value) if query_params.status else None
+        ),
+    )
+    return [ApiOrder.model_validate(c.model_dump()) for c in cores]
+
+
+@router.get("/search", response_model=List[ApiOrder])
+async def search_orders(
+    query_params: OrderSearchQueryParams = Depends(),
+    order_service: OrderService = Depends(get_order_service),
+) -> List[ApiOrder]:
+    """
+    Find orders by part of the customer name or phone number, best match first.
+
+    Typos and case are tolerated. 503 if the database lacks the pg_trgm
+    extension.
+
+    Query parameters:
+    - q:     At least three characters of the name or phone number
+    - limit: Maximum number of orders, 20 by default and at most 100
+    """
+    cores = await order_service.search_orders(query_params.q, query_params.limit)
+    return [ApiOrder.model_validate(c.model_dump()) for c in cores]
+
+
+@router.get("/by-channel/{brand_id}/{channel_order_id}", response_model=ApiOrder)
+async def get_order_by_channel(
+    brand_id: str,
+    channel_order_id: str,
+    order_service: OrderService = Depends(get_order_service),
+) -> ApiOrder:
+    """Retrieve an order by its brand and the order ID of its channel."""
+    core = await order_service.get_order_by_channel(brand_id, channel_order_id)
     return ApiOrder.model_validate(core.model_dump())
 
 
@@ -98,3 +203,18 @@ async def update_item_status(
     """Update the status of an individual order item and log the change."""
     core = await item_service.update(order_id, plu, item_up)
     return ApiItem.model_validate(core.model_dump())
+
+
+@router.patch("/{order_id}/items", response_model=List[ApiItem])
+async def update_item_statuses(
+    changes: List[CoreItemStatusChange] = Depends(get_item_status_changes),
+    item_service: ItemService = Depends(get_item_service),
+) -> List[ApiItem]:
+    """
+    Update the status of several items of an order at once and log the changes.
+
+    The body is a list of `{"plu": ..., "status": ...}`. Either every item is
+    updated or, if one of them is not found, none is.
+    """
+    cores = await item_service.update_many(changes)
+    return [ApiItem.model_validate(core.model_dump()) for core in cores]
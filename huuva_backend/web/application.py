@@ -1,17 +1,46 @@
 import logging
 from importlib import metadata
 
-import sentry_sdk
 from fastapi import FastAPI
 from fastapi.responses import UJSONResponse
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
 from huuva_backend.exceptions.error_handler import register_exception_handlers
 from huuva_backend.settings import settings
 from huuva_backend.web.api.router import api_router
+from huuva_backend.web.compression import CompressionMiddleware
 from huuva_backend.web.lifespan import lifespan_setup
+from huuva_backend.web.metrics import PrometheusMiddleware, metrics
+from huuva_backend.web.slow_queries import SlowQueryMiddleware
+from huuva_backend.web.timing import ServerTimingMiddleware
+
+
+def _init_sentry() -> None:
+    """
+    Enable the Sentry integration.
+
+    `sentry_sdk` and its integrations take a good share of the import time
+    of a worker, so they are only imported when a DSN is configured.
+    """
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
+    sentry_sdk.init(
+        dsn=settings.sentry_dsn,
+        traces_sample_rate=settings.sentry_sample_rate,
+        environment=settings.environment,
+        integrations=[
+            FastApiIntegration(transaction_style="endpoint"),
+            LoggingIntegration(
+                level=logging.getLevelName(
+                    settings.log_level.value,
+                ),
+                event_level=logging.ERROR,
+            ),
+            SqlalchemyIntegration(),
+        ],
+    )
 
 
 def get_app() -> FastAPI:
@@ -23,22 +52,7 @@ def get_app() -> FastAPI:
     :return: application.
     """
     if settings.sentry_dsn:
-        # Enables sentry integration.
-        sentry_sdk.init(
-            dsn=settings.sentry_dsn,
-            traces_sample_rate=settings.sentry_sample_rate,
-            environment=settings.environment,
-            integrations=[
-                FastApiIntegration(transaction_style="endpoint"),
-                LoggingIntegration(
-                    level=logging.getLevelName(
-                        settings.log_level.value,
-                    ),
-                    event_level=logging.ERROR,
-                ),
-                SqlalchemyIntegration(),
-            ],
-        )
+        _init_sentry()
     app = FastAPI(
         title="huuva_backend",
         version=metadata.version("huuva_backend"),
@@ -49,6 +63,24 @@ def get_app() -> FastAPI:
         default_response_class=UJSONResponse,
     )
 
+    # Added first, so it runs innermost and its time counts in the timing.
+    if settings.compression_encodings:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            encodings=settings.compression_encodings,
+        )
+
+    if settings.metrics_enabled:
+        app.add_middleware(PrometheusMiddleware)
+        app.add_api_route("/metrics", metrics, include_in_schema=False)
+
+    if settings.slow_query_threshold_ms > 0:
+        app.add_middleware(SlowQueryMiddleware)
+
+    if settings.request_timing:
+        app.add_middleware(ServerTimingMiddleware)
+
     # Main router for the API.
     app.include_router(router=api_router, prefix="/api")
 
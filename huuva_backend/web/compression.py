@@ -0,0 +1,233 @@
+"""
+Response compression negotiated with `Accept-Encoding`.
+
+`CompressionMiddleware` compresses the responses of at least
+`settings.compression_minimum_size` bytes with the encoding the client prefers
+among `settings.compression_encodings`, breaking ties in the configured order.
+gzip comes with the standard library; brotli (`br`) and zstd need the
+`brotli` and `zstandard` packages, and are skipped with a warning when those
+are not installed.
+
+Streaming responses are compressed chunk by chunk, each chunk flushed so that
+the client receives it as soon as the app sends it.
+"""
+
+import importlib.util
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from huuva_backend.web.negotiation import quality_values
+
+logger = logging.getLogger(__name__)
+
+
+class Encoder(ABC):
+    """Compressor of one response body, fed in one or more chunks."""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk; the output may be held back until a flush."""
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """Everything compressed so far, decodable without the rest."""
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """End the stream."""
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int) -> None:
+        # 31 bits of window selects the gzip container.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Sync flush."""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """Write the gzip trailer."""
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, level: int) -> None:
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk."""
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """Flush the pending meta-block."""
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        """Write the last meta-block."""
+        return self._compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+    def __init__(self, level: int) -> None:
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """End the current block."""
+        return self._compressor.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        """End the frame."""
+        return self._compressor.flush()
+
+
+# Content coding: (encoder, module it needs, default level). On order lists
+# gzip 4 takes half the CPU of the usual 6 for 10% more bytes, and zstd 1
+# compresses better than 3; see `benchmarks.compression`.
+ENCODINGS: Dict[str, Tuple[Callable[[int], Encoder], Optional[str], int]] = {
+    "gzip": (GzipEncoder, None, 4),
+    "br": (BrotliEncoder, "brotli", 4),
+    "zstd": (ZstdEncoder, "zstandard", 1),
+}
+
+
+def available_encodings(names: Sequence[str]) -> List[str]:
+    """
+    The encodings of `names` that can be used here, in the same order.
+
+    :raises ValueError: for a name that is not a supported encoding.
+    """
+    available = []
+    for name in names:
+        if name not in ENCODINGS:
+            raise ValueError(f"Unsupported response encoding {name!r}")
+        module = ENCODINGS[name][1]
+        if module is not None and importlib.util.find_spec(module) is None:
+            logger.warning("Not compressing with %s: %s is not installed", name, module)
+            continue
+        available.append(name)
+    return available
+
+
+def new_encoder(name: str, level: Optional[int] = None) -> Encoder:
+    """A new encoder of `name`, at its default level unless given."""
+    encoder_class, _, default_level = ENCODINGS[name]
+    return encoder_class(default_level if level is None else level)
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    The encoding of `encodings` preferred by an `Accept-Encoding` header.
+
+    The highest q-value wins, ties go to the earliest of `encodings`. `*`
+    stands for the encodings not listed, and `q=0` refuses one.
+    """
+    weights = quality_values(accept_encoding)
+    best, best_weight = None, 0.0
+    for name in encodings:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing the responses of HTTP requests."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        encodings: Sequence[str],
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response if the client accepts one of the encodings."""
+        name = None
+        if scope["type"] == "http":
+            name = negotiate(
+                Headers(scope=scope).get("accept-encoding", ""),
+                self.encodings,
+            )
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, name, self.minimum_size))
+
+
+def _compress(encoder: Encoder, body: bytes, more_body: bool) -> bytes:
+    """A chunk of the body, flushed, or the last one, ending the stream."""
+    return encoder.compress(body) + (encoder.flush() if more_body else encoder.finish())
+
+
+class _CompressingSend:
+    """`send` of one response, compressing its body with `name`."""
+
+    def __init__(self, send: Send, name: str, minimum_size: int) -> None:
+        self.send = send
+        self.name = name
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.encoder: Optional[Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells whether to compress.
+            self.start = message
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send_start()
+                await self.send(message)
+                return
+            self.encoder = new_encoder(self.name)
+            compressed = _compress(self.encoder, body, more_body)
+            headers = MutableHeaders(scope=self.start)
+            headers["Content-Encoding"] = self.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self._send_start()
+        else:
+            compressed = _compress(self.encoder, body, more_body)
+        await self.send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body},
+        )
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            await self.send(self.start)
+            self.start = None
@@ -1,11 +1,16 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
 from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from huuva_backend.db.notifications import NOTIFY_CONNECT_ARGS
 from huuva_backend.scheduler import AnalyticsScheduler
+from huuva_backend.services.active_orders import ActiveOrderBoard, ActiveOrderListener
 from huuva_backend.settings import settings
+from huuva_backend.web.metrics import instrument_pool
+from huuva_backend.web.slow_queries import instrument_slow_queries
+from huuva_backend.web.timing import TimedQueuePool, instrument_engine
 
 
 def _setup_db(app: FastAPI) -> None:  # pragma: no cover
@@ -18,11 +23,23 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
 
     :param app: fastAPI application.
     """
-    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    options: Dict[str, Any] = {"echo": settings.db_echo}
+    if settings.request_timing:
+        options["poolclass"] = TimedQueuePool
+    if settings.active_order_board:
+        # The writes of this app notify the boards of all its workers.
+        options["connect_args"] = NOTIFY_CONNECT_ARGS
+    engine = create_async_engine(str(settings.db_url), **options)
+    if settings.request_timing:
+        instrument_engine(engine)
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
     )
+    if settings.metrics_enabled:
+        instrument_pool(engine)
+    if settings.slow_query_threshold_ms > 0:
+        instrument_slow_queries(engine)
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
 
@@ -38,6 +55,23 @@ def _setup_scheduler(app: FastAPI) -> None:
     scheduler.start()
 
 
+async def _setup_active_orders(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Load the active order board and follow the changes of the orders.
+
+    :param app: fastAPI application.
+    """
+    board = ActiveOrderBoard()
+    listener = ActiveOrderListener(
+        board,
+        app.state.db_engine,
+        app.state.db_session_factory,
+    )
+    await listener.start()
+    app.state.active_orders = board
+    app.state.active_order_listener = listener
+
+
 @asynccontextmanager
 async def lifespan_setup(
     app: FastAPI,
@@ -58,8 +92,12 @@ async def lifespan_setup(
 
     # Set up and start the scheduler after db is initialized
     _setup_scheduler(app)
+    if settings.active_order_board:
+        await _setup_active_orders(app)
 
     yield
+    if settings.active_order_board:
+        await app.state.active_order_listener.stop()
     # Shutdown scheduler before closing db connection
     app.state.scheduler.shutdown()
     await app.state.db_engine.dispose()
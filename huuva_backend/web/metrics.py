@@ -0,0 +1,98 @@
+"""Collection and exposition of the HTTP and connection pool metrics."""
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from huuva_backend.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_SIZE,
+    REQUEST_DURATION,
+    REQUESTS_IN_PROGRESS,
+)
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency and in-flight count of HTTP requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Record the request, labelled with the template of the matched route."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope; raw paths
+            # would give a label value per order id.
+            route = scope.get("route")
+            REQUEST_DURATION.labels(
+                method,
+                route.path if route is not None else "unmatched",
+                status_code,
+            ).observe(time.perf_counter() - start)
+
+
+def metrics(request: Request) -> Response:
+    """Expose the metrics of every worker in the Prometheus text format."""
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Track the connections of the connection pool of `engine`."""
+    pool = engine.sync_engine.pool
+    DB_POOL_SIZE.inc(pool.size())  # type: ignore[attr-defined]
+
+    def on_connect(*args: Any) -> None:
+        DB_POOL_CONNECTIONS.inc()
+
+    def on_release(*args: Any) -> None:
+        DB_POOL_CONNECTIONS.dec()
+
+    def on_checkout(*args: Any) -> None:
+        DB_POOL_CHECKED_OUT.inc()
+
+    def on_checkin(*args: Any) -> None:
+        DB_POOL_CHECKED_OUT.dec()
+
+    event.listen(pool, "connect", on_connect)
+    # A detached connection is no longer the pool's, whenever it gets closed.
+    event.listen(pool, "close", on_release)
+    event.listen(pool, "detach", on_release)
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
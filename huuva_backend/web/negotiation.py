@@ -0,0 +1,131 @@
+"""
+MessagePack as an alternative to JSON for bodies of the API.
+
+Routes of a router with `route_class=NegotiatedRoute` answer with the same
+structure as JSON encoded as MessagePack when the request prefers
+`application/msgpack` in its `Accept` header, and accept request bodies sent
+as `Content-Type: application/msgpack`. Error responses stay JSON.
+"""
+
+from typing import Any, Callable, Coroutine, Dict
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.responses import UJSONResponse
+from starlette.datastructures import Headers
+
+from huuva_backend.web.timing import TimedRoute
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+JSON_MEDIA_RANGES = ("application/json", "application/*", "*/*")
+
+
+class MsgPackResponse(Response):
+    """Response with its content encoded as MessagePack."""
+
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        """Encode the content, already made JSON compatible by the route."""
+        return msgpack.packb(content)
+
+
+class MsgPackRequest(Request):
+    """
+    Request with a MessagePack body.
+
+    FastAPI only decodes the bodies of JSON content types, through `json()`,
+    so this request reports the content type as JSON and decodes MessagePack
+    there. The endpoint validates the body as it would a JSON one.
+    """
+
+    @property
+    def headers(self) -> Headers:
+        """The request headers, with a JSON content type."""
+        if not hasattr(self, "_headers"):
+            raw = [
+                (key, value)
+                for key, value in self.scope["headers"]
+                if key != b"content-type"
+            ]
+            self._headers = Headers(raw=[*raw, (b"content-type", b"application/json")])
+        return self._headers
+
+    async def json(self) -> Any:
+        """The decoded MessagePack body."""
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+def quality_values(header: str) -> Dict[str, float]:
+    """
+    The q-value of each value of an `Accept` or `Accept-Encoding` header.
+
+    Values are lowercased, and a q-value that is not a number counts as 0.
+    """
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        value, *params = part.split(";")
+        weight = 1.0
+        for param in params:
+            key, _, number = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(number)
+                except ValueError:
+                    weight = 0.0
+        weights[value.strip().lower()] = weight
+    return weights
+
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+
+def prefers_msgpack(accept: str) -> bool:
+    """
+    Whether an `Accept` header prefers MessagePack to JSON.
+
+    Only a higher q-value for MessagePack than for JSON, `application/*` or
+    `*/*` does, so clients that accept anything keep getting JSON.
+    """
+    weights = quality_values(accept)
+    msgpack_weight = max(weights.get(name, 0.0) for name in MSGPACK_MEDIA_TYPES)
+    json_weight = max(weights.get(name, 0.0) for name in JSON_MEDIA_RANGES)
+    return msgpack_weight > json_weight
+
+
+def negotiated_response(request: Request, content: Any, **kwargs: Any) -> Response:
+    """A response of JSON compatible `content` in the format `request` prefers."""
+    if prefers_msgpack(request.headers.get("accept", "")):
+        return MsgPackResponse(content, **kwargs)
+    return UJSONResponse(content, **kwargs)
+
+
+class NegotiatedRoute(TimedRoute):
+    """Route answering in JSON or MessagePack, as the request prefers."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """Handlers for both formats, picked by the `Accept` header."""
+        json_handler = super().get_route_handler()
+        response_class = self.response_class
+        self.response_class = MsgPackResponse
+        try:
+            msgpack_handler = super().get_route_handler()
+        finally:
+            self.response_class = response_class
+
+        async def handler(request: Request) -> Response:
+            if _media_type(request.headers.get("content-type", "")) in (
+                MSGPACK_MEDIA_TYPES
+            ):
+                request = MsgPackRequest(request.scope, request.receive)
+            if prefers_msgpack(request.headers.get("accept", "")):
+                response = await msgpack_handler(request)
+            else:
+                response = await json_handler(request)
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return handler
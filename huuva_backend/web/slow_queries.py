@@ -0,0 +1,225 @@
+"""
+Log of statements slower than `settings.slow_query_threshold_ms`.
+
+Each slow statement is logged with its parameters, the repository method
+that issued it and the route of the request. Parameter values hold customer
+data, so only their types are shown unless `settings.slow_query_parameters`
+is on. A sample of slow SELECTs, set
+by `settings.slow_query_explain_rate`, is re-run with
+`EXPLAIN (ANALYZE, BUFFERS)` and the plan kept in a ring buffer per worker,
+served at `/api/admin/slow-queries`.
+"""
+
+import inspect
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any, Deque, List, Optional
+
+import greenlet
+from sqlalchemy import Connection, event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from huuva_backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+REPOSITORIES_MODULE = "huuva_backend.db.repositories."
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS)"
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+@dataclass
+class SlowQuery:
+    """A slow statement and the plan captured for it."""
+
+    captured_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: str
+    caller: str
+    route: str
+    plan: str
+
+
+_buffer: Deque[SlowQuery] = deque(maxlen=settings.slow_query_explain_buffer_size)
+_scope: ContextVar[Optional[Scope]] = ContextVar("slow_query_scope", default=None)
+
+
+def captured_queries() -> List[SlowQuery]:
+    """Slow queries with a captured plan, most recent first."""
+    return list(reversed(_buffer))
+
+
+def _route() -> str:
+    scope = _scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return route.path if route is not None else scope["path"]
+
+
+def _repository_frame(frame: Optional[FrameType]) -> Optional[FrameType]:
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith(REPOSITORIES_MODULE):
+            return frame
+        frame = frame.f_back
+    return None
+
+
+def _caller() -> str:
+    """Repository method on the stack, e.g. `OrderRepository.list`."""
+    # Async sessions run statements in a greenlet; the awaiting coroutines,
+    # repository methods included, are on the stack of its parent.
+    parent = greenlet.getcurrent().parent
+    for frame in (inspect.currentframe(), parent.gr_frame if parent else None):
+        found = _repository_frame(frame)
+        if found is not None:
+            return getattr(found.f_code, "co_qualname", found.f_code.co_name)
+    return "-"
+
+
+class _Redacted:
+    """Stand-in for a parameter value, shown as its type."""
+
+    def __init__(self, value: Any) -> None:
+        self.type_name = type(value).__name__
+
+    def __repr__(self) -> str:
+        return f"<{self.type_name}>"
+
+
+def _redact(parameters: Any) -> Any:
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(_redact(value) for value in parameters)
+    if isinstance(parameters, dict):
+        return {name: _redact(value) for name, value in parameters.items()}
+    return _Redacted(parameters)
+
+
+def _parameters(parameters: Any) -> str:
+    """Parameters as shown in the log and the captured queries."""
+    if not settings.slow_query_parameters:
+        parameters = _redact(parameters)
+    return repr(parameters)[:1000]
+
+
+def _explain(conn: Connection, statement: str, parameters: Any) -> str:
+    """
+    Re-run `statement` with EXPLAIN ANALYZE on the same connection.
+
+    It runs in a savepoint, so a failure does not abort the transaction of
+    the request.
+    """
+    cursor = conn.connection.cursor()
+    in_transaction = conn.in_transaction()
+    try:
+        if in_transaction:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(f"{EXPLAIN} {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as exc:
+            if in_transaction:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return f"EXPLAIN failed: {exc}"
+        if in_transaction:
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn: Connection, *args: Any) -> None:
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # A failed statement does not reach `after_cursor_execute`.
+    conn = context.connection
+    if conn is not None and conn.info.get("slow_query_start"):
+        conn.info["slow_query_start"].pop()
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    if not conn.info.get("slow_query_start"):
+        return
+    duration_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+    threshold = settings.slow_query_threshold_ms
+    if threshold <= 0 or duration_ms < threshold:
+        return
+
+    caller, route = _caller(), _route()
+    params = _parameters(parameters)
+    logger.warning(
+        "Slow query (%.1f ms) in %s for %s: %s %s",
+        duration_ms,
+        caller,
+        route,
+        statement,
+        params,
+        extra={
+            "duration_ms": round(duration_ms, 3),
+            "caller": caller,
+            "route": route,
+        },
+    )
+
+    is_select = statement.lstrip()[:6].upper() == "SELECT"
+    if (
+        is_select
+        and not executemany
+        and random.random() < settings.slow_query_explain_rate  # noqa: S311
+    ):
+        _buffer.append(
+            SlowQuery(
+                captured_at=datetime.now(timezone.utc),
+                duration_ms=round(duration_ms, 3),
+                statement=statement,
+                parameters=params,
+                caller=caller,
+                route=route,
+                plan=_explain(conn, statement, parameters),
+            ),
+        )
+
+
+def instrument_slow_queries(engine: AsyncEngine) -> None:
+    """Check the duration of statements executed through `engine`."""
+    sync_engine = engine.sync_engine
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(sync_engine, name, listener):
+            event.listen(sync_engine, name, listener)
+
+
+class SlowQueryMiddleware:
+    """ASGI middleware making the route of a request known to the slow query log."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve the request with its scope in the context."""
+        token = _scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _scope.reset(token)
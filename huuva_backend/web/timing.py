@@ -0,0 +1,207 @@
+"""
+Per-request breakdown of where the time of a request went.
+
+When `settings.request_timing` is on, `ServerTimingMiddleware` collects the
+SQL statement count and time, the time spent waiting for a pooled
+connection and the time spent serializing the response, i.e. validating the
+endpoint's return value and rendering it. They are sent in a `Server-Timing`
+header and logged with the request.
+"""
+
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Optional, Type
+
+from fastapi import Request, Response
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestTiming:
+    """Time spent on each part of a request, in seconds."""
+
+    start: float
+    sql_count: int = 0
+    sql_time: float = 0.0
+    pool_wait: float = 0.0
+    endpoint_done: Optional[float] = None
+    serialize_time: float = 0.0
+    total_time: float = 0.0
+
+    def header(self) -> str:
+        """Value of the `Server-Timing` header."""
+        return (
+            f'db;dur={self.sql_time * 1000:.3f};desc="{self.sql_count} statements", '
+            f"db-pool;dur={self.pool_wait * 1000:.3f}, "
+            f"serialize;dur={self.serialize_time * 1000:.3f}, "
+            f"total;dur={self.total_time * 1000:.3f}"
+        )
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "request_timing",
+    default=None,
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that records how long a request waits for a connection."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            timing = _current.get()
+            if timing is not None:
+                timing.pool_wait += time.perf_counter() - start
+
+
+def _before_cursor_execute(conn: Any, *args: Any) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("request_timing_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, *args: Any) -> None:
+    timing = _current.get()
+    if timing is not None and conn.info.get("request_timing_start"):
+        timing.sql_count += 1
+        timing.sql_time += time.perf_counter() - conn.info["request_timing_start"].pop()
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # A failed statement does not reach `after_cursor_execute`.
+    conn = context.connection
+    if conn is not None and conn.info.get("request_timing_start"):
+        conn.info["request_timing_start"].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record the statements executed through `engine`. Safe to call twice."""
+    sync_engine = engine.sync_engine
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(sync_engine, name, listener):
+            event.listen(sync_engine, name, listener)
+
+
+def _mark_endpoint_done(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if not inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timing = _current.get()
+            if timing is not None:
+                timing.endpoint_done = time.perf_counter()
+
+    return wrapper
+
+
+def _timed_response_class(response_class: Type[Response]) -> Type[Response]:
+    """Subclass of `response_class` recording when it is rendered."""
+
+    def init(self: Response, *args: Any, **kwargs: Any) -> None:
+        # Responses render their content when they are created.
+        response_class.__init__(self, *args, **kwargs)
+        timing = _current.get()
+        if timing is not None and timing.endpoint_done is not None:
+            timing.serialize_time = time.perf_counter() - timing.endpoint_done
+
+    return type(response_class.__name__, (response_class,), {"__init__": init})
+
+
+class TimedRoute(APIRoute):
+    """
+    Route that marks when its endpoint returned and its response was rendered.
+
+    The time in between, i.e. response model validation and rendering, is
+    counted as serialization. The teardown of the dependencies, such as the
+    commit of the database session, runs after and is not.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _mark_endpoint_done(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """The handler of the route, rendering with a timed response class."""
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            self.response_class = Default(_timed_response_class(response_class.value))
+        else:
+            self.response_class = _timed_response_class(response_class)
+        try:
+            return super().get_route_handler()
+        finally:
+            self.response_class = response_class
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware collecting the `RequestTiming` of each HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Time the request and add the `Server-Timing` header to its response."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(start=time.perf_counter())
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status_code = message["status"]
+                timing.total_time = now - timing.start
+                MutableHeaders(scope=message).append("Server-Timing", timing.header())
+            await send(message)
+
+        token = _current.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if not timing.total_time:
+                timing.total_time = time.perf_counter() - timing.start
+            logger.info(
+                "%s %s %d: %.1f ms, %d statements in %.1f ms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                timing.total_time * 1000,
+                timing.sql_count,
+                timing.sql_time * 1000,
+                extra={
+                    "http_method": scope["method"],
+                    "http_path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": round(timing.total_time * 1000, 3),
+                    "sql_count": timing.sql_count,
+                    "sql_ms": round(timing.sql_time * 1000, 3),
+                    "pool_wait_ms": round(timing.pool_wait * 1000, 3),
+                    "serialize_ms": round(timing.serialize_time * 1000, 3),
+                },
+            )
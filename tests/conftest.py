@@ -7,7 +7,7 @@ and common data fixtures.
 """
 
 from datetime import datetime, timedelta
-from typing import Any, AsyncGenerator, List
+from typing import Any, AsyncGenerator, Generator, List
 from uuid import uuid4
 
 import pytest
@@ -38,6 +38,7 @@ from huuva_backend.services.item import ItemService
 from huuva_backend.services.order import OrderService
 from huuva_backend.settings import settings
 from huuva_backend.web.application import get_app
+from tests.query_recorder import QueryRecorder
 
 
 @pytest.fixture(scope="session")
@@ -134,6 +135,27 @@ async def client(
         yield ac
 
 
+@pytest.fixture
+def query_recorder(
+    dbsession: AsyncSession,
+    client: AsyncClient,
+) -> Generator[QueryRecorder, None, None]:
+    """
+    Record the statements executed for each request made with `client`.
+
+    Used to hold endpoints to a statement budget.
+
+    :yield: the recorder.
+    """
+    connection = dbsession.bind.sync_connection  # type: ignore[union-attr]
+    recorder = QueryRecorder()
+    recorder.attach(connection, client)
+    try:
+        yield recorder
+    finally:
+        recorder.detach(connection)
+
+
 @pytest.fixture(scope="session")
 def base_time() -> datetime:
     """Return a fixed datetime for deterministic tests."""
@@ -153,12 +175,9 @@ def item_repo(dbsession: AsyncSession) -> ItemRepository:
 
 
 @pytest.fixture
-def order_service(
-    order_repo: OrderRepository,
-    item_repo: ItemRepository,
-) -> OrderService:
+def order_service(order_repo: OrderRepository) -> OrderService:
     """Instantiate the OrderService with its repository."""
-    return OrderService(order_repository=order_repo, item_repository=item_repo)
+    return OrderService(order_repository=order_repo)
 
 
 @pytest.fixture
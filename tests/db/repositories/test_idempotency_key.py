@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.db.repositories.idempotency_key import IdempotencyKeyRepository
+
+
+@pytest.fixture
+def idempotency_repo(dbsession: AsyncSession) -> IdempotencyKeyRepository:
+    """Provide an IdempotencyKeyRepository using the AsyncSession."""
+    return IdempotencyKeyRepository(dbsession)
+
+
+@pytest.fixture
+def now() -> datetime:
+    """Current time, shared by a whole test."""
+    return datetime.now(timezone.utc)
+
+
+class TestIdempotencyKeyRepository:
+    @pytest.mark.anyio
+    async def test_expired_key_is_ignored(
+        self,
+        idempotency_repo: IdempotencyKeyRepository,
+        now: datetime,
+    ) -> None:
+        """A stored response is only returned until it expires."""
+        await idempotency_repo.save("key", b"a", 201, {"id": "1"}, now, now)
+
+        assert await idempotency_repo.get("key", now - timedelta(seconds=1))
+        assert await idempotency_repo.get("key", now) is None
+
+    @pytest.mark.anyio
+    async def test_save_replaces_only_expired_key(
+        self,
+        dbsession: AsyncSession,
+        idempotency_repo: IdempotencyKeyRepository,
+        now: datetime,
+    ) -> None:
+        """A live response is never overwritten, an expired one is."""
+        later = now + timedelta(hours=1)
+        await idempotency_repo.save("key", b"a", 201, {"id": "1"}, now, later)
+
+        await idempotency_repo.save("key", b"b", 201, {"id": "2"}, now, later)
+        dbsession.expunge_all()
+        stored = await idempotency_repo.get("key", now)
+        assert stored is not None
+        assert stored.response == {"id": "1"}
+
+        await idempotency_repo.save(
+            "key",
+            b"b",
+            201,
+            {"id": "2"},
+            later,
+            later + timedelta(hours=1),
+        )
+        dbsession.expunge_all()
+        stored = await idempotency_repo.get("key", later)
+        assert stored is not None
+        assert stored.response == {"id": "2"}
+
+    @pytest.mark.anyio
+    async def test_delete_expired(
+        self,
+        idempotency_repo: IdempotencyKeyRepository,
+        now: datetime,
+    ) -> None:
+        """Only expired keys are purged."""
+        await idempotency_repo.save("old", b"a", 201, {}, now, now)
+        await idempotency_repo.save("new", b"a", 201, {}, now, now + timedelta(days=1))
+
+        assert await idempotency_repo.delete_expired(now) == 1
+        assert await idempotency_repo.get("new", now)
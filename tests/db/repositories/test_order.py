@@ -69,6 +69,38 @@ class TestOrderRepository:
 
         assert str(order_create_data.id) in str(exc_info.value)
 
+    @pytest.mark.anyio
+    async def test_create_channel_resend(
+        self,
+        existing_order: OrderModel,
+        order_create_data: OrderCreate,
+        order_repo: OrderRepository,
+    ) -> None:
+        """Test that a channel order resent under a new ID raises ConflictError."""
+        resend = order_create_data.model_copy(update={"id": None})
+
+        with pytest.raises(ConflictError) as exc_info:
+            await order_repo.create(resend)
+
+        assert order_create_data.channel_order_id in str(exc_info.value)
+
+    @pytest.mark.anyio
+    async def test_get_order_by_channel(
+        self,
+        existing_order: OrderModel,
+        order_repo: OrderRepository,
+    ) -> None:
+        """Test getting an order by its brand and channel order ID."""
+        order = await order_repo.get_by_channel(
+            existing_order.brand_id,
+            existing_order.channel_order_id,
+        )
+        assert order.id == existing_order.id
+        assert len(order.items) == len(existing_order.items)
+
+        with pytest.raises(NotFoundError):
+            await order_repo.get_by_channel("other-brand", order.channel_order_id)
+
     @pytest.mark.anyio
     async def test_get_order_success(
         self,
@@ -111,12 +143,17 @@ class TestOrderRepository:
         new_status = OrderStatusEnum.PREPARING
         order_update = OrderUpdate(status=new_status)
         before_count = len(existing_order.status_history)
+        before_status = existing_order.status
         # Act
-        updated_order = await order_repo.update(existing_order.id, order_update)
+        updated_order, previous = await order_repo.update(
+            existing_order.id,
+            order_update,
+        )
 
         # Assert
         assert updated_order is not None
         assert updated_order.status.value == new_status.value
+        assert previous == before_status
 
         # Verify status history was updated
         # Find the new history entry (it should be the latest one)
@@ -125,6 +162,8 @@ class TestOrderRepository:
 
         # Verify the previous status is still in the history
         assert len(updated_order.status_history) == before_count + 1
+        # The pickup time is kept
+        assert updated_order.pickup_time == existing_order.pickup_time
 
     @pytest.mark.anyio
     async def test_update_nonexistent_order(
@@ -295,3 +334,38 @@ class TestOrderRepository:
             yesterday <= order.created_at <= tomorrow for order in date_filtered_orders
         )
         assert existing_order.id in {order.id for order in date_filtered_orders}
+
+    @pytest.mark.anyio
+    async def test_list_orders_by_pickup_window(
+        self,
+        order_create_data: OrderCreate,
+        pickup_time: datetime,
+        order_repo: OrderRepository,
+    ) -> None:
+        """Test listing orders in a pickup window, soonest pickup first."""
+        # Arrange
+        later, sooner, outside = [
+            await order_repo.create(
+                order_create_data.model_copy(
+                    update={
+                        "id": str(uuid4()),
+                        "channel_order_id": str(uuid4()),
+                        "pickup_time": pickup_time + timedelta(minutes=minutes),
+                    },
+                ),
+            )
+            for minutes in (10, 5, 30)
+        ]
+
+        # Act
+        orders = await order_repo.list(
+            status=OrderStatusModel.RECEIVED,
+            pickup_from=pickup_time,
+            pickup_to=pickup_time + timedelta(minutes=15),
+        )
+
+        # Assert
+        ids = [order.id for order in orders]
+        assert outside.id not in ids
+        assert ids.index(sooner.id) < ids.index(later.id)
+        assert all(a.pickup_time <= b.pickup_time for a, b in zip(orders, orders[1:]))
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.core.entities.order import Order as OrderEntity
+from huuva_backend.core.entities.order import OrderCreate, OrderUpdate
+from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEnum
+from huuva_backend.db.mappings.order import order_db_to_entity
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.models.order_status import OrderStatus as OrderStatusModel
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.db.repositories.order_archive import OrderArchiveRepository
+from huuva_backend.exceptions.exceptions import ConflictError, NotFoundError
+
+
+async def _age_order(
+    dbsession: AsyncSession,
+    order_id: str,
+    status: OrderStatusModel,
+    days: int,
+) -> None:
+    """Put an order in `status`, last updated `days` ago."""
+    await dbsession.execute(
+        update(OrderModel)
+        .where(OrderModel.id == order_id)
+        .values(
+            status=status,
+            updated_at=datetime.now(timezone.utc) - timedelta(days=days),
+        ),
+    )
+    dbsession.expunge_all()
+
+
+async def _load_entity(order_repo: OrderRepository, order_id: str) -> OrderEntity:
+    return order_db_to_entity(await order_repo.get(order_id))
+
+
+class TestOrderArchiveRepository:
+    @pytest.mark.anyio
+    async def test_archive_moves_old_terminal_orders(
+        self,
+        dbsession: AsyncSession,
+        existing_order: OrderModel,
+        second_order: OrderModel,
+        different_account_order: OrderModel,
+    ) -> None:
+        """Only old orders in a terminal status are archived."""
+        await _age_order(dbsession, existing_order.id, OrderStatusModel.PICKED_UP, 40)
+        await _age_order(dbsession, second_order.id, OrderStatusModel.CANCELLED, 1)
+        await _age_order(
+            dbsession,
+            different_account_order.id,
+            OrderStatusModel.READY,
+            40,
+        )
+        cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+
+        archived = await OrderArchiveRepository(dbsession).archive(cutoff, 10)
+
+        assert archived == 1
+        remaining = set(
+            (await dbsession.execute(select(OrderModel.id))).scalars().all(),
+        )
+        assert existing_order.id not in remaining
+        assert {second_order.id, different_account_order.id} <= remaining
+
+    @pytest.mark.anyio
+    async def test_archive_respects_batch_size(
+        self,
+        dbsession: AsyncSession,
+        existing_order: OrderModel,
+        second_order: OrderModel,
+    ) -> None:
+        """A single call archives at most `batch_size` orders."""
+        for order_id in (existing_order.id, second_order.id):
+            await _age_order(dbsession, order_id, OrderStatusModel.PICKED_UP, 40)
+        repo = OrderArchiveRepository(dbsession)
+        cutoff = datetime.now(timezone.utc)
+
+        assert await repo.archive(cutoff, 1) == 1
+        assert await repo.archive(cutoff, 1) == 1
+        assert await repo.archive(cutoff, 1) == 0
+
+    @pytest.mark.anyio
+    async def test_get_falls_back_to_archive(
+        self,
+        dbsession: AsyncSession,
+        existing_order: OrderModel,
+        order_repo: OrderRepository,
+    ) -> None:
+        """An archived order reads back exactly as it did from the hot tables."""
+        await _age_order(dbsession, existing_order.id, OrderStatusModel.PICKED_UP, 40)
+        before = await _load_entity(order_repo, existing_order.id)
+
+        await OrderArchiveRepository(dbsession).archive(datetime.now(timezone.utc), 10)
+        dbsession.expunge_all()
+        after = await _load_entity(order_repo, existing_order.id)
+
+        assert after == before
+        assert len(after.items) == 2
+        assert all(item.status_history for item in after.items)
+
+    @pytest.mark.anyio
+    async def test_update_archived_order_not_found(
+        self,
+        dbsession: AsyncSession,
+        existing_order: OrderModel,
+        order_repo: OrderRepository,
+    ) -> None:
+        """Archived orders are read-only."""
+        await _age_order(dbsession, existing_order.id, OrderStatusModel.CANCELLED, 40)
+        await OrderArchiveRepository(dbsession).archive(datetime.now(timezone.utc), 10)
+
+        with pytest.raises(NotFoundError):
+            await order_repo.update(
+                existing_order.id,
+                OrderUpdate(status=OrderStatusEnum.READY),
+            )
+
+    @pytest.mark.anyio
+    async def test_create_archived_order_conflicts(
+        self,
+        dbsession: AsyncSession,
+        existing_order: OrderModel,
+        order_create_data: OrderCreate,
+        order_repo: OrderRepository,
+    ) -> None:
+        """Re-posting an archived order is a conflict, not a second copy."""
+        await _age_order(dbsession, existing_order.id, OrderStatusModel.PICKED_UP, 40)
+        await OrderArchiveRepository(dbsession).archive(datetime.now(timezone.utc), 10)
+
+        with pytest.raises(ConflictError):
+            await order_repo.create(order_create_data)
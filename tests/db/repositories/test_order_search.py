@@ -0,0 +1,84 @@
+"""Tests for the trigram customer search of `OrderRepository`."""
+
+from typing import List
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from huuva_backend.core.entities.order import Customer, OrderCreate
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.exceptions.exceptions import UnavailableError
+
+
+async def _has_pg_trgm(dbsession: AsyncSession) -> bool:
+    return bool(
+        await dbsession.scalar(
+            text("SELECT EXISTS (SELECT FROM pg_extension WHERE extname = 'pg_trgm')"),
+        ),
+    )
+
+
+@pytest.fixture
+async def customers(
+    dbsession: AsyncSession,
+    order_create_data: OrderCreate,
+    order_repo: OrderRepository,
+) -> List[str]:
+    """Ids of orders of three customers; skips the test without pg_trgm."""
+    if not await _has_pg_trgm(dbsession):
+        pytest.skip("pg_trgm is not available")
+    ids = []
+    for name, phone in (
+        ("Maija Meikäläinen", "+358401234567"),
+        ("Matti Virtanen", "+358409876543"),
+        ("Maija Virtanen", "+358501112223"),
+    ):
+        order = await order_repo.create(
+            order_create_data.model_copy(
+                update={
+                    "id": str(uuid4()),
+                    "channel_order_id": str(uuid4()),
+                    "customer": Customer(name=name, phone_number=phone),
+                },
+            ),
+        )
+        ids.append(order.id)
+    return ids
+
+
+@pytest.mark.anyio
+async def test_search_by_partial_phone(
+    customers: List[str],
+    order_repo: OrderRepository,
+) -> None:
+    """A fragment of a phone number finds its order."""
+    orders = await order_repo.search("1234567", limit=10)
+
+    assert [order.id for order in orders] == [customers[0]]
+
+
+@pytest.mark.anyio
+async def test_search_ranks_and_limits(
+    customers: List[str],
+    order_repo: OrderRepository,
+) -> None:
+    """Names are matched despite case and typos, the closest first."""
+    orders = await order_repo.search("maija virtane", limit=10)
+    assert orders[0].id == customers[2]
+
+    assert len(await order_repo.search("virtanen", limit=1)) == 1
+
+
+@pytest.mark.anyio
+async def test_search_without_pg_trgm(
+    dbsession: AsyncSession,
+    order_repo: OrderRepository,
+) -> None:
+    """Without pg_trgm the search is unavailable."""
+    if await _has_pg_trgm(dbsession):
+        pytest.skip("pg_trgm is available")
+
+    with pytest.raises(UnavailableError):
+        await order_repo.search("1234567", limit=10)
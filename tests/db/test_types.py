@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import Enum as SQLAlchemyEnum
+from sqlalchemy.types import String, Uuid
+
+from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEnum
+from huuva_backend.db.models.order_status import OrderStatus as OrderStatusModel
+from huuva_backend.db.types import IntEnumType, generated_id_type, status_type
+from huuva_backend.settings import settings
+
+DIALECT = postgresql.dialect()
+
+
+class TestIntEnumType:
+    def test_bind_accepts_members_and_names(self) -> None:
+        """Model members, entity members and names are stored as integers."""
+        column_type = IntEnumType(OrderStatusModel)
+
+        assert column_type.process_bind_param(OrderStatusModel.READY, DIALECT) == 3
+        assert column_type.process_bind_param(OrderStatusEnum.READY, DIALECT) == 3
+        assert column_type.process_bind_param("READY", DIALECT) == 3
+        assert column_type.process_bind_param(None, DIALECT) is None
+
+    def test_result_loads_members(self) -> None:
+        """Stored integers come back as members of the model enum."""
+        column_type = IntEnumType(OrderStatusModel)
+
+        loaded = column_type.process_result_value(4, DIALECT)
+
+        assert loaded is OrderStatusModel.PICKED_UP
+        assert column_type.process_result_value(None, DIALECT) is None
+
+    def test_literal_is_integer(self) -> None:
+        """Literals, e.g. in partial index predicates, render as integers."""
+        column_type = IntEnumType(OrderStatusModel)
+
+        literal = column_type.process_literal_param(OrderStatusModel.RECEIVED, DIALECT)
+
+        assert literal == "1"
+
+
+@pytest.mark.parametrize(
+    ("native", "expected_status", "expected_id"),
+    [(False, SQLAlchemyEnum, String), (True, IntEnumType, Uuid)],
+)
+def test_column_types_follow_setting(
+    monkeypatch: pytest.MonkeyPatch,
+    native: bool,
+    expected_status: type,
+    expected_id: type,
+) -> None:
+    """`db_native_types` selects the column types."""
+    monkeypatch.setattr(settings, "db_native_types", native)
+
+    assert isinstance(status_type(OrderStatusModel), expected_status)
+    assert isinstance(generated_id_type(), expected_id)
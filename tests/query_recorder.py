@@ -0,0 +1,81 @@
+"""Recording of the SQL statements issued while serving test requests."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from httpx import AsyncClient, Request, Response
+from sqlalchemy import Connection, event
+
+
+@dataclass
+class RequestQueries:
+    """Statements executed while serving a single request."""
+
+    method: str
+    path: str
+    statements: List[str] = field(default_factory=list)
+    db_time: float = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of statements executed."""
+        return len(self.statements)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.method} {self.path}: {self.count} statements "
+            f"in {self.db_time * 1000:.1f} ms\n" + "\n".join(self.statements)
+        )
+
+
+@dataclass
+class QueryRecorder:
+    """
+    Records statement count and DB time per request made with a test client.
+
+    Statements executed outside a request, such as fixture setup, are not
+    recorded.
+    """
+
+    requests: List[RequestQueries] = field(default_factory=list)
+    _current: Optional[RequestQueries] = None
+
+    @property
+    def last(self) -> RequestQueries:
+        """Queries of the most recent request."""
+        return self.requests[-1]
+
+    def attach(self, connection: Connection, client: AsyncClient) -> None:
+        """Start recording statements on `connection` for requests of `client`."""
+        event.listen(connection, "before_cursor_execute", self._before_execute)
+        event.listen(connection, "after_cursor_execute", self._after_execute)
+        client.event_hooks["request"].append(self._on_request)
+        client.event_hooks["response"].append(self._on_response)
+
+    def detach(self, connection: Connection) -> None:
+        """Stop recording statements on `connection`."""
+        event.remove(connection, "before_cursor_execute", self._before_execute)
+        event.remove(connection, "after_cursor_execute", self._after_execute)
+
+    async def _on_request(self, request: Request) -> None:
+        self._current = RequestQueries(request.method, request.url.path)
+        self.requests.append(self._current)
+
+    async def _on_response(self, response: Response) -> None:
+        self._current = None
+
+    def _before_execute(self, conn: Connection, *args: Any) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        *args: Any,
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if self._current is not None:
+            self._current.statements.append(statement)
+            self._current.db_time += elapsed
@@ -0,0 +1,249 @@
+"""Tests for the in-memory active order board and its listener."""
+
+import asyncio
+from typing import AsyncGenerator, Callable
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from huuva_backend.core.entities.item import ItemStatus as ItemStatusEnum
+from huuva_backend.core.entities.item import ItemStatusChange, ItemUpdate
+from huuva_backend.core.entities.order import OrderCreate, OrderUpdate
+from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEnum
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.notifications import NOTIFY_CONNECT_ARGS
+from huuva_backend.db.repositories.item import ItemRepository
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.services.active_orders import ActiveOrderBoard, ActiveOrderListener
+from huuva_backend.services.item import ItemService
+from huuva_backend.services.order import OrderService
+
+
+@pytest.mark.anyio
+async def test_write_paths_put_orders_on_board(
+    dbsession: AsyncSession,
+    order_repo: OrderRepository,
+    item_repo: ItemRepository,
+    order_create_data: OrderCreate,
+) -> None:
+    """Orders and items are put on the board of the worker once committed."""
+    board = ActiveOrderBoard()
+    order_service = OrderService(order_repo, active_orders=board)
+    item_service = ItemService(item_repo, active_orders=board)
+
+    order = await order_service.create_order(order_create_data)
+    assert len(board) == 0
+    await dbsession.commit()
+    assert [o.id for o in board.orders(brand_id=order.brand_id)] == [order.id]
+
+    await order_service.update_order(
+        order.id,
+        OrderUpdate(status=OrderStatusEnum.PREPARING),
+    )
+    await dbsession.commit()
+    assert board.orders(status=OrderStatusEnum.RECEIVED) == []
+    assert len(board.orders(status=OrderStatusEnum.PREPARING)) == 1
+
+    plu = order.items[0].plu
+    await item_service.update(order.id, plu, ItemUpdate(status=ItemStatusEnum.READY))
+    await item_service.update_many(
+        [
+            ItemStatusChange(
+                order_id=order.id,
+                plu=order.items[1].plu,
+                status=ItemStatusEnum.CANCELLED,
+            ),
+        ],
+    )
+    await dbsession.commit()
+    statuses = {item.plu: item.status for item in board.orders()[0].items}
+    assert statuses == {
+        plu: ItemStatusEnum.READY,
+        order.items[1].plu: ItemStatusEnum.CANCELLED,
+    }
+
+    await order_service.update_order(
+        order.id,
+        OrderUpdate(status=OrderStatusEnum.PICKED_UP),
+    )
+    await dbsession.commit()
+    assert len(board) == 0
+    assert board.orders(brand_id=order.brand_id) == []
+
+
+@pytest.mark.anyio
+async def test_rolled_back_writes_stay_off_board(
+    _engine: AsyncEngine,
+    order_create_data: OrderCreate,
+) -> None:
+    """A change whose transaction rolls back never reaches the board."""
+    board = ActiveOrderBoard()
+    async with async_sessionmaker(_engine)() as session:
+        service = OrderService(OrderRepository(session), active_orders=board)
+
+        await service.create_order(order_create_data)
+        await session.rollback()
+        await session.commit()
+
+    assert len(board) == 0
+
+
+@pytest.mark.anyio
+async def test_board_orders_are_oldest_first(
+    dbsession: AsyncSession,
+    order_repo: OrderRepository,
+    order_create_data: OrderCreate,
+) -> None:
+    """Orders of every brand are listed by creation time."""
+    board = ActiveOrderBoard()
+    service = OrderService(order_repo, active_orders=board)
+    ids = []
+    for brand_id in ("brand-b", "brand-a", "brand-b"):
+        order = await service.create_order(
+            order_create_data.model_copy(
+                update={
+                    "id": str(uuid4()),
+                    "brand_id": brand_id,
+                    "channel_order_id": str(uuid4()),
+                },
+            ),
+        )
+        ids.append(order.id)
+    await dbsession.commit()
+
+    assert [order.id for order in board.orders()] == ids
+    assert [order.id for order in board.orders(brand_id="brand-b")] == ids[::2]
+    assert board.orders(brand_id="unknown") == []
+
+
+@pytest.fixture
+async def notifying_engine(_engine: AsyncEngine) -> AsyncGenerator[AsyncEngine, None]:
+    """Engine of the test database set up as in apps with the board."""
+    engine = create_async_engine(_engine.url, connect_args=NOTIFY_CONNECT_ARGS)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def listener(
+    notifying_engine: AsyncEngine,
+) -> AsyncGenerator[ActiveOrderListener, None]:
+    """A started listener of the test database; its orders are committed."""
+    session_factory = async_sessionmaker(notifying_engine, expire_on_commit=False)
+    listener = ActiveOrderListener(
+        ActiveOrderBoard(),
+        notifying_engine,
+        session_factory,
+    )
+    await listener.start()
+    try:
+        yield listener
+    finally:
+        await listener.stop()
+        async with notifying_engine.begin() as conn:
+            await conn.execute(delete(OrderModel).where(OrderModel.brand_id == "board"))
+
+
+async def _until(condition: Callable[[], bool], timeout: float = 5) -> None:
+    async def wait() -> None:
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest.mark.anyio
+async def test_listener_follows_notifications(
+    listener: ActiveOrderListener,
+    order_create_data: OrderCreate,
+) -> None:
+    """Changes committed by other workers reach the board by notification."""
+    board = listener.board
+    assert board.ready
+    session_factory = listener.session_factory
+    order_in = order_create_data.model_copy(
+        update={"id": str(uuid4()), "brand_id": "board"},
+    )
+
+    async with session_factory() as session:
+        await OrderRepository(session).create(order_in)
+        await session.commit()
+    await _until(lambda: len(board.orders(brand_id="board")) == 1)
+
+    async with session_factory() as session:
+        await ItemRepository(session).update(
+            str(order_in.id),
+            order_in.items[0].plu,
+            ItemUpdate(status=ItemStatusEnum.PREPARING),
+        )
+        await session.commit()
+    await _until(
+        lambda: {item.plu: item.status for item in board.orders("board")[0].items}
+        == {"ITEM001": ItemStatusEnum.PREPARING, "ITEM002": ItemStatusEnum.ORDERED},
+    )
+
+    async with session_factory() as session:
+        await OrderRepository(session).update(
+            str(order_in.id),
+            OrderUpdate(status=OrderStatusEnum.CANCELLED),
+        )
+        await session.commit()
+    await _until(lambda: board.orders(brand_id="board") == [])
+
+
+@pytest.mark.anyio
+async def test_listener_reloads_after_losing_its_connection(
+    listener: ActiveOrderListener,
+    order_create_data: OrderCreate,
+) -> None:
+    """Orders changed while the connection was lost are loaded on reconnection."""
+    listener.reconnect_delay = 0.01
+    listener._driver.terminate()  # noqa: SLF001
+    async with listener.session_factory() as session:
+        await OrderRepository(session).create(
+            order_create_data.model_copy(
+                update={"id": str(uuid4()), "brand_id": "board"},
+            ),
+        )
+        await session.commit()
+
+    await _until(lambda: len(listener.board.orders(brand_id="board")) == 1)
+    assert listener.board.ready
+
+
+@pytest.mark.anyio
+async def test_writes_without_board_do_not_notify(
+    _engine: AsyncEngine,
+    listener: ActiveOrderListener,
+    order_create_data: OrderCreate,
+) -> None:
+    """Only connections set up for the board notify their changes."""
+    silent, notified = (
+        order_create_data.model_copy(
+            update={
+                "id": str(uuid4()),
+                "brand_id": "board",
+                "channel_order_id": str(uuid4()),
+            },
+        )
+        for _ in range(2)
+    )
+    async with AsyncSession(_engine) as session:
+        await OrderRepository(session).create(silent)
+        await session.commit()
+    async with listener.session_factory() as session:
+        await OrderRepository(session).create(notified)
+        await session.commit()
+
+    # Notifications arrive in commit order, so the first would be in by now.
+    await _until(lambda: len(listener.board.orders(brand_id="board")) > 0)
+    assert [order.id for order in listener.board.orders(brand_id="board")] == [
+        notified.id,
+    ]
@@ -1,5 +1,6 @@
 """Test suite for the ItemService."""
 
+from typing import Dict, Optional
 from uuid import uuid4
 
 import pytest
@@ -11,11 +12,19 @@ from huuva_backend.core.entities.item import (
     ItemStatus as ItemStatusEnum,
 )
 from huuva_backend.core.entities.item import (
+    ItemStatusChange,
     ItemUpdate,
 )
+from huuva_backend.core.entities.order import OrderUpdate
+from huuva_backend.core.entities.order_status import (
+    OrderStatus as OrderStatusEnum,
+)
 from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.repositories.item import ItemRepository
+from huuva_backend.db.repositories.order import OrderRepository
 from huuva_backend.exceptions.exceptions import NotFoundError
-from huuva_backend.services.item import ItemService
+from huuva_backend.services.item import ItemService, derive_order_status
+from huuva_backend.services.order import OrderService
 
 
 @pytest.mark.anyio
@@ -69,3 +78,107 @@ async def test_update_item_not_found(item_service: ItemService) -> None:
             "NO_SUCH_PLU",
             ItemUpdate(status=ItemStatusEnum.READY),
         )
+
+
+@pytest.fixture
+def deriving_item_service(
+    item_repo: ItemRepository,
+    order_repo: OrderRepository,
+) -> ItemService:
+    """ItemService that derives order statuses from item statuses."""
+    return ItemService(item_repository=item_repo, order_repository=order_repo)
+
+
+@pytest.mark.parametrize(
+    ("counts", "expected"),
+    [
+        ({ItemStatusEnum.ORDERED: 2}, OrderStatusEnum.RECEIVED),
+        (
+            {ItemStatusEnum.ORDERED: 1, ItemStatusEnum.READY: 1},
+            OrderStatusEnum.PREPARING,
+        ),
+        ({ItemStatusEnum.READY: 1, ItemStatusEnum.PICKED_UP: 1}, OrderStatusEnum.READY),
+        ({ItemStatusEnum.READY: 1, ItemStatusEnum.CANCELLED: 1}, OrderStatusEnum.READY),
+        ({ItemStatusEnum.PICKED_UP: 2}, OrderStatusEnum.PICKED_UP),
+        ({ItemStatusEnum.CANCELLED: 2}, OrderStatusEnum.CANCELLED),
+        ({}, None),
+    ],
+)
+def test_derive_order_status(
+    counts: Dict[ItemStatusEnum, int],
+    expected: Optional[OrderStatusEnum],
+) -> None:
+    """The order status follows from the item statuses."""
+    assert derive_order_status(counts) == expected
+
+
+@pytest.mark.anyio
+async def test_update_derives_order_status(
+    deriving_item_service: ItemService,
+    order_service: OrderService,
+    existing_order: OrderModel,
+) -> None:
+    """The order becomes READY when its last item does."""
+    plus = [item.plu for item in existing_order.items]
+    ready = ItemUpdate(status=ItemStatusEnum.READY)
+
+    await deriving_item_service.update(existing_order.id, plus[0], ready)
+    order = await order_service.get_order(existing_order.id)
+    assert order.status == OrderStatusEnum.PREPARING
+
+    for plu in plus[1:]:
+        await deriving_item_service.update(existing_order.id, plu, ready)
+    order = await order_service.get_order(existing_order.id)
+    assert order.status == OrderStatusEnum.READY
+    assert [h.status for h in order.status_history][-2:] == [
+        OrderStatusEnum.PREPARING,
+        OrderStatusEnum.READY,
+    ]
+
+
+@pytest.mark.anyio
+async def test_update_many_derives_order_status(
+    deriving_item_service: ItemService,
+    order_service: OrderService,
+    existing_order: OrderModel,
+) -> None:
+    """A batch update derives the order status once."""
+    history_before = len(existing_order.status_history)
+
+    await deriving_item_service.update_many(
+        [
+            ItemStatusChange(
+                order_id=existing_order.id,
+                plu=item.plu,
+                status=ItemStatusEnum.PICKED_UP,
+            )
+            for item in existing_order.items
+        ],
+    )
+
+    order = await order_service.get_order(existing_order.id)
+    assert order.status == OrderStatusEnum.PICKED_UP
+    assert len(order.status_history) == history_before + 1
+
+
+@pytest.mark.anyio
+async def test_update_keeps_cancelled_order(
+    deriving_item_service: ItemService,
+    order_service: OrderService,
+    existing_order: OrderModel,
+    first_item_plu: str,
+) -> None:
+    """Item updates do not reopen a cancelled order."""
+    await order_service.update_order(
+        existing_order.id,
+        OrderUpdate(status=OrderStatusEnum.CANCELLED),
+    )
+
+    await deriving_item_service.update(
+        existing_order.id,
+        first_item_plu,
+        ItemUpdate(status=ItemStatusEnum.READY),
+    )
+
+    order = await order_service.get_order(existing_order.id)
+    assert order.status == OrderStatusEnum.CANCELLED
@@ -3,6 +3,7 @@
 from uuid import uuid4
 
 import pytest
+from prometheus_client import REGISTRY
 
 from huuva_backend.core.entities.order import Order as OrderEntity
 from huuva_backend.core.entities.order import OrderCreate, OrderUpdate
@@ -111,3 +112,47 @@ async def test_update_order_with_specific_item(
     # Verify all items were updated to the new status
     for item in updated.items:
         assert item.status == new_status
+
+
+@pytest.mark.anyio
+async def test_update_order_counts_status_transition(
+    order_service: OrderService,
+    existing_order: OrderModel,
+) -> None:
+    """The transition from the previous status is counted on commit."""
+    labels = {"from_status": "RECEIVED", "to_status": "READY"}
+    before = REGISTRY.get_sample_value("order_status_transitions_total", labels) or 0
+
+    await order_service.update_order(
+        existing_order.id,
+        OrderUpdate(status=OrderStatusEnum.READY),
+    )
+    pending = REGISTRY.get_sample_value("order_status_transitions_total", labels)
+    await order_service.order_repository.db.commit()
+
+    after = REGISTRY.get_sample_value("order_status_transitions_total", labels)
+    assert (pending or 0) == before
+    assert after == before + 1
+
+
+@pytest.mark.anyio
+async def test_update_order_counts_transition_without_history(
+    order_service: OrderService,
+    order_create_data: OrderCreate,
+) -> None:
+    """The previous status is counted even when the order has no history."""
+    order_in = order_create_data.model_copy(
+        update={"status": OrderStatusEnum.PREPARING, "status_history": []},
+    )
+    await order_service.create_order(order_in)
+    labels = {"from_status": "PREPARING", "to_status": "READY"}
+    before = REGISTRY.get_sample_value("order_status_transitions_total", labels) or 0
+
+    await order_service.update_order(
+        order_in.id,
+        OrderUpdate(status=OrderStatusEnum.READY),
+    )
+    await order_service.order_repository.db.commit()
+
+    after = REGISTRY.get_sample_value("order_status_transitions_total", labels)
+    assert after == before + 1
@@ -0,0 +1,113 @@
+"""Test suite for the PartitionService."""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.models.order_status import OrderStatus as OrderStatusModel
+from huuva_backend.db.models.order_status import OrderStatusHistory
+from huuva_backend.db.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    is_partition,
+    month_start,
+    partition_name,
+)
+from huuva_backend.services.partition import PartitionService
+
+
+async def _partition_of(dbsession: AsyncSession, history_id: str) -> str:
+    result = await dbsession.execute(
+        text(
+            "SELECT tableoid::regclass::text FROM order_status_history "
+            "WHERE id = :id",
+        ),
+        {"id": history_id},
+    )
+    return result.scalar_one()
+
+
+def test_add_months_wraps_years() -> None:
+    """Month arithmetic crosses year boundaries in both directions."""
+    december = month_start(datetime(2025, 12, 24, tzinfo=timezone.utc))
+    assert add_months(december, 1) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert add_months(december, -12) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+
+
+def test_is_partition() -> None:
+    """Monthly and default partitions are told apart from other tables."""
+    assert is_partition("order_status_history_p2031_11")
+    assert is_partition("item_status_history_default")
+    assert not is_partition("order_status_history")
+    assert not is_partition("orders_default")
+
+
+@pytest.mark.anyio
+async def test_create_future_partitions(dbsession: AsyncSession) -> None:
+    """Partitions are created for the current month and the months ahead."""
+    now = datetime(2031, 11, 5, tzinfo=timezone.utc)
+    service = PartitionService(dbsession)
+
+    created = await service.create_future_partitions(2, now=now)
+
+    assert "order_status_history_p2031_11" in created
+    assert "order_status_history_p2032_01" in created
+    assert "item_status_history_p2031_12" in created
+    assert len(created) == 6
+
+    # Running it again is a no-op.
+    assert await service.create_future_partitions(2, now=now) == []
+
+
+@pytest.mark.anyio
+async def test_create_partition_moves_rows_from_default(
+    dbsession: AsyncSession,
+    existing_order: OrderModel,
+) -> None:
+    """Rows that landed in the default partition move to the new partition."""
+    timestamp = datetime(2032, 3, 10, tzinfo=timezone.utc)
+    history = OrderStatusHistory(
+        order_id=existing_order.id,
+        status=OrderStatusModel.PREPARING,
+        timestamp=timestamp,
+    )
+    dbsession.add(history)
+    await dbsession.flush()
+    assert await _partition_of(dbsession, history.id) == "order_status_history_default"
+
+    await PartitionService(dbsession).create_future_partitions(0, now=timestamp)
+
+    assert await _partition_of(dbsession, history.id) == partition_name(
+        "order_status_history",
+        month_start(timestamp),
+    )
+
+
+@pytest.mark.anyio
+async def test_concurrent_workers_create_partition_once(_engine: AsyncEngine) -> None:
+    """Workers running the job at the same time do not race on CREATE TABLE."""
+    month = datetime(2045, 6, 1, tzinfo=timezone.utc)
+    sessions = [async_sessionmaker(_engine)() for _ in range(2)]
+    try:
+        results = await asyncio.gather(
+            *(
+                PartitionService(session).create_partitions([month])
+                for session in sessions
+            ),
+        )
+    finally:
+        for session in sessions:
+            await session.close()
+        async with _engine.begin() as conn:
+            for table in PARTITIONED_TABLES:
+                name = partition_name(table, month)
+                await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+    created = sorted(name for names in results for name in names)
+    assert created == sorted(
+        partition_name(table, month) for table in PARTITIONED_TABLES
+    )
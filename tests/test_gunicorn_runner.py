@@ -0,0 +1,36 @@
+"""Tests for the gunicorn application."""
+
+import gc
+
+from fastapi import FastAPI
+
+from huuva_backend.gunicorn_runner import GunicornApplication
+from huuva_backend.web.application import get_app
+
+FACTORY = "huuva_backend.web.application:get_app"
+
+
+def test_load_returns_factory() -> None:
+    """By default each worker builds the app with the factory."""
+    application = GunicornApplication(FACTORY, host="127.0.0.1", port=0, workers=1)
+
+    assert application.cfg.worker_class_str.endswith(".UvicornWorker")
+    assert application.load() is get_app
+
+
+def test_preload_app_builds_app_in_master() -> None:
+    """With preload_app the master builds the app the workers inherit."""
+    application = GunicornApplication(
+        FACTORY,
+        host="127.0.0.1",
+        port=0,
+        workers=1,
+        preload_app=True,
+    )
+
+    assert application.cfg.worker_class_str.endswith(".PreloadedUvicornWorker")
+    try:
+        assert isinstance(application.load(), FastAPI)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
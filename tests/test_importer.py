@@ -0,0 +1,199 @@
+"""Tests for the offline order importer."""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List
+
+import pytest
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEnum
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.models.order_archive import OrderArchive as OrderArchiveModel
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.db.repositories.order_archive import OrderArchiveRepository
+from huuva_backend.importer import import_orders, read_records
+
+ORDER_IDS = [f"imported-{number}" for number in range(3)]
+
+
+def _payload(order_id: str) -> Dict[str, Any]:
+    return {
+        "_id": order_id,
+        "account": "import-account",
+        "brandId": "import-brand",
+        "channelOrderId": order_id,
+        "customer": {"name": "John Doe", "phoneNumber": "+123456789"},
+        "deliveryAddress": {
+            "city": "Helsinki",
+            "street": "Huuvatie 1",
+            "postalCode": "00100",
+        },
+        "pickupTime": "2019-05-02T12:30:00Z",
+        "items": [
+            {"name": "Burger", "plu": "PLU1", "quantity": 2, "status": 4},
+            {"name": "Fries", "plu": "PLU2", "quantity": 1, "status": 4},
+        ],
+        "status": 4,
+        "statusHistory": [
+            {"status": 1, "timestamp": "2019-05-02T12:00:00Z"},
+            {"status": 4, "timestamp": "2019-05-02T12:35:00Z"},
+        ],
+    }
+
+
+@pytest.fixture
+def ndjson(tmp_path: Path) -> Path:
+    """NDJSON file of three orders and an invalid record."""
+    lines: List[str] = [json.dumps(_payload(order_id)) for order_id in ORDER_IDS]
+    lines.insert(1, json.dumps({"_id": "missing-fields"}))
+    path = tmp_path / "orders.ndjson"
+    path.write_text("\n".join(lines) + "\n\n")
+    return path
+
+
+@pytest.fixture
+async def import_engine(_engine: AsyncEngine) -> AsyncGenerator[AsyncEngine, None]:
+    """The test engine; the importer commits, so imported orders are deleted."""
+    yield _engine
+    async with _engine.begin() as conn:
+        await conn.execute(delete(OrderModel).where(OrderModel.id.in_(ORDER_IDS)))
+        await conn.execute(
+            delete(OrderArchiveModel).where(OrderArchiveModel.id.in_(ORDER_IDS)),
+        )
+
+
+def test_read_records_json_array(tmp_path: Path) -> None:
+    """Objects of a JSON array are read across chunk boundaries."""
+    payloads = [_payload(order_id) for order_id in ORDER_IDS]
+    path = tmp_path / "orders.json"
+    path.write_text(json.dumps(payloads, indent=2))
+
+    assert list(read_records(path, chunk_size=64)) == payloads
+
+
+def test_read_records_ndjson(ndjson: Path) -> None:
+    """NDJSON lines are read undecoded, blank lines skipped."""
+    records = list(read_records(ndjson))
+
+    assert len(records) == 4
+    assert json.loads(records[0])["_id"] == ORDER_IDS[0]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("workers", [0, 1])
+async def test_import_orders(
+    import_engine: AsyncEngine,
+    ndjson: Path,
+    tmp_path: Path,
+    workers: int,
+) -> None:
+    """Valid orders are copied with their items and histories."""
+    checkpoint = tmp_path / "orders.checkpoint"
+
+    report = await import_orders(
+        ndjson,
+        import_engine,
+        batch_size=2,
+        workers=workers,
+        checkpoint=checkpoint,
+    )
+
+    assert (report.records, report.imported, report.invalid) == (4, 3, 1)
+    assert json.loads(checkpoint.read_text()) == {"records": 4}
+    async with AsyncSession(import_engine) as session:
+        order = await OrderRepository(session).get(ORDER_IDS[0])
+        assert order.status.name == OrderStatusEnum.PICKED_UP.name
+        assert order.created_at.isoformat() == "2019-05-02T12:00:00+00:00"
+        assert {item.plu: item.quantity for item in order.items} == {
+            "PLU1": 2,
+            "PLU2": 1,
+        }
+        assert [entry.status.name for entry in order.status_history] == [
+            "RECEIVED",
+            "PICKED_UP",
+        ]
+        assert all(len(item.status_history) == 1 for item in order.items)
+        partition = await session.scalar(
+            text(
+                "SELECT DISTINCT tableoid::regclass::text FROM item_status_history "
+                "WHERE order_id = :id",
+            ),
+            {"id": ORDER_IDS[0]},
+        )
+        assert partition == "item_status_history_p2019_05"
+
+
+@pytest.mark.anyio
+async def test_import_orders_resumes_and_skips_existing(
+    import_engine: AsyncEngine,
+    ndjson: Path,
+    tmp_path: Path,
+) -> None:
+    """A rerun resumes after the checkpoint; without it existing orders are skipped."""
+    checkpoint = tmp_path / "orders.checkpoint"
+    await import_orders(ndjson, import_engine, checkpoint=checkpoint)
+
+    resumed = await import_orders(ndjson, import_engine, checkpoint=checkpoint)
+    assert (resumed.imported, resumed.skipped_existing) == (0, 0)
+
+    again = await import_orders(ndjson, import_engine)
+    assert (again.imported, again.skipped_existing) == (0, 3)
+
+
+@pytest.mark.anyio
+async def test_import_orders_skips_archived(
+    import_engine: AsyncEngine,
+    ndjson: Path,
+) -> None:
+    """Orders moved to the archive since are not imported again."""
+    await import_orders(ndjson, import_engine)
+    async with AsyncSession(import_engine) as session, session.begin():
+        archived = await OrderArchiveRepository(session).archive(
+            datetime.now(timezone.utc),
+            batch_size=10,
+        )
+    assert archived == len(ORDER_IDS)
+
+    report = await import_orders(ndjson, import_engine)
+
+    assert (report.imported, report.skipped_existing) == (0, 3)
+
+
+@pytest.mark.anyio
+async def test_import_orders_skips_channel_resends(
+    import_engine: AsyncEngine,
+    ndjson: Path,
+    tmp_path: Path,
+) -> None:
+    """Orders whose channel order exists already are skipped, in or across batches."""
+    await import_orders(ndjson, import_engine)
+    resends = tmp_path / "resends.ndjson"
+    resends.write_text(
+        "\n".join(
+            json.dumps({**_payload(order_id), "_id": f"resent-{number}"})
+            for number, order_id in enumerate([ORDER_IDS[0], ORDER_IDS[0]])
+        ),
+    )
+
+    report = await import_orders(resends, import_engine)
+
+    assert (report.imported, report.skipped_existing) == (0, 1)
+
+
+@pytest.mark.anyio
+async def test_import_orders_rejects_repeated_plus(
+    import_engine: AsyncEngine,
+    tmp_path: Path,
+) -> None:
+    """An order listing a PLU twice is invalid instead of failing its batch."""
+    repeated = _payload(ORDER_IDS[0])
+    repeated["items"].append(repeated["items"][0])
+    path = tmp_path / "repeated.ndjson"
+    path.write_text(json.dumps(repeated) + "\n" + json.dumps(_payload(ORDER_IDS[1])))
+
+    report = await import_orders(path, import_engine, batch_size=2)
+
+    assert (report.records, report.imported, report.invalid) == (2, 1, 1)
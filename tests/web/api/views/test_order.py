@@ -6,12 +6,14 @@ prefix).
 """
 
 import uuid
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from huuva_backend.core.entities.item import ItemCreate
 from huuva_backend.core.entities.item_status import ItemStatus as ItemStatusEnum
@@ -25,7 +27,10 @@ from huuva_backend.core.entities.order_status import (
 from huuva_backend.core.entities.order_status import (
     OrderStatusHistory,
 )
+from huuva_backend.db.mappings.order import order_db_to_entity
 from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.services.active_orders import ActiveOrderBoard
+from tests.query_recorder import QueryRecorder
 
 
 @pytest.mark.anyio
@@ -47,6 +52,73 @@ async def test_list_orders_endpoint(
     assert str(different_account_order.id) in returned_ids
 
 
+@pytest.mark.anyio
+async def test_list_orders_by_pickup_window(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+    second_order: OrderModel,
+) -> None:
+    """GET /orders/ filters on a pickup window given in camelCase."""
+    url = fastapi_app.url_path_for("list_orders")
+    pickup_time = existing_order.pickup_time
+    window = {
+        "status": 2,
+        "pickupFrom": (pickup_time - timedelta(minutes=1)).isoformat(),
+        "pickupTo": (pickup_time + timedelta(minutes=1)).isoformat(),
+    }
+    resp = await client.get(url, params=window)
+    assert resp.status_code == 200
+    assert [o["id"] for o in resp.json()] == [second_order.id]
+
+    window["pickupFrom"] = (pickup_time + timedelta(seconds=1)).isoformat()
+    resp = await client.get(url, params=window)
+    assert resp.json() == []
+
+
+@pytest.mark.anyio
+async def test_search_orders_validation(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """GET /orders/search needs three characters; 503 without pg_trgm."""
+    url = fastapi_app.url_path_for("search_orders")
+    resp = await client.get(url, params={"q": "12"})
+    assert resp.status_code == 422
+
+    has_pg_trgm = await dbsession.scalar(
+        text("SELECT EXISTS (SELECT FROM pg_extension WHERE extname = 'pg_trgm')"),
+    )
+    resp = await client.get(url, params={"q": "123", "limit": 5})
+    assert resp.status_code == (200 if has_pg_trgm else 503)
+
+
+@pytest.mark.anyio
+async def test_get_order_by_channel(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+) -> None:
+    """GET /orders/by-channel/{brandId}/{channelOrderId} finds the order."""
+    url = fastapi_app.url_path_for(
+        "get_order_by_channel",
+        brand_id=existing_order.brand_id,
+        channel_order_id=existing_order.channel_order_id,
+    )
+    resp = await client.get(url)
+    assert resp.status_code == 200
+    assert resp.json()["id"] == existing_order.id
+
+    url = fastapi_app.url_path_for(
+        "get_order_by_channel",
+        brand_id=existing_order.brand_id,
+        channel_order_id="unknown",
+    )
+    resp = await client.get(url)
+    assert resp.status_code == 404
+
+
 @pytest.mark.anyio
 async def test_get_order_success(
     fastapi_app: FastAPI,
@@ -222,3 +294,213 @@ async def test_update_item_status(
     data = resp.json()
     assert data["plu"] == first_item_plu
     assert data["status"] == ItemStatusEnum.READY.name
+
+
+@pytest.mark.anyio
+async def test_update_item_statuses(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+) -> None:
+    """PATCH /orders/{order_id}/items updates every listed item."""
+    url = fastapi_app.url_path_for(
+        "update_item_statuses",
+        order_id=str(existing_order.id),
+    )
+    plus = [item.plu for item in existing_order.items]
+    resp = await client.patch(
+        url,
+        json=[{"plu": plu, "status": ItemStatusEnum.READY.value} for plu in plus],
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert sorted(item["plu"] for item in data) == sorted(plus)
+    for item in data:
+        assert item["status"] == ItemStatusEnum.READY.name
+        assert item["statusHistory"][-1]["status"] == ItemStatusEnum.READY.name
+
+
+@pytest.mark.anyio
+async def test_update_item_statuses_unknown_plu(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+    first_item_plu: str,
+) -> None:
+    """An unknown PLU is a 404 and leaves the other items unchanged."""
+    url = fastapi_app.url_path_for(
+        "update_item_statuses",
+        order_id=str(existing_order.id),
+    )
+    resp = await client.patch(
+        url,
+        json=[
+            {"plu": first_item_plu, "status": ItemStatusEnum.READY.value},
+            {"plu": "NO-SUCH-PLU", "status": ItemStatusEnum.READY.value},
+        ],
+    )
+    assert resp.status_code == 404
+    assert "NO-SUCH-PLU" in resp.json()["detail"]
+
+    order = await client.get(
+        fastapi_app.url_path_for("get_order", order_id=str(existing_order.id)),
+    )
+    item = next(i for i in order.json()["items"] if i["plu"] == first_item_plu)
+    assert item["status"] == ItemStatusEnum.ORDERED.name
+    assert len(item["statusHistory"]) == 1
+
+
+@pytest.mark.anyio
+async def test_update_item_statuses_empty(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+) -> None:
+    """An empty list of changes is rejected."""
+    url = fastapi_app.url_path_for(
+        "update_item_statuses",
+        order_id=str(existing_order.id),
+    )
+    resp = await client.patch(url, json=[])
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_update_order_item_statuses(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+    second_order: OrderModel,
+    first_item_plu: str,
+) -> None:
+    """PATCH /items updates items of several orders at once."""
+    url = fastapi_app.url_path_for("update_order_item_statuses")
+    resp = await client.patch(
+        url,
+        json=[
+            {
+                "orderId": str(order.id),
+                "plu": first_item_plu,
+                "status": ItemStatusEnum.PREPARING.value,
+            }
+            for order in (existing_order, second_order)
+        ],
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert {item["orderId"] for item in data} == {
+        str(existing_order.id),
+        str(second_order.id),
+    }
+    assert {item["status"] for item in data} == {ItemStatusEnum.PREPARING.name}
+
+
+def _idempotent_payload(channel_order_id: str) -> Dict[str, Any]:
+    return {
+        "_id": "60f87ea2a52dad8a3fa4861",
+        "account": "60bfc6dc4887c9851d5a0246",
+        "brandId": "60bfc6dc4887c9851d5a0245",
+        "channelOrderId": channel_order_id,
+        "customer": {"name": "John Doe", "phoneNumber": "+123456789"},
+        "deliveryAddress": {
+            "city": "Helsinki",
+            "street": "Huuvatie 1",
+            "postalCode": "00100",
+        },
+        "pickupTime": "2021-07-22T20:28:02Z",
+        "items": [{"name": "Hawaii Burger", "plu": "CAT1-0001", "quantity": 1}],
+        "status": 1,
+        "statusHistory": [{"status": 1, "timestamp": "2021-07-22T20:10:00Z"}],
+    }
+
+
+@pytest.mark.anyio
+async def test_create_order_idempotency_key_replays_response(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """A retry with the same Idempotency-Key gets the stored response back."""
+    url = fastapi_app.url_path_for("create_order")
+    payload = _idempotent_payload("TEST1626898083")
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = await client.post(url, json=payload, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    # The replay must not depend on the orders table at all.
+    await dbsession.execute(delete(OrderModel).where(OrderModel.id == payload["_id"]))
+
+    retry = await client.post(url, json=payload, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+@pytest.mark.anyio
+async def test_create_order_idempotency_key_reused_for_other_payload(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Reusing an Idempotency-Key for a different payload is a conflict."""
+    url = fastapi_app.url_path_for("create_order")
+    headers = {"Idempotency-Key": "retry-2"}
+
+    first = await client.post(
+        url,
+        json=_idempotent_payload("TEST1626898084"),
+        headers=headers,
+    )
+    assert first.status_code == 201
+
+    other = await client.post(
+        url,
+        json=_idempotent_payload("TEST1626898085"),
+        headers=headers,
+    )
+    assert other.status_code == 409
+
+
+@pytest.mark.anyio
+async def test_list_active_orders_from_board(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    query_recorder: QueryRecorder,
+    existing_order: OrderModel,
+    second_order: OrderModel,
+) -> None:
+    """GET /orders/active is served from the board, without a query."""
+    board = ActiveOrderBoard()
+    board.load(order_db_to_entity(order) for order in (existing_order, second_order))
+    fastapi_app.state.active_orders = board
+    url = fastapi_app.url_path_for("list_active_orders")
+
+    resp = await client.get(url, params={"brand": existing_order.brand_id})
+    assert resp.status_code == 200
+    assert {order["id"] for order in resp.json()} == {
+        existing_order.id,
+        second_order.id,
+    }
+
+    resp = await client.get(url, params={"status": OrderStatusEnum.PREPARING.value})
+    assert [order["id"] for order in resp.json()] == [second_order.id]
+
+    resp = await client.get(url, params={"brand": "unknown"})
+    assert resp.json() == []
+    assert all(request.count == 0 for request in query_recorder.requests)
+
+
+@pytest.mark.anyio
+async def test_list_active_orders_without_board(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """GET /orders/active is a 503 while there is no loaded board."""
+    url = fastapi_app.url_path_for("list_active_orders")
+    resp = await client.get(url)
+    assert resp.status_code == 503
+
+    fastapi_app.state.active_orders = ActiveOrderBoard()
+    resp = await client.get(url)
+    assert resp.status_code == 503
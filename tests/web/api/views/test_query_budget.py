@@ -0,0 +1,188 @@
+"""
+Statement budgets for the hot Orders API endpoints.
+
+Each test holds an endpoint to a maximum number of SQL statements, so that an
+N+1 regression fails the suite instead of reaching production. Budgets do not
+depend on the number of items in an order.
+"""
+
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from huuva_backend.core.entities.item import ItemCreate
+from huuva_backend.core.entities.item_status import ItemStatus as ItemStatusEnum
+from huuva_backend.core.entities.order import OrderCreate
+from huuva_backend.core.entities.order_status import OrderStatus as OrderStatusEnum
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.repositories.order import OrderRepository
+from tests.query_recorder import QueryRecorder
+
+ITEM_COUNTS = [1, 50]
+
+
+def _items(count: int) -> List[ItemCreate]:
+    return [
+        ItemCreate(plu=f"PLU{i:03}", name="Burger", quantity=1) for i in range(count)
+    ]
+
+
+@pytest.fixture(params=ITEM_COUNTS)
+async def large_order(
+    request: pytest.FixtureRequest,
+    order_create_data: OrderCreate,
+    order_repo: OrderRepository,
+) -> OrderModel:
+    """Create an order with `request.param` items."""
+    return await order_repo.create(
+        order_create_data.model_copy(update={"items": _items(request.param)}),
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("item_count", ITEM_COUNTS)
+async def test_create_order_budget(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    query_recorder: QueryRecorder,
+    item_count: int,
+) -> None:
+    """POST /orders/ issues one INSERT per table."""
+    url = fastapi_app.url_path_for("create_order")
+    payload = {
+        "_id": "60f87ea2a52dad8a3fa4861",
+        "account": "60bfc6dc4887c9851d5a0246",
+        "brandId": "60bfc6dc4887c9851d5a0245",
+        "channelOrderId": "TEST1626898086",
+        "customer": {"name": "John Doe", "phoneNumber": "+123456789"},
+        "deliveryAddress": {
+            "city": "Helsinki",
+            "street": "Huuvatie 1",
+            "postalCode": "00100",
+        },
+        "pickupTime": "2021-07-22T20:28:02Z",
+        "items": [item.model_dump() for item in _items(item_count)],
+        "status": 1,
+        "statusHistory": [{"status": 1, "timestamp": "2021-07-22T20:10:00Z"}],
+    }
+
+    resp = await client.post(url, json=payload)
+
+    assert resp.status_code == 201
+    assert query_recorder.last.count <= 4, str(query_recorder.last)
+
+
+@pytest.mark.anyio
+async def test_get_order_budget(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    large_order: OrderModel,
+    query_recorder: QueryRecorder,
+) -> None:
+    """GET /orders/{order_id} loads the order and its collections."""
+    url = fastapi_app.url_path_for("get_order", order_id=large_order.id)
+
+    resp = await client.get(url)
+
+    assert resp.status_code == 200
+    assert query_recorder.last.count <= 4, str(query_recorder.last)
+
+
+@pytest.mark.anyio
+async def test_list_orders_budget(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    large_order: OrderModel,
+    second_order: OrderModel,
+    query_recorder: QueryRecorder,
+) -> None:
+    """GET /orders/ does not issue statements per listed order."""
+    url = fastapi_app.url_path_for("list_orders")
+
+    resp = await client.get(url)
+
+    assert resp.status_code == 200
+    assert len(resp.json()) == 2
+    assert query_recorder.last.count <= 4, str(query_recorder.last)
+
+
+@pytest.mark.anyio
+async def test_update_order_status_budget(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    large_order: OrderModel,
+    query_recorder: QueryRecorder,
+) -> None:
+    """PATCH /orders/{order_id} issues the same statements for any item count."""
+    url = fastapi_app.url_path_for("update_order_status", order_id=large_order.id)
+
+    resp = await client.patch(url, json={"status": OrderStatusEnum.READY.value})
+
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == len(large_order.items)
+    assert query_recorder.last.count <= 6, str(query_recorder.last)
+
+
+@pytest.mark.anyio
+async def test_update_item_status_budget(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    large_order: OrderModel,
+    query_recorder: QueryRecorder,
+) -> None:
+    """PATCH /orders/{order_id}/items/{plu} issues three statements."""
+    url = fastapi_app.url_path_for(
+        "update_item_status",
+        order_id=large_order.id,
+        plu=large_order.items[0].plu,
+    )
+
+    resp = await client.patch(url, json={"status": ItemStatusEnum.READY.value})
+
+    assert resp.status_code == 200
+    assert query_recorder.last.count <= 3, str(query_recorder.last)
+
+
+@pytest.mark.anyio
+async def test_update_item_statuses_budget(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    large_order: OrderModel,
+    query_recorder: QueryRecorder,
+) -> None:
+    """PATCH /orders/{order_id}/items issues the same statements for any count."""
+    url = fastapi_app.url_path_for("update_item_statuses", order_id=large_order.id)
+
+    resp = await client.patch(
+        url,
+        json=[
+            {"plu": item.plu, "status": ItemStatusEnum.READY.value}
+            for item in large_order.items
+        ],
+    )
+
+    assert resp.status_code == 200
+    assert len(resp.json()) == len(large_order.items)
+    assert query_recorder.last.count <= 5, str(query_recorder.last)
+
+
+@pytest.mark.anyio
+async def test_recorder_tracks_each_request(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    large_order: OrderModel,
+    query_recorder: QueryRecorder,
+) -> None:
+    """Statements are attributed to the request that executed them."""
+    url = fastapi_app.url_path_for("get_order", order_id=large_order.id)
+
+    await client.get(url)
+    await client.get(fastapi_app.url_path_for("health_check"))
+
+    first, second = query_recorder.requests
+    assert first.path == url
+    assert first.count > 0
+    assert first.db_time > 0
+    assert second.count == 0
@@ -0,0 +1,53 @@
+"""Tests for the cold start of the application factory."""
+
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict
+
+# Cold import of the factory plus `get_app()` took about 0.65 s on a
+# developer laptop; the budget leaves room for slower CI machines.
+IMPORT_BUDGET_SECONDS = 2.0
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from huuva_backend.web.application import get_app
+get_app()
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "sentry_imported": "sentry_sdk" in sys.modules,
+}))
+"""
+
+
+def _cold_start() -> Dict[str, Any]:
+    """Import the factory and build the app in a fresh interpreter."""
+    env = {
+        name: value
+        for name, value in os.environ.items()
+        if name != "HUUVA_BACKEND_SENTRY_DSN"
+    }
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", COLD_START],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_get_app_cold_start_budget() -> None:
+    """Importing the app factory and building the app stays within budget."""
+    # The best of two runs, so a single hiccup of the machine does not fail.
+    seconds = min(_cold_start()["seconds"] for _ in range(2))
+    assert (
+        seconds <= IMPORT_BUDGET_SECONDS
+    ), f"cold start took {seconds:.2f} s, budget {IMPORT_BUDGET_SECONDS} s"
+
+
+def test_sentry_not_imported_without_dsn() -> None:
+    """sentry_sdk is only imported when a DSN is configured."""
+    assert not _cold_start()["sentry_imported"]
@@ -0,0 +1,115 @@
+"""Tests for the negotiated response compression."""
+
+import logging
+import zlib
+from typing import AsyncIterator, List, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+from starlette.datastructures import Headers
+from starlette.types import Message
+
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.web import compression
+from huuva_backend.web.compression import CompressionMiddleware, negotiate
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.8", "gzip"),
+        ("br;q=0.5, *;q=0.8", "zstd"),
+        ("*, zstd;q=0", "br"),
+        ("identity", None),
+        ("gzip;q=0", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding: str, expected: Optional[str]) -> None:
+    """The client's q-values decide, the server's order breaks ties."""
+    assert negotiate(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+def test_missing_encoder_module_is_skipped(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """An encoding whose package is not installed is left out with a warning."""
+    monkeypatch.setattr(compression.importlib.util, "find_spec", lambda _: None)
+
+    with caplog.at_level(logging.WARNING, logger="huuva_backend.web.compression"):
+        assert compression.available_encodings(["zstd", "br", "gzip"]) == ["gzip"]
+
+    assert len(caplog.records) == 2
+    with pytest.raises(ValueError, match="deflate"):
+        compression.available_encodings(["deflate"])
+
+
+@pytest.mark.anyio
+async def test_list_orders_gzip(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+    second_order: OrderModel,
+) -> None:
+    """A large enough response is compressed, a small one is not."""
+    url = fastapi_app.url_path_for("list_orders")
+
+    resp = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = await client.get(url, headers={"Accept-Encoding": "identity"})
+    small = await client.get(
+        fastapi_app.url_path_for("get_order", order_id="missing"),
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert int(resp.headers["content-length"]) < len(plain.content)
+    assert resp.json() == plain.json()
+    assert "content-encoding" not in plain.headers
+    assert "content-encoding" not in small.headers
+
+
+@pytest.mark.anyio
+async def test_streaming_response_chunks_are_flushed() -> None:
+    """Every chunk of a stream can be decoded as soon as it is sent."""
+    chunks = [b'{"id": %d, "name": "Burger"}\n' % n * 20 for n in range(3)]
+
+    async def stream() -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    messages: List[Message] = []
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    async def receive() -> Message:
+        raise AssertionError("not read")
+
+    app = CompressionMiddleware(
+        StreamingResponse(stream()),
+        minimum_size=1024,
+        encodings=["gzip"],
+    )
+    await app(
+        {
+            "type": "http",
+            "asgi": {"spec_version": "2.4"},
+            "headers": [(b"accept-encoding", b"gzip")],
+        },
+        receive,
+        send,
+    )
+
+    start, *bodies = messages
+    headers = Headers(raw=start["headers"])
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    assert [decoder.decompress(body["body"]) for body in bodies[:-1]] == chunks
+    assert decoder.decompress(bodies[-1]["body"]) == b""
+    assert decoder.eof
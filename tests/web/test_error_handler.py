@@ -0,0 +1,31 @@
+"""Tests for the handling of expected API errors."""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+
+@pytest.mark.anyio
+async def test_not_found_counted_and_logged_once(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Repeated 404s are all counted but logged once, without a traceback."""
+    labels = {"error": "NotFoundError"}
+    before = REGISTRY.get_sample_value("api_errors_total", labels) or 0
+    url = fastapi_app.url_path_for("get_order", order_id="missing")
+
+    with caplog.at_level(logging.INFO, logger="huuva_backend.exceptions"):
+        for _ in range(3):
+            resp = await client.get(url)
+            assert resp.status_code == 404
+
+    assert REGISTRY.get_sample_value("api_errors_total", labels) == before + 3
+    (record,) = caplog.records
+    assert record.levelno == logging.INFO
+    assert record.exc_info is None
+    assert "missing" in record.getMessage()
@@ -0,0 +1,71 @@
+"""Tests for the Prometheus metrics."""
+
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.settings import settings
+from huuva_backend.web.metrics import instrument_pool
+
+
+def _sample(name: str, **labels: str) -> float:
+    value: Optional[float] = REGISTRY.get_sample_value(name, labels)
+    return value or 0
+
+
+@pytest.mark.anyio
+async def test_request_duration_by_route_template(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+) -> None:
+    """Requests are labelled with the route template, not the raw path."""
+    labels = {"method": "GET", "route": "/api/orders/{order_id}", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    await client.get(fastapi_app.url_path_for("get_order", order_id=existing_order.id))
+    resp = await client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in resp.text
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+    assert _sample("http_requests_in_progress", method="GET") == 0
+    metrics_labels = {"method": "GET", "route": "/metrics", "status": "200"}
+    assert _sample("http_request_duration_seconds_count", **metrics_labels) > 0
+
+
+@pytest.mark.anyio
+async def test_unmatched_requests_share_a_label(client: AsyncClient) -> None:
+    """Unknown paths do not create a label value each."""
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    resp = await client.get("/no/such/path")
+
+    assert resp.status_code == 404
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+@pytest.mark.anyio
+async def test_pool_gauges(_engine: AsyncEngine) -> None:
+    """Checked out and open connections follow the pool."""
+    engine = create_async_engine(str(settings.db_url), pool_size=2)
+    open_before = _sample("db_pool_connections")
+    checked_out_before = _sample("db_pool_checked_out")
+    instrument_pool(engine)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert _sample("db_pool_checked_out") == checked_out_before + 1
+            assert _sample("db_pool_connections") == open_before + 1
+        assert _sample("db_pool_checked_out") == checked_out_before
+    finally:
+        await engine.dispose()
+    assert _sample("db_pool_connections") == open_before
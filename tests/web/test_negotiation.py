@@ -0,0 +1,147 @@
+"""Tests for the MessagePack format of the order and analytics views."""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+import msgpack
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.services.analytics import AnalyticsService
+from huuva_backend.web.negotiation import prefers_msgpack
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def _payload(channel_order_id: str) -> Dict[str, Any]:
+    return {
+        "_id": channel_order_id,
+        "account": "60bfc6dc4887c9851d5a0246",
+        "brandId": "60bfc6dc4887c9851d5a0245",
+        "channelOrderId": channel_order_id,
+        "customer": {"name": "John Doe", "phoneNumber": "+123456789"},
+        "deliveryAddress": {
+            "city": "Helsinki",
+            "street": "Huuvatie 1",
+            "postalCode": "00100",
+        },
+        "pickupTime": "2021-07-22T20:28:02Z",
+        "items": [{"name": "Hawaii Burger", "plu": "CAT1-0001", "quantity": 1}],
+        "status": 1,
+        "statusHistory": [{"status": 1, "timestamp": "2021-07-22T20:10:00Z"}],
+    }
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/msgpack", True),
+        ("application/x-msgpack", True),
+        ("application/msgpack, application/json;q=0.5", True),
+        ("application/msgpack, */*;q=0.1", True),
+        ("application/msgpack, application/json", False),
+        ("application/json", False),
+        ("*/*", False),
+        ("", False),
+    ],
+)
+def test_prefers_msgpack(accept: str, expected: bool) -> None:
+    """Only a stronger preference for MessagePack than for JSON selects it."""
+    assert prefers_msgpack(accept) == expected
+
+
+@pytest.mark.anyio
+async def test_list_orders_msgpack(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    existing_order: OrderModel,
+    second_order: OrderModel,
+) -> None:
+    """The MessagePack response carries the same structure as the JSON one."""
+    url = fastapi_app.url_path_for("list_orders")
+
+    resp = await client.get(url, headers=MSGPACK)
+    json_resp = await client.get(url)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert "Accept" in resp.headers["vary"]
+    assert msgpack.unpackb(resp.content) == json_resp.json()
+    assert len(resp.content) < len(json_resp.content)
+    assert json_resp.headers["content-type"] == "application/json"
+
+
+@pytest.mark.anyio
+async def test_analytics_msgpack(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    base_time: datetime,
+) -> None:
+    """Analytics views are negotiated as well."""
+
+    async def hourly_throughput(*args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return [{"hour": base_time, "order_count": 3}]
+
+    # The materialized views only exist in migrated databases.
+    monkeypatch.setattr(AnalyticsService, "get_hourly_throughput", hourly_throughput)
+
+    resp = await client.get(
+        fastapi_app.url_path_for("get_hourly_throughput"),
+        headers=MSGPACK,
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(resp.content) == [
+        {"hour": base_time.isoformat().replace("+00:00", "Z"), "orderCount": 3},
+    ]
+
+
+@pytest.mark.anyio
+async def test_create_order_msgpack_body(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """A MessagePack body is validated like a JSON one, replays included."""
+    url = fastapi_app.url_path_for("create_order")
+    headers = {
+        **MSGPACK,
+        "Content-Type": "application/msgpack",
+        "Idempotency-Key": "msgpack-1",
+    }
+    body = msgpack.packb(_payload("TEST-MSGPACK-1"))
+
+    resp = await client.post(url, content=body, headers=headers)
+    retry = await client.post(url, content=body, headers=headers)
+
+    assert resp.status_code == 201
+    order = msgpack.unpackb(resp.content)
+    assert order["channelOrderId"] == "TEST-MSGPACK-1"
+    assert order["items"][0]["plu"] == "CAT1-0001"
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(retry.content) == order
+
+
+@pytest.mark.anyio
+async def test_create_order_invalid_msgpack_body(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Undecodable bodies are a 400 and invalid orders a 422, in JSON."""
+    url = fastapi_app.url_path_for("create_order")
+    headers = {**MSGPACK, "Content-Type": "application/msgpack"}
+
+    garbled = await client.post(url, content=b"\xc1", headers=headers)
+    invalid = await client.post(
+        url,
+        content=msgpack.packb({"_id": "TEST-MSGPACK-2"}),
+        headers=headers,
+    )
+
+    assert garbled.status_code == 400
+    assert invalid.status_code == 422
+    assert invalid.headers["content-type"] == "application/json"
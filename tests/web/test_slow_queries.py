@@ -0,0 +1,115 @@
+"""Tests for the slow query log and EXPLAIN capture."""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from huuva_backend.db.database import get_db_session
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.db.repositories.order import OrderRepository
+from huuva_backend.settings import settings
+from huuva_backend.web import slow_queries
+from huuva_backend.web.application import get_app
+from huuva_backend.web.slow_queries import instrument_slow_queries
+
+
+@pytest.fixture
+def slow_query_app(
+    monkeypatch: pytest.MonkeyPatch,
+    _engine: AsyncEngine,
+    dbsession: AsyncSession,
+) -> FastAPI:
+    """App on which every statement counts as slow and gets explained."""
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 1e-6)
+    monkeypatch.setattr(settings, "slow_query_explain_rate", 1.0)
+    monkeypatch.setattr(slow_queries, "_buffer", slow_queries.deque(maxlen=10))
+    instrument_slow_queries(_engine)
+    application = get_app()
+    application.dependency_overrides[get_db_session] = lambda: dbsession
+    return application
+
+
+@pytest.mark.anyio
+async def test_slow_query_logged_and_explained(
+    slow_query_app: FastAPI,
+    existing_order: OrderModel,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Slow statements are logged with caller and route, and plans captured."""
+    url = slow_query_app.url_path_for("get_order", order_id=existing_order.id)
+
+    with caplog.at_level(logging.WARNING, logger="huuva_backend.web.slow_queries"):
+        async with AsyncClient(app=slow_query_app, base_url="http://test") as client:
+            resp = await client.get(url)
+            captured = await client.get(
+                slow_query_app.url_path_for("get_slow_queries"),
+            )
+
+    assert resp.status_code == 200
+    assert caplog.records
+    record = caplog.records[0]
+    assert record.caller == "OrderRepository.get"
+    assert record.route == "/api/orders/{order_id}"
+    assert existing_order.id not in record.getMessage()
+    assert "<str>" in record.getMessage()
+
+    assert captured.status_code == 200
+    queries = captured.json()
+    assert queries
+    assert all(query["caller"] == "OrderRepository.get" for query in queries)
+    assert all(existing_order.id not in query["parameters"] for query in queries)
+    assert "Execution Time" in queries[-1]["plan"]
+
+
+@pytest.mark.anyio
+async def test_explain_failure_keeps_transaction_usable(
+    monkeypatch: pytest.MonkeyPatch,
+    slow_query_app: FastAPI,
+    order_repo: OrderRepository,
+    existing_order: OrderModel,
+) -> None:
+    """A failing EXPLAIN is rolled back to its savepoint."""
+    monkeypatch.setattr(slow_queries, "EXPLAIN", "EXPLAIN (NO_SUCH_OPTION)")
+
+    order = await order_repo.get(existing_order.id)
+    order = await order_repo.get(existing_order.id)
+
+    assert order.id == existing_order.id
+    (captured, *_) = slow_queries.captured_queries()
+    assert captured.plan.startswith("EXPLAIN failed")
+
+
+@pytest.mark.anyio
+async def test_parameters_shown_when_enabled(
+    monkeypatch: pytest.MonkeyPatch,
+    slow_query_app: FastAPI,
+    order_repo: OrderRepository,
+    existing_order: OrderModel,
+) -> None:
+    """`slow_query_parameters` shows the values of the parameters."""
+    monkeypatch.setattr(settings, "slow_query_parameters", True)
+
+    await order_repo.get(existing_order.id)
+
+    (captured, *_) = slow_queries.captured_queries()
+    assert existing_order.id in captured.parameters
+
+
+@pytest.mark.anyio
+async def test_failed_statement_leaves_no_start_time(
+    slow_query_app: FastAPI,
+    dbsession: AsyncSession,
+) -> None:
+    """A failing statement does not leave its start time behind."""
+    connection = await dbsession.connection()
+
+    with pytest.raises(DBAPIError):
+        async with dbsession.begin_nested():
+            await dbsession.execute(text("SELECT 1 / 0"))
+
+    assert not connection.sync_connection.info.get("slow_query_start")  # type: ignore[union-attr]
@@ -0,0 +1,95 @@
+"""Tests for the Server-Timing header and request timing log."""
+
+import logging
+import time
+from typing import AsyncGenerator
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from huuva_backend.db.database import get_db_session
+from huuva_backend.db.models.order import Order as OrderModel
+from huuva_backend.settings import settings
+from huuva_backend.web.application import get_app
+from huuva_backend.web.timing import instrument_engine
+
+
+@pytest.fixture
+def timed_app(
+    monkeypatch: pytest.MonkeyPatch,
+    _engine: AsyncEngine,
+    dbsession: AsyncSession,
+) -> FastAPI:
+    """App built with request timing enabled."""
+    monkeypatch.setattr(settings, "request_timing", True)
+    instrument_engine(_engine)
+    application = get_app()
+    application.dependency_overrides[get_db_session] = lambda: dbsession
+    return application
+
+
+@pytest.mark.anyio
+async def test_server_timing_header(
+    timed_app: FastAPI,
+    existing_order: OrderModel,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """The header and log record carry the statements of the request only."""
+    url = timed_app.url_path_for("get_order", order_id=existing_order.id)
+
+    with caplog.at_level(logging.INFO, logger="huuva_backend.web.timing"):
+        async with AsyncClient(app=timed_app, base_url="http://test") as client:
+            resp = await client.get(url)
+
+    assert resp.status_code == 200
+    metrics = {
+        metric.split(";")[0]: metric
+        for metric in resp.headers["server-timing"].split(", ")
+    }
+    assert set(metrics) == {"db", "db-pool", "serialize", "total"}
+    assert 'desc="4 statements"' in metrics["db"]
+    (record,) = caplog.records
+    assert record.sql_count == 4
+    assert record.status_code == 200
+    assert record.http_path == url
+    assert 0 < record.sql_ms <= record.duration_ms
+    assert 0 < record.serialize_ms <= record.duration_ms
+
+
+@pytest.mark.anyio
+async def test_server_timing_excludes_dependency_teardown(
+    timed_app: FastAPI,
+    dbsession: AsyncSession,
+    existing_order: OrderModel,
+) -> None:
+    """The commit of the session, after the rendering, is not serialization."""
+
+    async def slow_commit_session() -> AsyncGenerator[AsyncSession, None]:
+        yield dbsession
+        time.sleep(0.05)
+
+    timed_app.dependency_overrides[get_db_session] = slow_commit_session
+    url = timed_app.url_path_for("get_order", order_id=existing_order.id)
+
+    async with AsyncClient(app=timed_app, base_url="http://test") as client:
+        resp = await client.get(url)
+
+    metrics = dict(
+        metric.split(";dur=") for metric in resp.headers["server-timing"].split(", ")
+    )
+    assert 0 < float(metrics["serialize"]) < 50
+    assert float(metrics["total"]) >= 50
+
+
+@pytest.mark.anyio
+async def test_server_timing_disabled(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """No header is sent when request timing is off."""
+    resp = await client.get(fastapi_app.url_path_for("health_check"))
+
+    assert resp.status_code == 200
+    assert "server-timing" not in resp.headers